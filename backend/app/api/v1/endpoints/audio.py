@@ -2,21 +2,36 @@
 Audio processing API endpoints.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from contextlib import AsyncExitStack
+from typing import List, Optional
+from fastapi import (
+    APIRouter, HTTPException, Depends, UploadFile, File, Form, Header, Path, Query,
+    WebSocket, WebSocketDisconnect
+)
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+import asyncio
 import structlog
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.responses import RangeFileResponse
+from app.services.audio_intake import UploadRejected, receive_audio_upload
 from app.services.audio_service import AudioService
+from app.services.streaming_transcription import StreamLimitExceeded, StreamingTranscriptionSession
+from app.services.tts_cache import tts_cache
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
 
+TTS_MEDIA_TYPES = {"wav": "audio/wav", "opus": "audio/ogg"}
+
 
 @router.post("/speech-to-text")
 async def speech_to_text(
     audio_file: UploadFile = File(...),
     language_code: str = Form(...),
+    content_length: Optional[int] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -30,17 +45,23 @@ async def speech_to_text(
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
         # Process audio
-        result = await audio_service.speech_to_text(audio_file, language_code)
+        async with receive_audio_upload(audio_file, request_size=content_length) as upload:
+            result = await audio_service.speech_to_text(upload, language_code)
         
         return {
             "text": result.text,
             "confidence": result.confidence,
             "language_detected": result.language_detected,
+            "duration_seconds": result.duration_seconds,
+            "real_time_factor": result.real_time_factor,
+            "queue_wait_ms": result.queue_wait_ms,
             "processing_time_ms": result.processing_time_ms
         }
         
     except HTTPException:
         raise
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
         logger.error("Speech-to-text failed", error=str(e))
         raise HTTPException(status_code=500, detail="Speech-to-text processing failed")
@@ -63,7 +84,9 @@ async def text_to_speech(
         
         return {
             "audio_url": result.audio_url,
+            "wav_url": result.wav_url,
             "duration_seconds": result.duration_seconds,
+            "cached": result.cached,
             "processing_time_ms": result.processing_time_ms
         }
         
@@ -72,11 +95,59 @@ async def text_to_speech(
         raise HTTPException(status_code=500, detail="Text-to-speech processing failed")
 
 
+@router.post("/text-to-speech/stream")
+async def text_to_speech_stream(
+    text: str = Form(...),
+    language_code: str = Form(...),
+    voice: str = Form("default"),
+    db: Session = Depends(get_db)
+):
+    """
+    Convert text to speech, streaming WAV audio sentence by sentence.
+    """
+    audio_service = AudioService(db)
+    
+    return StreamingResponse(
+        audio_service.stream_text_to_speech(text, language_code, voice),
+        media_type="audio/wav"
+    )
+
+
+@router.get("/tts/{cache_key}.{fmt}")
+async def get_synthesized_audio(
+    cache_key: str,
+    fmt: str = Path(..., pattern="^(wav|opus)$"),
+    range_header: Optional[str] = Header(None, alias="Range")
+):
+    """
+    Serve synthesized audio from the TTS cache, with Range support.
+    """
+    try:
+        audio = tts_cache.open(cache_key, fmt)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    if audio is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    
+    # Content-addressed, so a cached file never changes
+    return RangeFileResponse(
+        audio,
+        range_header=range_header,
+        media_type=TTS_MEDIA_TYPES[fmt],
+        headers={
+            "ETag": f'"{cache_key}.{fmt}"',
+            "Cache-Control": "public, max-age=31536000, immutable"
+        }
+    )
+
+
 @router.post("/pronunciation-score")
 async def get_pronunciation_score(
     audio_file: UploadFile = File(...),
     reference_text: str = Form(...),
     language_code: str = Form(...),
+    content_length: Optional[int] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -89,7 +160,8 @@ async def get_pronunciation_score(
         if not audio_file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        result = await audio_service.score_pronunciation(audio_file, reference_text, language_code)
+        async with receive_audio_upload(audio_file, request_size=content_length) as upload:
+            result = await audio_service.score_pronunciation(upload, reference_text, language_code)
         
         return {
             "score": result.score,
@@ -100,6 +172,116 @@ async def get_pronunciation_score(
         
     except HTTPException:
         raise
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Pronunciation scoring failed", error=str(e))
         raise HTTPException(status_code=500, detail="Pronunciation scoring failed")
+
+
+@router.post("/pronunciation-score/batch")
+async def get_pronunciation_scores(
+    audio_files: List[UploadFile] = File(...),
+    reference_text: str = Form(...),
+    language_code: str = Form(...),
+    content_length: Optional[int] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Score a whole class's recordings of the same prompt.
+    
+    Returns a result per file, in upload order, and class-level aggregates.
+    """
+    try:
+        audio_service = AudioService(db)
+        
+        if len(audio_files) > settings.PRONUNCIATION_BATCH_MAX_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {settings.PRONUNCIATION_BATCH_MAX_FILES} files per batch"
+            )
+        for audio_file in audio_files:
+            if not audio_file.content_type.startswith('audio/'):
+                raise HTTPException(
+                    status_code=400, detail=f"{audio_file.filename} is not an audio file"
+                )
+        
+        if content_length is not None and content_length > settings.MAX_FILE_SIZE * len(audio_files):
+            raise HTTPException(status_code=413, detail="Batch exceeds the upload size limit")
+        
+        async with AsyncExitStack() as stack:
+            uploads = [
+                await stack.enter_async_context(receive_audio_upload(audio_file))
+                for audio_file in audio_files
+            ]
+            result = await audio_service.score_pronunciation_batch(
+                uploads, reference_text, language_code
+            )
+        
+        return {
+            "results": result.results,
+            "summary": result.summary,
+            "processing_time_ms": result.processing_time_ms
+        }
+        
+    except HTTPException:
+        raise
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        logger.error("Batch pronunciation scoring failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Batch pronunciation scoring failed")
+
+
+@router.websocket("/speech-to-text/stream")
+async def speech_to_text_stream(
+    websocket: WebSocket,
+    language_code: str = Query(...),
+    sample_rate: int = Query(16000, ge=8000, le=48000),
+    encoding: str = Query("pcm16", pattern="^(pcm16|float32|opus)$")
+):
+    """
+    Stream speech-to-text over a WebSocket.
+    
+    Send mono audio as binary messages (little-endian PCM16, float32, or one
+    Opus packet per message) and a text message "end" when done. The stream
+    is split into utterances by voice activity detection; each utterance is
+    transcribed as soon as it ends and sent back as
+    {"type": "partial", "segment", "start", "end", "text", "confidence"}.
+    A final {"type": "final", "text"} message follows "end".
+    """
+    await websocket.accept()
+    
+    try:
+        session = StreamingTranscriptionSession(language_code, sample_rate, encoding)
+    except ValueError as e:
+        await websocket.close(code=1003, reason=str(e))
+        return
+    
+    sender = asyncio.create_task(session.send_results(websocket))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes"):
+                session.feed(message["bytes"])
+            elif message.get("text") == "end":
+                session.finish()
+                await sender
+                await websocket.close()
+                break
+                
+    except StreamLimitExceeded as e:
+        await websocket.close(code=1009, reason=str(e))
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error("Streaming speech-to-text failed", error=str(e))
+        await websocket.close(code=1011, reason="Speech-to-text processing failed")
+    finally:
+        sender.cancel()
+        session.cancel()
@@ -2,14 +2,23 @@
 Community features API endpoints.
 """
 
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from functools import partial
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Header, Query
 from sqlalchemy.orm import Session
 import structlog
 
 from app.core.database import get_db
+from app.core.responses import RangeFileResponse, RangeStreamResponse
+from app.services.audio_fingerprint import DuplicateRecording
+from app.services.audio_intake import UploadRejected, receive_audio_upload
+from app.services.audio_transcoding import WAV_CONTENT_TYPES, audio_transcoder
+from app.schemas.community import (
+    Contribution, ModerationClaim, ModerationClaimRequest, ModerationDecision, ModerationQueuePage
+)
 from app.schemas.translation import TranslationFeedback
-from app.services.community_service import CommunityService
+from app.services.community_service import CommunityService, ModerationConflict
+from app.services.media_store import get_media_store, resolve_media
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
@@ -46,6 +55,8 @@ async def contribute_translation(
             "status": "pending_review"
         }
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Failed to contribute translation", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to contribute translation")
@@ -58,6 +69,7 @@ async def contribute_audio(
     language_code: str = Form(...),
     speaker_info: str = Form(None),
     cultural_context: str = Form(None),
+    content_length: Optional[int] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -70,13 +82,14 @@ async def contribute_audio(
         if not audio_file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        contribution = await community_service.contribute_audio(
-            audio_file=audio_file,
-            text=text,
-            language_code=language_code,
-            speaker_info=speaker_info,
-            cultural_context=cultural_context
-        )
+        async with receive_audio_upload(audio_file, request_size=content_length) as upload:
+            contribution = await community_service.contribute_audio(
+                audio=upload,
+                text=text,
+                language_code=language_code,
+                speaker_info=speaker_info,
+                cultural_context=cultural_context
+            )
         
         return {
             "contribution_id": contribution.id,
@@ -86,11 +99,65 @@ async def contribute_audio(
         
     except HTTPException:
         raise
+    except UploadRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except DuplicateRecording as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Failed to contribute audio", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to contribute audio")
 
 
+@router.get("/media/{content_key}")
+async def get_media(
+    content_key: str,
+    variant: str = Query("auto", pattern="^(auto|original|opus|flac)$"),
+    range_header: Optional[str] = Header(None, alias="Range")
+):
+    """
+    Stream a contributed recording, with Range support for seeking.
+    
+    By default the compressed Opus variant is served once it exists;
+    `variant=original` asks for lossless audio.
+    """
+    try:
+        store = get_media_store()
+        media = await resolve_media(store, content_key, variant)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Media not found")
+    except Exception as e:
+        logger.error("Failed to look up media", content_key=content_key, error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to look up media")
+    
+    if media is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+    
+    if media.key == content_key and media.content_type in WAV_CONTENT_TYPES:
+        # Stored before transcoding existed, or its transcode failed
+        audio_transcoder.submit(content_key)
+    
+    # Stored media never changes, but which file "auto" picks does once transcoded
+    headers = {
+        "ETag": f'"{media.key}"',
+        "Cache-Control": (
+            "private, no-cache" if variant == "auto" else "private, max-age=31536000, immutable"
+        )
+    }
+    if media.path is not None:
+        return RangeFileResponse(
+            media.path, range_header=range_header, media_type=media.content_type, headers=headers
+        )
+    return RangeStreamResponse(
+        media.size,
+        partial(store.read_range, media.key),
+        range_header=range_header,
+        media_type=media.content_type,
+        headers=headers
+    )
+
+
 @router.get("/cultural-context/{language_code}/{phrase}")
 async def get_cultural_context(
     language_code: str,
@@ -132,12 +199,14 @@ async def submit_feedback(
         
         return {"message": "Feedback submitted successfully"}
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Failed to submit feedback", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to submit feedback")
 
 
-@router.get("/contributions")
+@router.get("/contributions", response_model=List[Contribution])
 async def get_contributions(
     limit: int = 50,
     offset: int = 0,
@@ -161,3 +230,95 @@ async def get_contributions(
     except Exception as e:
         logger.error("Failed to get contributions", error=str(e))
         raise HTTPException(status_code=500, detail="Failed to get contributions")
+
+
+@router.get("/moderation/queue", response_model=ModerationQueuePage)
+async def get_moderation_queue(
+    size: int = Query(50, ge=1, le=200, description="Contributions per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    language_code: Optional[str] = Query(None, description="Filter by language"),
+    contribution_type: Optional[str] = Query(None, description="Filter by type: translation, audio or feedback"),
+    include_claimed: bool = Query(False, description="Include contributions other moderators have claimed"),
+    db: Session = Depends(get_db)
+):
+    """
+    Page through pending contributions, oldest first.
+    """
+    try:
+        community_service = CommunityService(db)
+        
+        contributions, next_cursor = await community_service.get_moderation_queue(
+            size=size,
+            cursor=cursor,
+            language_code=language_code,
+            contribution_type=contribution_type,
+            include_claimed=include_claimed
+        )
+        
+        return ModerationQueuePage(contributions=contributions, next_cursor=next_cursor)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Failed to get moderation queue", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to get moderation queue")
+
+
+@router.post("/moderation/claim", response_model=ModerationClaim)
+async def claim_contributions(
+    request: ModerationClaimRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Claim pending contributions to review, keeping other moderators off them.
+    """
+    try:
+        community_service = CommunityService(db)
+        
+        contributions, claim_expires_at = await community_service.claim_contributions(
+            moderator_id=request.moderator_id,
+            limit=request.limit,
+            language_code=request.language_code,
+            contribution_type=request.contribution_type
+        )
+        
+        return ModerationClaim(contributions=contributions, claim_expires_at=claim_expires_at)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Failed to claim contributions", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to claim contributions")
+
+
+@router.post("/moderation/{contribution_id}/decision", response_model=Contribution)
+async def moderate_contribution(
+    contribution_id: int,
+    decision: ModerationDecision,
+    db: Session = Depends(get_db)
+):
+    """
+    Approve or reject a pending contribution.
+    """
+    try:
+        community_service = CommunityService(db)
+        
+        contribution = await community_service.moderate_contribution(
+            contribution_id=contribution_id,
+            moderator_id=decision.moderator_id,
+            status=decision.status,
+            notes=decision.notes
+        )
+        
+        if contribution is None:
+            raise HTTPException(status_code=404, detail="Contribution not found")
+        
+        return contribution
+        
+    except HTTPException:
+        raise
+    except ModerationConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error("Failed to moderate contribution", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to moderate contribution")
@@ -2,19 +2,45 @@
 Language management API endpoints.
 """
 
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Callable, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response
 from sqlalchemy.orm import Session
 import structlog
 
 from app.core.database import get_db
-from app.schemas.language import Language, LanguageCreate, LanguageUpdate, LanguageList
+from app.schemas.language import (
+    Language,
+    LanguageCreate,
+    LanguageUpdate,
+    LanguageList,
+    LanguageSearchResult
+)
+from app.services.language_catalog import LanguageSnapshot
 from app.services.language_service import LanguageService
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
 
 
+def _catalog_response(
+    snapshot: LanguageSnapshot,
+    if_none_match: Optional[str],
+    key: tuple,
+    build: Callable[[], object]
+) -> Response:
+    """Answer from the catalog snapshot, with 304 when the client copy is current."""
+    headers = {"ETag": snapshot.etag, "Cache-Control": "no-cache"}
+    
+    if snapshot.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(
+        content=snapshot.render(key, build),
+        media_type="application/json",
+        headers=headers
+    )
+
+
 @router.get("/", response_model=LanguageList)
 async def get_languages(
     page: int = Query(1, ge=1, description="Page number"),
@@ -22,6 +48,7 @@ async def get_languages(
     tier: Optional[int] = Query(None, ge=1, le=3, description="Filter by priority tier"),
     status: Optional[str] = Query(None, description="Filter by status"),
     family: Optional[str] = Query(None, description="Filter by language family"),
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -29,30 +56,78 @@ async def get_languages(
     """
     try:
         language_service = LanguageService(db)
+        snapshot = await language_service.get_catalog()
         
-        languages, total = await language_service.get_languages(
-            page=page,
+        def build():
+            languages = snapshot.filter(tier=tier, status=status, family=family)
+            offset = (page - 1) * size
+            return {
+                "languages": [snapshot.document(l) for l in languages[offset:offset + size]],
+                "total": len(languages),
+                "page": page,
+                "size": size
+            }
+        
+        return _catalog_response(
+            snapshot, if_none_match, ("list", page, size, tier, status, family), build
+        )
+        
+    except Exception as e:
+        logger.error("Failed to get languages", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to get languages")
+
+
+@router.get("/search", response_model=LanguageSearchResult)
+async def search_languages(
+    size: int = Query(50, ge=1, le=100, description="Page size"),
+    page: Optional[int] = Query(None, ge=1, description="Page number (offset pagination)"),
+    after: Optional[int] = Query(None, ge=0, description="Cursor from a previous page (keyset pagination)"),
+    tier: Optional[int] = Query(None, ge=1, le=3, description="Filter by priority tier"),
+    status: Optional[str] = Query(None, description="Filter by status"),
+    family: Optional[str] = Query(None, description="Filter by language family"),
+    include_inactive: bool = Query(False, description="Include deactivated languages"),
+    estimate_total: bool = Query(False, description="Report an approximate total on keyset pages"),
+    db: Session = Depends(get_db)
+):
+    """
+    List languages directly from the database in a single query.
+    
+    Use `page` for offset pagination with an exact total, or `after` for
+    keyset pagination. Unlike the cached listing this can include inactive
+    languages.
+    """
+    try:
+        language_service = LanguageService(db)
+        
+        languages, total, next_cursor = await language_service.search_languages(
             size=size,
+            page=page if after is None else None,
+            after_id=after,
             tier=tier,
             status=status,
-            family=family
+            family=family,
+            include_inactive=include_inactive,
+            estimate_total=estimate_total
         )
         
-        return LanguageList(
+        return LanguageSearchResult(
             languages=languages,
             total=total,
-            page=page,
-            size=size
+            total_is_estimate=total is not None and (after is not None or page is None),
+            page=page if after is None else None,
+            size=size,
+            next_cursor=next_cursor
         )
         
     except Exception as e:
-        logger.error("Failed to get languages", error=str(e))
-        raise HTTPException(status_code=500, detail="Failed to get languages")
+        logger.error("Failed to search languages", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to search languages")
 
 
 @router.get("/{language_code}", response_model=Language)
 async def get_language(
     language_code: str,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -60,12 +135,16 @@ async def get_language(
     """
     try:
         language_service = LanguageService(db)
-        language = await language_service.get_language_by_code(language_code)
+        snapshot = await language_service.get_catalog()
+        language = snapshot.by_code.get(language_code)
         
         if not language:
             raise HTTPException(status_code=404, detail="Language not found")
         
-        return language
+        return _catalog_response(
+            snapshot, if_none_match, ("code", language_code),
+            lambda: snapshot.document(language)
+        )
         
     except HTTPException:
         raise
@@ -77,6 +156,7 @@ async def get_language(
 @router.get("/tier/{tier}", response_model=List[Language])
 async def get_languages_by_tier(
     tier: int,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -84,9 +164,12 @@ async def get_languages_by_tier(
     """
     try:
         language_service = LanguageService(db)
-        languages = await language_service.get_languages_by_tier(tier)
+        snapshot = await language_service.get_catalog()
         
-        return languages
+        return _catalog_response(
+            snapshot, if_none_match, ("tier", tier),
+            lambda: [snapshot.document(l) for l in snapshot.by_tier.get(tier, ())]
+        )
         
     except Exception as e:
         logger.error("Failed to get languages by tier", error=str(e))
@@ -96,6 +179,7 @@ async def get_languages_by_tier(
 @router.get("/family/{family}", response_model=List[Language])
 async def get_languages_by_family(
     family: str,
+    if_none_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -103,9 +187,12 @@ async def get_languages_by_family(
     """
     try:
         language_service = LanguageService(db)
-        languages = await language_service.get_languages_by_family(family)
+        snapshot = await language_service.get_catalog()
         
-        return languages
+        return _catalog_response(
+            snapshot, if_none_match, ("family", family),
+            lambda: [snapshot.document(l) for l in snapshot.by_family.get(family, ())]
+        )
         
     except Exception as e:
         logger.error("Failed to get languages by family", error=str(e))
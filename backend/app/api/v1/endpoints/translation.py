@@ -2,34 +2,61 @@
 Translation API endpoints.
 """
 
-from typing import List
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+import asyncio
+import json
 import time
 import structlog
 
+from app.core.admission import (
+    AdmissionRejected,
+    Deadline,
+    DeadlineExceeded,
+    get_request_deadline,
+    translation_admission
+)
 from app.core.database import get_db
 from app.schemas.translation import (
     TranslationRequest,
     TranslationResponse,
     BatchTranslationRequest,
     BatchTranslationResponse,
+    MultiTargetTranslationRequest,
+    MultiTargetTranslationResponse,
     LanguageDetectionRequest,
     LanguageDetectionResponse,
+    BatchLanguageDetectionRequest,
+    BatchLanguageDetectionResponse,
     TranslationHistory,
-    TranslationFeedback
+    TranslationFeedback,
+    TranslationJobStatus
 )
 from app.services.translation_service import TranslationService
 from app.services.language_detection import LanguageDetectionService
+from app.services.translation_jobs import TranslationJobStore, job_runner
 
 logger = structlog.get_logger(__name__)
 router = APIRouter()
 
 
+def _overloaded(e: Exception) -> HTTPException:
+    """Map load-shedding errors to a fast 503 with Retry-After."""
+    retry_after = getattr(e, "retry_after", None) or translation_admission.retry_after()
+    return HTTPException(
+        status_code=503,
+        detail="Translation service is overloaded, please retry later",
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
 @router.post("/", response_model=TranslationResponse)
 async def translate_text(
     request: TranslationRequest,
     background_tasks: BackgroundTasks,
+    deadline: Deadline = Depends(get_request_deadline),
     db: Session = Depends(get_db)
 ):
     """
@@ -42,12 +69,14 @@ async def translate_text(
         translation_service = TranslationService(db)
         
         # Perform translation
-        result = await translation_service.translate(
-            source_text=request.source_text,
-            source_lang=request.source_lang,
-            target_lang=request.target_lang,
-            model_version=request.model_version
-        )
+        async with translation_admission.admit(deadline):
+            result = await translation_service.translate(
+                source_text=request.source_text,
+                source_lang=request.source_lang,
+                target_lang=request.target_lang,
+                model_version=request.model_version,
+                deadline=deadline
+            )
         
         response_time = int((time.time() - start_time) * 1000)
         
@@ -56,7 +85,7 @@ async def translate_text(
             translation_service.log_translation_request,
             request.source_text,
             result.target_text,
-            request.source_lang,
+            result.source_lang,
             request.target_lang,
             result.confidence_score,
             request.model_version,
@@ -66,13 +95,20 @@ async def translate_text(
         return TranslationResponse(
             source_text=request.source_text,
             target_text=result.target_text,
-            source_lang=request.source_lang,
+            source_lang=result.source_lang,
             target_lang=request.target_lang,
             confidence_score=result.confidence_score,
             model_version=result.model_version,
-            response_time_ms=response_time
+            response_time_ms=response_time,
+            hops=result.hops,
+            detected_language=result.detected_language,
+            detection_confidence=result.detection_confidence
         )
         
+    except (AdmissionRejected, DeadlineExceeded) as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Translation failed", error=str(e))
         raise HTTPException(status_code=500, detail="Translation failed")
@@ -82,6 +118,7 @@ async def translate_text(
 async def translate_batch(
     request: BatchTranslationRequest,
     background_tasks: BackgroundTasks,
+    deadline: Deadline = Depends(get_request_deadline),
     db: Session = Depends(get_db)
 ):
     """
@@ -92,23 +129,29 @@ async def translate_batch(
     try:
         translation_service = TranslationService(db)
         
-        translations = []
-        for text in request.texts:
-            result = await translation_service.translate(
-                source_text=text,
+        async with translation_admission.admit(deadline):
+            results = await translation_service.translate_many(
+                source_texts=request.texts,
                 source_lang=request.source_lang,
                 target_lang=request.target_lang,
-                model_version=request.model_version
+                model_version=request.model_version,
+                deadline=deadline
             )
-            
-            translations.append(TranslationResponse(
+        
+        translations = [
+            TranslationResponse(
                 source_text=text,
                 target_text=result.target_text,
-                source_lang=request.source_lang,
+                source_lang=result.source_lang,
                 target_lang=request.target_lang,
                 confidence_score=result.confidence_score,
-                model_version=result.model_version
-            ))
+                model_version=result.model_version,
+                hops=result.hops,
+                detected_language=result.detected_language,
+                detection_confidence=result.detection_confidence
+            )
+            for text, result in zip(request.texts, results)
+        ]
         
         total_time = int((time.time() - start_time) * 1000)
         
@@ -118,21 +161,172 @@ async def translate_batch(
             total_time_ms=total_time
         )
         
+    except (AdmissionRejected, DeadlineExceeded) as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error("Batch translation failed", error=str(e))
         raise HTTPException(status_code=500, detail="Batch translation failed")
 
 
-@router.post("/detect", response_model=LanguageDetectionResponse)
-async def detect_language(
-    request: LanguageDetectionRequest,
+@router.post("/multi", response_model=MultiTargetTranslationResponse)
+async def translate_multi_target(
+    request: MultiTargetTranslationRequest,
+    background_tasks: BackgroundTasks,
+    deadline: Deadline = Depends(get_request_deadline),
     db: Session = Depends(get_db)
 ):
+    """
+    Translate one text into several target languages in a single request.
+    """
+    start_time = time.time()
+    
+    try:
+        translation_service = TranslationService(db)
+        
+        async with translation_admission.admit(deadline):
+            results = await translation_service.translate_multi(
+                source_text=request.source_text,
+                source_lang=request.source_lang,
+                target_langs=request.target_langs,
+                model_version=request.model_version,
+                deadline=deadline
+            )
+        
+        total_time = int((time.time() - start_time) * 1000)
+        
+        translations = []
+        for target_lang, result in results.items():
+            background_tasks.add_task(
+                translation_service.log_translation_request,
+                request.source_text,
+                result.target_text,
+                result.source_lang,
+                target_lang,
+                result.confidence_score,
+                request.model_version,
+                total_time
+            )
+            
+            translations.append(TranslationResponse(
+                source_text=request.source_text,
+                target_text=result.target_text,
+                source_lang=result.source_lang,
+                target_lang=target_lang,
+                confidence_score=result.confidence_score,
+                model_version=result.model_version,
+                hops=result.hops,
+                detected_language=result.detected_language,
+                detection_confidence=result.detection_confidence
+            ))
+        
+        return MultiTargetTranslationResponse(
+            source_text=request.source_text,
+            source_lang=translations[0].source_lang,
+            translations=translations,
+            total_time_ms=total_time
+        )
+        
+    except (AdmissionRejected, DeadlineExceeded) as e:
+        raise _overloaded(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Multi-target translation failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Multi-target translation failed")
+
+
+@router.post("/jobs", response_model=TranslationJobStatus, status_code=202)
+async def create_translation_job(
+    file: UploadFile = File(..., description="JSONL file with one {\"text\": ...} object per line"),
+    source_lang: str = Form(...),
+    target_lang: str = Form(...),
+    model_version: Optional[str] = Form(None)
+):
+    """
+    Submit a bulk translation job.
+    
+    Lines may override the job's languages with their own `source_lang` and
+    `target_lang`, and an optional `id` is echoed back in the results.
+    """
+    try:
+        store = TranslationJobStore()
+        status = await store.create_job(file, source_lang, target_lang, model_version)
+        job_runner.submit(status["job_id"])
+        
+        return status
+        
+    except Exception as e:
+        logger.error("Failed to create translation job", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to create translation job")
+
+
+def _get_job_status(store: TranslationJobStore, job_id: str) -> dict:
+    try:
+        status = store.read_status(job_id)
+    except ValueError:
+        status = None
+    
+    if status is None:
+        raise HTTPException(status_code=404, detail="Translation job not found")
+    
+    return status
+
+
+@router.get("/jobs/{job_id}", response_model=TranslationJobStatus)
+async def get_translation_job(job_id: str):
+    """
+    Get the status and progress of a bulk translation job.
+    """
+    return _get_job_status(TranslationJobStore(), job_id)
+
+
+@router.get("/jobs/{job_id}/progress")
+async def stream_translation_job_progress(job_id: str):
+    """
+    Stream job progress as server-sent events until the job finishes.
+    """
+    store = TranslationJobStore()
+    _get_job_status(store, job_id)
+    
+    async def events():
+        while True:
+            status = store.read_status(job_id)
+            yield f"data: {json.dumps(status)}\n\n"
+            
+            if status is None or status["status"] in ("completed", "failed"):
+                break
+            await asyncio.sleep(1)
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.get("/jobs/{job_id}/results")
+async def download_translation_job_results(job_id: str):
+    """
+    Stream the JSONL results written so far for a bulk translation job.
+    """
+    store = TranslationJobStore()
+    _get_job_status(store, job_id)
+    
+    if not store.results_path(job_id).exists():
+        raise HTTPException(status_code=404, detail="Results not available yet")
+    
+    return StreamingResponse(
+        store.iter_results(job_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{job_id}.jsonl"'}
+    )
+
+
+@router.post("/detect", response_model=LanguageDetectionResponse)
+async def detect_language(request: LanguageDetectionRequest):
     """
     Detect the language of the input text.
     """
     try:
-        detection_service = LanguageDetectionService(db)
+        detection_service = LanguageDetectionService()
         
         result = await detection_service.detect_language(request.text)
         
@@ -148,6 +342,39 @@ async def detect_language(
         raise HTTPException(status_code=500, detail="Language detection failed")
 
 
+@router.post("/detect/batch", response_model=BatchLanguageDetectionResponse)
+async def detect_language_batch(request: BatchLanguageDetectionRequest):
+    """
+    Detect the language of many texts in one request.
+    """
+    start_time = time.time()
+    
+    try:
+        detection_service = LanguageDetectionService()
+        
+        results = await detection_service.detect_languages(request.texts)
+        
+        total_time = int((time.time() - start_time) * 1000)
+        
+        return BatchLanguageDetectionResponse(
+            results=[
+                LanguageDetectionResponse(
+                    text=text,
+                    detected_language=result.language,
+                    confidence_score=result.confidence,
+                    alternative_languages=result.alternatives
+                )
+                for text, result in zip(request.texts, results)
+            ],
+            total_processed=len(results),
+            total_time_ms=total_time
+        )
+        
+    except Exception as e:
+        logger.error("Batch language detection failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Batch language detection failed")
+
+
 @router.get("/history", response_model=List[TranslationHistory])
 async def get_translation_history(
     limit: int = 50,
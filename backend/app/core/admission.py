@@ -0,0 +1,150 @@
+"""
+Admission control and request deadlines for load shedding.
+"""
+
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Optional
+from fastapi import Header
+import asyncio
+import math
+import time
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed because the service is saturated."""
+    
+    def __init__(self, retry_after: int):
+        super().__init__(f"Service overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before work is started."""
+
+
+class Deadline:
+    """Absolute per-request deadline carried from the endpoint down to inference."""
+    
+    def __init__(self, timeout_seconds: float):
+        self.timeout_seconds = timeout_seconds
+        self.expires_at = time.monotonic() + timeout_seconds
+    
+    @property
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+    
+    def check(self, stage: str = "request"):
+        """Raise DeadlineExceeded if the deadline has passed."""
+        if self.expired:
+            raise DeadlineExceeded(f"Deadline exceeded before {stage}")
+
+
+class AdmissionController:
+    """
+    Bounded-concurrency gate with a bounded wait queue.
+    
+    Up to `max_concurrency` requests run at once and up to `max_queue_depth`
+    more may wait for a slot. Anything beyond that is rejected immediately,
+    and queued requests whose deadline passes are dropped without running.
+    
+    A finishing request hands its slot directly to the oldest waiter, so a
+    waiter that times out or is cancelled just as it is handed a slot passes
+    it on instead of leaking it.
+    """
+    
+    def __init__(self, name: str, max_concurrency: int, max_queue_depth: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._avg_service_time = 0.1  # EWMA of seconds per admitted request
+    
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+    
+    def retry_after(self) -> int:
+        """Estimate seconds until a slot frees up, for the Retry-After header."""
+        backlog = (self.waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(self._avg_service_time * backlog))
+    
+    async def _acquire(self, deadline: Deadline):
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return
+        
+        if self.waiting >= self.max_queue_depth:
+            logger.warning(
+                "Request shed", controller=self.name,
+                in_flight=self.in_flight, waiting=self.waiting
+            )
+            raise AdmissionRejected(self.retry_after())
+        
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=deadline.remaining)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over as the wait ended; pass it on
+                self._release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                raise DeadlineExceeded("Deadline exceeded while queued")
+            raise
+    
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot moves to the waiter, so in_flight is unchanged
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+    
+    @asynccontextmanager
+    async def admit(self, deadline: Deadline):
+        """Hold a concurrency slot for the duration of the block."""
+        await self._acquire(deadline)
+        
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start_time
+            self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * elapsed
+            self._release()
+
+
+translation_admission = AdmissionController(
+    "translation",
+    max_concurrency=settings.TRANSLATION_MAX_CONCURRENCY,
+    max_queue_depth=settings.TRANSLATION_MAX_QUEUE_DEPTH,
+)
+
+
+def get_request_deadline(
+    x_request_timeout_ms: Optional[int] = Header(None, description="Client deadline in milliseconds")
+) -> Deadline:
+    """Build the request deadline, honouring a shorter client-supplied timeout."""
+    timeout_ms = settings.TRANSLATION_TIMEOUT_MS
+    if x_request_timeout_ms is not None and 0 < x_request_timeout_ms < timeout_ms:
+        timeout_ms = x_request_timeout_ms
+    
+    return Deadline(timeout_ms / 1000)
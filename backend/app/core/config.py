@@ -2,8 +2,9 @@
 Application configuration settings.
 """
 
-from typing import List, Optional
-from pydantic import BaseSettings, validator
+from typing import List, Optional, Union
+from pydantic import validator
+from pydantic_settings import BaseSettings
 import os
 
 
@@ -20,7 +21,7 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     
     # CORS
-    ALLOWED_HOSTS: List[str] = ["*"]
+    ALLOWED_HOSTS: Union[List[str], str] = ["*"]  # Comma-separated in the environment
     
     # Database
     POSTGRES_SERVER: str = "localhost"
@@ -36,30 +37,76 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DB: str = "kenyan_languages_media"
+    MEDIA_STORE_BACKEND: str = "gridfs"  # "gridfs" or "filesystem"
+    MEDIA_STORE_DIR: str = "./uploads/media"  # Filesystem backend only
+    TRANSCODE_WORKERS: int = 2
+    TRANSCODE_KEEP_ORIGINAL: bool = True  # False deletes WAVs once contributions point at a verified FLAC copy
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
+    LANGUAGE_CATALOG_CHANNEL: str = "languages:catalog"  # Pub/sub channel for catalog changes
     
     # ML Models
     MODEL_CACHE_DIR: str = "./models"
     HUGGINGFACE_CACHE_DIR: str = "./hf_cache"
+    TRANSLATION_MODEL_NAME: str = ""  # e.g. facebook/m2m100_418M; empty uses the mock model
+    TRANSLATION_BATCH_SIZE: int = 64  # Texts per cache query / model batch
+    LANGUAGE_ID_MODEL_DIR: str = "./models/language_id"  # Built by ml-pipeline language_id_training
+    DETECTION_CACHE_SIZE: int = 10000  # Detection results kept per process
+    DETECTION_WINDOW_CHARS: int = 256  # Characters scored per early-exit round
+    DETECTION_EARLY_EXIT_MARGIN: float = 4.6  # Log-odds lead that stops scoring
+    
+    # Translation routing
+    PIVOT_LANGUAGE: str = "sw"  # Intermediate language for indirect pairs
+    DIRECT_PAIR_LANGUAGES: Union[List[str], str] = ["sw", "en"]  # Languages with direct models to/from all others
     
     # File Storage
     UPLOAD_DIR: str = "./uploads"
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 1MB reads when streaming uploads
+    UPLOAD_TEMP_DIR: str = ""  # Where uploads are received; empty uses the system temp dir
     
     # Audio Processing
     WHISPER_MODEL: str = "base"
+    WHISPER_DEVICE: str = ""  # cuda or cpu; empty picks cuda when available
+    WHISPER_MAX_BATCH_WINDOWS: int = 8  # 30-second windows decoded per batch
+    WHISPER_BATCH_WAIT_MS: int = 20  # How long to wait for more clips to batch
     MAX_AUDIO_DURATION: int = 300  # 5 minutes
+    TTS_CACHE_DIR: str = "./tts_cache"
+    TTS_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # 1GB of synthesized audio
+    FEATURE_STORE_DIR: str = "./feature_store"
+    FEATURE_STORE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024  # 2GB of decoded audio and features
+    FINGERPRINT_INDEX_PATH: str = "./audio_fingerprints.sqlite3"
+    FINGERPRINT_MIN_MATCHES: int = 20  # Offset-aligned hashes needed to call a duplicate
+    FINGERPRINT_MIN_SCORE: float = 0.1  # ...and the share of the upload's hashes they cover
+    PRONUNCIATION_CACHE_DIR: str = "./pronunciation_cache"
+    PRONUNCIATION_CACHE_SIZE: int = 1024  # Reference prompts kept in memory
+    PRONUNCIATION_MAX_SECONDS: int = 30
+    PRONUNCIATION_WORKERS: int = 0  # Batch scoring processes; 0 uses every CPU
+    PRONUNCIATION_BATCH_MAX_FILES: int = 60
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
     
+    # Admission control
+    TRANSLATION_MAX_CONCURRENCY: int = 32  # Requests running inference at once
+    TRANSLATION_MAX_QUEUE_DEPTH: int = 64  # Requests allowed to wait for a slot
+    TRANSLATION_TIMEOUT_MS: int = 10000  # Default per-request deadline
+    
+    # Moderation
+    MODERATION_CLAIM_SECONDS: int = 15 * 60  # How long a claim keeps others off a contribution
+    
+    # Background jobs
+    CELERY_BROKER_URL: str = ""  # Empty runs jobs on an in-process worker pool
+    JOB_DIR: str = "./jobs"
+    JOB_WORKERS: int = 2
+    JOB_CHUNK_SIZE: int = 512  # Input lines translated per batch
+    
     # Environment
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     
-    @validator("ALLOWED_HOSTS", pre=True)
+    @validator("ALLOWED_HOSTS", "DIRECT_PAIR_LANGUAGES", pre=True)
     def assemble_cors_origins(cls, v: str) -> List[str]:
         if isinstance(v, str) and not v.startswith("["):
             return [i.strip() for i in v.split(",")]
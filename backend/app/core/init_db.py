@@ -5,7 +5,10 @@ Database initialization script.
 import asyncio
 from sqlalchemy import create_engine
 from app.core.database import Base, init_db
+from app.models import language, translation, user  # noqa: F401  Register tables
+from app.services.contribution_migration import ContributionMigrator
 from app.services.language_service import LanguageService
+from app.services.translation_cache_migration import TranslationHashMigrator
 from app.core.config import settings
 import structlog
 
@@ -23,6 +26,48 @@ def create_tables():
         raise
 
 
+def create_missing_indexes(bind, models):
+    """Create indexes declared on models that an existing table does not have yet."""
+    for model in models:
+        for index in model.__table__.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
+def upgrade_tables():
+    """
+    Apply column and index changes that create_all makes only to new tables.
+    
+    Also moves legacy pipe-delimited contributions into the typed tables.
+    Both migrations are resumable and skip rows that are already done, so
+    this is safe to run on every deploy.
+    """
+    try:
+        from sqlalchemy.orm import sessionmaker
+        
+        engine = create_engine(settings.DATABASE_URL)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        
+        db = SessionLocal()
+        try:
+            migrator = TranslationHashMigrator(db)
+            migrator.prepare()
+            migrator.run()
+            
+            # Typed contribution inserts and the moderation queue need these columns
+            contributions = ContributionMigrator(db)
+            contributions.prepare()
+            contributions.run()
+            
+            create_missing_indexes(engine, [language.Language])
+            logger.info("Database tables upgraded successfully")
+        finally:
+            db.close()
+            
+    except Exception as e:
+        logger.error("Failed to upgrade database tables", error=str(e))
+        raise
+
+
 async def seed_database():
     """Seed the database with initial data."""
     try:
@@ -49,6 +94,7 @@ async def init_database():
     try:
         # Create tables
         create_tables()
+        upgrade_tables()
         
         # Initialize connections
         await init_db()
@@ -0,0 +1,188 @@
+"""
+Custom responses.
+"""
+
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Callable, Mapping, Optional, Tuple, Union
+from fastapi import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
+import os
+import re
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into an inclusive (start, end) pair.
+    
+    Returns None when the whole file should be sent (no header, or a
+    multi-range request) and raises ValueError if the range cannot be
+    satisfied.
+    """
+    if not header:
+        return None
+    
+    match = _RANGE_PATTERN.match(header.strip())
+    if match is None:
+        # Multiple ranges or another unit; a full response is allowed
+        return None
+    
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError("Empty byte range")
+    
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            # Nothing to return for an empty file, which RFC 9110 makes a 416
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+class RangeResponse(Response):
+    """
+    Base for responses honouring single-range Range requests.
+    
+    Works out the status, Content-Range and Content-Length for a body of
+    known size; subclasses send `count` bytes starting at `offset`.
+    """
+    
+    def __init__(
+        self,
+        size: int,
+        range_header: Optional[str] = None,
+        media_type: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ):
+        self.media_type = media_type or "application/octet-stream"
+        self.background = None
+        self.body = b""
+        
+        self.status_code = 200
+        self.offset, self.count = 0, size
+        
+        extra = {"accept-ranges": "bytes"}
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            self.status_code = 416
+            self.offset, self.count = 0, 0
+            extra["content-range"] = f"bytes */{size}"
+        else:
+            if byte_range is not None:
+                start, end = byte_range
+                self.status_code = 206
+                self.offset, self.count = start, end - start + 1
+                extra["content-range"] = f"bytes {start}-{end}/{size}"
+        
+        extra["content-length"] = str(self.count)
+        self.init_headers({**(headers or {}), **extra})
+    
+    async def _start(self, scope: Scope, send: Send) -> bool:
+        """Send the response start; returns False when there is no body to send."""
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        
+        if self.count == 0 or scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return False
+        return True
+
+
+class RangeFileResponse(RangeResponse):
+    """
+    File response honouring single-range Range requests.
+    
+    Bodies are sent with the ASGI zero-copy send extension when the server
+    offers it, and streamed in chunks read off the event loop otherwise.
+    `file` may be a path or an already open binary file, which the response
+    closes; open files stay readable if the path is deleted meanwhile.
+    """
+    
+    chunk_size = 64 * 1024
+    
+    def __init__(
+        self,
+        file: Union[str, Path, BinaryIO],
+        range_header: Optional[str] = None,
+        media_type: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ):
+        if hasattr(file, "read"):
+            self.path, self.file = None, file
+            size = os.fstat(file.fileno()).st_size
+        else:
+            self.path, self.file = Path(file), None
+            size = os.stat(self.path).st_size
+        super().__init__(size, range_header, media_type, headers)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        f = self.file if self.file is not None else open(self.path, "rb")
+        with f:
+            if not await self._start(scope, send):
+                return
+            
+            if "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": f,
+                    "offset": self.offset,
+                    "count": self.count
+                })
+                return
+            
+            f.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await run_in_threadpool(f.read, min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0
+                })
+            if remaining > 0:
+                # File shrank underneath us; end the body rather than hang
+                await send({"type": "http.response.body", "body": b""})
+
+
+class RangeStreamResponse(RangeResponse):
+    """
+    Range-aware response whose body comes from an async byte source.
+    
+    `read_range(offset, count)` yields the requested bytes in chunks, so the
+    body is never held in memory as a whole.
+    """
+    
+    def __init__(
+        self,
+        size: int,
+        read_range: Callable[[int, int], AsyncIterator[bytes]],
+        range_header: Optional[str] = None,
+        media_type: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ):
+        self.read_range = read_range
+        super().__init__(size, range_header, media_type, headers)
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not await self._start(scope, send):
+            return
+        
+        async for chunk in self.read_range(self.offset, self.count):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
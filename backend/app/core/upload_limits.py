@@ -0,0 +1,65 @@
+"""
+Request body limits for multipart uploads.
+
+Starlette parses a multipart body in full, spooling file parts to temporary
+files, before the endpoint runs, so limits the endpoint checks come too late
+to save the bandwidth and disk. This middleware rejects an upload whose
+declared Content-Length is over the limit before reading any of it, and
+stops reading a body without one (or with a false one) as soon as it passes
+the limit.
+"""
+
+from typing import Dict
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class UploadSizeLimitMiddleware:
+    """Caps multipart request bodies sent to the paths in `limits` (path -> bytes)."""
+    
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+        
+        detail = f"Request body exceeds {limit} bytes"
+        
+        try:
+            content_length = int(headers["content-length"])
+        except (KeyError, ValueError):
+            content_length = None
+        if content_length is not None and content_length > limit:
+            logger.warning("Rejected upload by Content-Length", path=scope["path"], size=content_length)
+            response = JSONResponse({"detail": detail}, status_code=413)
+            await response(scope, receive, send)
+            return
+        
+        received = 0
+        
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    logger.warning("Rejected upload while streaming", path=scope["path"], received=received)
+                    # Raised inside body parsing, so the route returns it as a 413
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+        
+        await self.app(scope, limited_receive, send)
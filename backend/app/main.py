@@ -6,12 +6,18 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
+import asyncio
 import structlog
 
 from app.core.config import settings
 from app.core.database import init_db
 from app.api.v1.api import api_router
 from app.core.logging import setup_logging
+from app.core.upload_limits import UploadSizeLimitMiddleware
+from app.services.audio_intake import MULTIPART_OVERHEAD
+from app.services.audio_transcoding import audio_transcoder
+from app.services.language_catalog import language_catalog
+from app.services.pronunciation_scoring import get_pronunciation_scorer
 
 # Setup structured logging
 setup_logging()
@@ -24,9 +30,13 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Kenyan Native Languages Platform")
     await init_db()
+    catalog_listener = asyncio.create_task(language_catalog.listen())
     yield
     # Shutdown
     logger.info("Shutting down Kenyan Native Languages Platform")
+    catalog_listener.cancel()
+    get_pronunciation_scorer().shutdown()
+    audio_transcoder.shutdown()
 
 
 # Create FastAPI application
@@ -54,6 +64,19 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS,
 )
 
+# Stop reading audio uploads that exceed the size limit before they are spooled
+_single_upload_limit = settings.MAX_FILE_SIZE + MULTIPART_OVERHEAD
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        f"{settings.API_V1_STR}/audio/speech-to-text": _single_upload_limit,
+        f"{settings.API_V1_STR}/audio/pronunciation-score": _single_upload_limit,
+        f"{settings.API_V1_STR}/audio/pronunciation-score/batch":
+            settings.MAX_FILE_SIZE * settings.PRONUNCIATION_BATCH_MAX_FILES + MULTIPART_OVERHEAD,
+        f"{settings.API_V1_STR}/community/contribute/audio": _single_upload_limit,
+    },
+)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -2,7 +2,7 @@
 Language model for storing Kenyan language information.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, Index, text
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -25,5 +25,15 @@ class Language(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    __table_args__ = (
+        # Filtered listings, including inactive languages
+        Index("ix_languages_filters", "is_active", "priority_tier", "family", "status"),
+        # Filtered listings of active languages, ordered by id for keyset pagination
+        Index(
+            "ix_languages_active_filters", "priority_tier", "family", "status", "id",
+            postgresql_where=text("is_active")
+        ),
+    )
+    
     def __repr__(self):
         return f"<Language(name='{self.name}', code='{self.code}')>"
@@ -2,7 +2,7 @@
 Translation model for storing translation pairs and metadata.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -17,6 +17,7 @@ class Translation(Base):
     source_lang_id = Column(Integer, ForeignKey("languages.id"), nullable=False)
     target_lang_id = Column(Integer, ForeignKey("languages.id"), nullable=False)
     source_text = Column(Text, nullable=False)
+    source_hash = Column(String(64), nullable=True)  # SHA-256 of the normalized source key
     target_text = Column(Text, nullable=False)
     confidence_score = Column(Float, nullable=True)  # Model confidence (0.0-1.0)
     model_version = Column(String(50), nullable=True)  # Model version used
@@ -30,6 +31,11 @@ class Translation(Base):
     source_language = relationship("Language", foreign_keys=[source_lang_id])
     target_language = relationship("Language", foreign_keys=[target_lang_id])
     
+    __table_args__ = (
+        # Translation cache lookups
+        Index("ix_translations_cache_key", "source_lang_id", "source_hash", "target_lang_id"),
+    )
+    
     def __repr__(self):
         return f"<Translation({self.source_language.code}->{self.target_language.code}: '{self.source_text[:50]}...')>"
 
@@ -2,8 +2,11 @@
 User model for authentication and community features.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import (
+    Column, Integer, SmallInteger, String, Boolean, DateTime, Text, ForeignKey, Index, text
+)
 from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 
@@ -39,13 +42,101 @@ class UserContribution(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     contribution_type = Column(String(50), nullable=False)  # translation, audio, feedback, etc.
-    content = Column(Text, nullable=False)  # The actual contribution
+    content = Column(Text, nullable=True)  # Legacy pipe-delimited form; see the typed tables below
     language_id = Column(Integer, ForeignKey("languages.id"), nullable=True)
     verification_status = Column(String(20), default="pending")  # pending, approved, rejected
     verified_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     verification_notes = Column(Text, nullable=True)
+    claimed_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # Moderator reviewing it
+    claim_expires_at = Column(DateTime(timezone=True), nullable=True)  # Claim lapses after this
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Typed details; exactly one exists, matching contribution_type
+    translation = relationship(
+        "ContributionTranslation", uselist=False, back_populates="contribution",
+        cascade="all, delete-orphan"
+    )
+    audio = relationship(
+        "ContributionAudio", uselist=False, back_populates="contribution",
+        cascade="all, delete-orphan"
+    )
+    feedback = relationship(
+        "ContributionFeedback", uselist=False, back_populates="contribution",
+        cascade="all, delete-orphan"
+    )
+    
+    __table_args__ = (
+        # Moderation queue, oldest first, with id breaking ties for keyset pagination
+        Index(
+            "ix_user_contributions_queue", "verification_status", "created_at", "id",
+            postgresql_where=text("verification_status = 'pending'")
+        ),
+    )
+    
     def __repr__(self):
         return f"<UserContribution(user_id={self.user_id}, type='{self.contribution_type}')>"
+
+
+class ContributionTranslation(Base):
+    """A contributed translation pair."""
+    
+    __tablename__ = "contribution_translations"
+    
+    contribution_id = Column(
+        Integer, ForeignKey("user_contributions.id", ondelete="CASCADE"), primary_key=True
+    )
+    source_lang_id = Column(Integer, ForeignKey("languages.id"), nullable=False)
+    target_lang_id = Column(Integer, ForeignKey("languages.id"), nullable=False)
+    source_text = Column(Text, nullable=False)
+    target_text = Column(Text, nullable=False)
+    cultural_context = Column(Text, nullable=True)
+    contributor_notes = Column(Text, nullable=True)
+    
+    # Relationships
+    contribution = relationship("UserContribution", back_populates="translation")
+    source_language = relationship("Language", foreign_keys=[source_lang_id])
+    target_language = relationship("Language", foreign_keys=[target_lang_id])
+    
+    __table_args__ = (
+        # Training export and moderation by language pair
+        Index("ix_contribution_translations_pair", "source_lang_id", "target_lang_id"),
+    )
+
+
+class ContributionAudio(Base):
+    """A contributed recording and its transcript."""
+    
+    __tablename__ = "contribution_audio"
+    
+    contribution_id = Column(
+        Integer, ForeignKey("user_contributions.id", ondelete="CASCADE"), primary_key=True
+    )
+    language_id = Column(Integer, ForeignKey("languages.id"), nullable=False, index=True)
+    transcript = Column(Text, nullable=False)
+    filename = Column(String(255), nullable=True)  # As uploaded
+    media_key = Column(String(64), nullable=True, index=True)  # SHA-256 in the media store
+    speaker_info = Column(Text, nullable=True)
+    cultural_context = Column(Text, nullable=True)
+    
+    # Relationships
+    contribution = relationship("UserContribution", back_populates="audio")
+    language = relationship("Language")
+
+
+class ContributionFeedback(Base):
+    """A rating of a stored translation."""
+    
+    __tablename__ = "contribution_feedback"
+    
+    contribution_id = Column(
+        Integer, ForeignKey("user_contributions.id", ondelete="CASCADE"), primary_key=True
+    )
+    translation_id = Column(Integer, ForeignKey("translations.id"), nullable=False, index=True)
+    rating = Column(SmallInteger, nullable=False)  # 1-5
+    feedback_text = Column(Text, nullable=True)
+    is_correct = Column(Boolean, nullable=True)
+    
+    # Relationships
+    contribution = relationship("UserContribution", back_populates="feedback")
+    translation = relationship("Translation")
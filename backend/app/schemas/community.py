@@ -0,0 +1,92 @@
+"""
+Pydantic schemas for community contribution and moderation endpoints.
+"""
+
+from typing import Optional, List
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class ContributionTranslationDetails(BaseModel):
+    """Schema for a contributed translation pair."""
+    source_lang_id: int
+    target_lang_id: int
+    source_text: str
+    target_text: str
+    cultural_context: Optional[str] = None
+    contributor_notes: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class ContributionAudioDetails(BaseModel):
+    """Schema for a contributed recording."""
+    language_id: int
+    transcript: str
+    filename: Optional[str] = None
+    media_key: Optional[str] = Field(None, description="Key for /community/media/{key}")
+    speaker_info: Optional[str] = None
+    cultural_context: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class ContributionFeedbackDetails(BaseModel):
+    """Schema for feedback on a translation."""
+    translation_id: int
+    rating: int
+    feedback_text: Optional[str] = None
+    is_correct: Optional[bool] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class Contribution(BaseModel):
+    """Schema for a contribution with its typed details."""
+    id: int
+    user_id: int
+    contribution_type: str
+    language_id: Optional[int] = None
+    verification_status: str
+    verified_by: Optional[int] = None
+    verification_notes: Optional[str] = None
+    claimed_by: Optional[int] = None
+    claim_expires_at: Optional[datetime] = None
+    created_at: datetime
+    translation: Optional[ContributionTranslationDetails] = None
+    audio: Optional[ContributionAudioDetails] = None
+    feedback: Optional[ContributionFeedbackDetails] = None
+    content: Optional[str] = Field(None, description="Legacy content of rows not yet migrated")
+    
+    class Config:
+        from_attributes = True
+
+
+class ModerationQueuePage(BaseModel):
+    """Schema for a page of the moderation queue."""
+    contributions: List[Contribution]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
+class ModerationClaimRequest(BaseModel):
+    """Schema for claiming queued contributions."""
+    moderator_id: int
+    limit: int = Field(10, ge=1, le=50, description="Contributions to claim")
+    language_code: Optional[str] = Field(None, description="Only claim contributions in this language")
+    contribution_type: Optional[str] = Field(None, description="Only claim this type of contribution")
+
+
+class ModerationClaim(BaseModel):
+    """Schema for claimed contributions."""
+    contributions: List[Contribution]
+    claim_expires_at: Optional[datetime] = Field(None, description="When unreviewed claims return to the queue")
+
+
+class ModerationDecision(BaseModel):
+    """Schema for a moderation decision."""
+    moderator_id: int
+    status: str = Field(..., pattern="^(approved|rejected)$", description="approved or rejected")
+    notes: Optional[str] = Field(None, description="Reason shown to the contributor")
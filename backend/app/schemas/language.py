@@ -24,6 +24,11 @@ class LanguageCreate(LanguageBase):
     pass
 
 
+class LanguageImport(LanguageBase):
+    """Schema for a language record in an import catalog file."""
+    is_active: bool = Field(True, description="Whether the language is active")
+
+
 class LanguageUpdate(BaseModel):
     """Schema for updating language information."""
     name: Optional[str] = None
@@ -54,3 +59,13 @@ class LanguageList(BaseModel):
     total: int
     page: int
     size: int
+
+
+class LanguageSearchResult(BaseModel):
+    """Schema for a database-backed language listing page."""
+    languages: List[Language]
+    total: Optional[int] = Field(None, description="Matching languages; omitted for keyset pages unless estimated")
+    total_is_estimate: bool = Field(False, description="Whether total is a planner estimate")
+    page: Optional[int] = None
+    size: int
+    next_cursor: Optional[int] = Field(None, description="Pass as `after` to fetch the next page")
@@ -10,7 +10,7 @@ from datetime import datetime
 class TranslationRequest(BaseModel):
     """Schema for translation request."""
     source_text: str = Field(..., description="Text to translate")
-    source_lang: str = Field(..., description="Source language code")
+    source_lang: str = Field(..., description="Source language code, or 'auto' to detect it")
     target_lang: str = Field(..., description="Target language code")
     model_version: Optional[str] = Field(None, description="Specific model version to use")
 
@@ -18,16 +18,40 @@ class TranslationRequest(BaseModel):
 class BatchTranslationRequest(BaseModel):
     """Schema for batch translation request."""
     texts: List[str] = Field(..., description="List of texts to translate")
-    source_lang: str = Field(..., description="Source language code")
+    source_lang: str = Field(..., description="Source language code, or 'auto' to detect it")
     target_lang: str = Field(..., description="Target language code")
     model_version: Optional[str] = Field(None, description="Specific model version to use")
 
 
+class MultiTargetTranslationRequest(BaseModel):
+    """Schema for translating one text into several target languages."""
+    source_text: str = Field(..., description="Text to translate")
+    source_lang: str = Field(..., description="Source language code, or 'auto' to detect it")
+    target_langs: List[str] = Field(..., min_length=1, description="Target language codes")
+    model_version: Optional[str] = Field(None, description="Specific model version to use")
+
+
 class LanguageDetectionRequest(BaseModel):
     """Schema for language detection request."""
     text: str = Field(..., description="Text to detect language for")
 
 
+class BatchLanguageDetectionRequest(BaseModel):
+    """Schema for batch language detection request."""
+    texts: List[str] = Field(..., description="Texts to detect languages for")
+
+
+class TranslationHop(BaseModel):
+    """Schema for a single hop of a (possibly pivoted) translation."""
+    source_lang: str
+    target_lang: str
+    target_text: str
+    confidence_score: Optional[float] = None
+    model_version: Optional[str] = None
+    cached: bool = False
+    latency_ms: int
+
+
 class TranslationResponse(BaseModel):
     """Schema for translation response."""
     source_text: str
@@ -37,6 +61,9 @@ class TranslationResponse(BaseModel):
     confidence_score: Optional[float] = None
     model_version: Optional[str] = None
     response_time_ms: Optional[int] = None
+    hops: Optional[List[TranslationHop]] = Field(None, description="Hops taken, including pivot steps")
+    detected_language: Optional[str] = Field(None, description="Detected source language when source_lang was 'auto'")
+    detection_confidence: Optional[float] = Field(None, description="Confidence of the detected source language")
 
 
 class BatchTranslationResponse(BaseModel):
@@ -46,6 +73,14 @@ class BatchTranslationResponse(BaseModel):
     total_time_ms: int
 
 
+class MultiTargetTranslationResponse(BaseModel):
+    """Schema for multi-target translation response."""
+    source_text: str
+    source_lang: str
+    translations: List[TranslationResponse]
+    total_time_ms: int
+
+
 class LanguageDetectionResponse(BaseModel):
     """Schema for language detection response."""
     text: str
@@ -54,6 +89,13 @@ class LanguageDetectionResponse(BaseModel):
     alternative_languages: Optional[List[dict]] = None
 
 
+class BatchLanguageDetectionResponse(BaseModel):
+    """Schema for batch language detection response."""
+    results: List[LanguageDetectionResponse]
+    total_processed: int
+    total_time_ms: int
+
+
 class TranslationHistory(BaseModel):
     """Schema for translation history."""
     id: int
@@ -70,6 +112,21 @@ class TranslationHistory(BaseModel):
         from_attributes = True
 
 
+class TranslationJobStatus(BaseModel):
+    """Schema for bulk translation job status."""
+    job_id: str
+    status: str = Field(..., description="queued, running, completed or failed")
+    source_lang: str
+    target_lang: str
+    model_version: Optional[str] = None
+    total: int
+    processed: int
+    failed: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
 class TranslationFeedback(BaseModel):
     """Schema for translation feedback."""
     translation_id: int
@@ -0,0 +1,274 @@
+"""
+Acoustic fingerprints for spotting re-uploaded recordings.
+
+A fingerprint is a set of hashes built from pairs of spectrogram peaks:
+each peak is paired with the next few peaks after it, and the two
+frequencies plus the time between them are packed into one integer. Peak
+positions survive re-encoding, gain changes and moderate noise, so a copy
+of a clip shares many hashes with the original at one consistent time
+offset.
+
+Hashes live in a local SQLite inverted index (hash -> recording, offset).
+A lookup fetches the postings for a query's hashes and counts, per
+recording, how many of the query's hashes agree on the same offset.
+Recordings are removed from the index when their contribution is
+rejected, so a rejected take does not block a better one.
+"""
+
+from pathlib import Path
+from typing import Optional, Tuple
+from scipy.ndimage import maximum_filter
+import sqlite3
+import threading
+import numpy as np
+import structlog
+
+from app.core.config import settings
+from app.services.audio_preprocessing import SAMPLE_RATE, load_samples
+
+logger = structlog.get_logger(__name__)
+
+N_FFT = 1024
+HOP_LENGTH = 256  # 16 ms
+PEAK_NEIGHBOURHOOD = (15, 21)  # Frames x frequency bins a peak must dominate
+PEAKS_PER_SECOND = 30
+FAN_OUT = 5  # Later peaks each anchor is paired with
+FREQ_STEP = 2  # Frequency bins per hash step, absorbing small peak drift
+MAX_DELTA_FRAMES = 63  # Fits the 6-bit time field
+QUERY_CHUNK = 500  # Hashes per IN (...) lookup
+
+_WINDOW = np.hanning(N_FFT).astype(np.float32)
+
+
+class DuplicateRecording(Exception):
+    """Raised when a contribution matches an indexed recording."""
+    
+    def __init__(self, contribution_id: int, score: float):
+        super().__init__(f"Recording duplicates contribution {contribution_id}")
+        self.contribution_id = contribution_id
+        self.score = score
+
+
+def spectral_peaks(samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(frame, frequency bin) of the dominant local maxima of the spectrogram."""
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < N_FFT:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    
+    frames = np.lib.stride_tricks.sliding_window_view(samples, N_FFT)[::HOP_LENGTH]
+    spectrogram = np.log(np.abs(np.fft.rfft(frames * _WINDOW, axis=1)) + 1e-6)
+    
+    is_peak = (spectrogram == maximum_filter(spectrogram, size=PEAK_NEIGHBOURHOOD))
+    is_peak &= spectrogram > np.median(spectrogram) + 2.0  # Skip silence and flat noise
+    times, freqs = np.nonzero(is_peak)
+    
+    # Keep the strongest peaks so dense passages do not flood the index
+    budget = max(1, int(len(samples) / SAMPLE_RATE * PEAKS_PER_SECOND))
+    if len(times) > budget:
+        strongest = np.argpartition(spectrogram[times, freqs], -budget)[-budget:]
+        times, freqs = times[strongest], freqs[strongest]
+    
+    order = np.lexsort((freqs, times))
+    return times[order], freqs[order]
+
+
+def fingerprint(samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashes of 16 kHz mono samples and the anchor frame of each.
+    
+    Each hash packs the anchor and target frequencies (9 bits each, in
+    FREQ_STEP-bin steps) and the frame gap (6 bits).
+    """
+    times, freqs = spectral_peaks(samples)
+    hashes, offsets = [], []
+    
+    for k in range(1, FAN_OUT + 1):
+        anchor_t, target_t = times[:-k], times[k:]
+        delta = target_t - anchor_t
+        valid = (delta > 0) & (delta <= MAX_DELTA_FRAMES)
+        hashes.append(
+            (freqs[:-k][valid] // FREQ_STEP << 15) | (freqs[k:][valid] // FREQ_STEP << 6) | delta[valid]
+        )
+        offsets.append(anchor_t[valid])
+    
+    return np.concatenate(hashes).astype(np.int64), np.concatenate(offsets).astype(np.int64)
+
+
+class FingerprintIndex:
+    """SQLite inverted index from fingerprint hashes to recordings."""
+    
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            # WAL lets other worker processes read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS recordings (
+                    id INTEGER PRIMARY KEY,
+                    content_key TEXT NOT NULL UNIQUE,
+                    contribution_id INTEGER NOT NULL,
+                    hash_count INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS hashes (
+                    hash INTEGER NOT NULL,
+                    recording_id INTEGER NOT NULL,
+                    frame INTEGER NOT NULL
+                );
+                -- Covering index: lookups never touch the table
+                CREATE INDEX IF NOT EXISTS ix_hashes_hash ON hashes (hash, recording_id, frame);
+                CREATE INDEX IF NOT EXISTS ix_hashes_recording ON hashes (recording_id);
+            """)
+            self._conn = conn
+        return self._conn
+    
+    def find_by_content(self, content_key: str) -> Optional[int]:
+        """Contribution ID of a byte-identical recording."""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT contribution_id FROM recordings WHERE content_key = ?", (content_key,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def best_match(self, hashes: np.ndarray, offsets: np.ndarray) -> Optional[Tuple[int, int]]:
+        """
+        (contribution ID, aligned hash count) of the closest recording.
+        
+        Only hashes that agree on one time offset count, which separates a
+        real copy from recordings that merely share some peak pairs. Each
+        query hash counts once, so the count never exceeds len(hashes).
+        """
+        if len(hashes) == 0:
+            return None
+        
+        order = np.argsort(hashes, kind="stable")
+        sorted_hashes = hashes[order]
+        keys = np.unique(sorted_hashes).tolist()
+        
+        with self._lock:
+            conn = self._connect()
+            postings = []
+            for start in range(0, len(keys), QUERY_CHUNK):
+                chunk = keys[start:start + QUERY_CHUNK]
+                postings.extend(conn.execute(
+                    f"SELECT hash, recording_id, frame FROM hashes "
+                    f"WHERE hash IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall())
+            if not postings:
+                return None
+            
+            posted = np.array(postings, dtype=np.int64)
+            
+            # Pair every posting with every query occurrence of its hash
+            first = np.searchsorted(sorted_hashes, posted[:, 0], side="left")
+            repeats = np.searchsorted(sorted_hashes, posted[:, 0], side="right") - first
+            pair_posting = np.repeat(np.arange(len(posted)), repeats)
+            within = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+            pair_query = order[np.repeat(first, repeats) + within]
+            recording_ids = posted[pair_posting, 1]
+            deltas = posted[pair_posting, 2] - offsets[pair_query]
+            
+            # Votes per (recording, offset); peaks can land a frame apart in a
+            # shifted copy, so neighbouring offsets pool votes
+            span = int(np.abs(deltas).max()) + 2
+            cells, counts = np.unique(recording_ids * (2 * span + 1) + deltas + span, return_counts=True)
+            pooled = counts.copy()
+            for step in (-1, 1):
+                neighbour = np.searchsorted(cells, cells + step)
+                found = neighbour < len(cells)
+                found[found] = cells[neighbour[found]] == cells[found] + step
+                pooled[found] += counts[neighbour[found]]
+            
+            best = cells[np.argmax(pooled)]
+            recording_id, delta = divmod(int(best), 2 * span + 1)
+            delta -= span
+            aligned = (recording_ids == recording_id) & (np.abs(deltas - delta) <= 1)
+            count = len(np.unique(pair_query[aligned]))
+            
+            row = conn.execute(
+                "SELECT contribution_id FROM recordings WHERE id = ?", (recording_id,)
+            ).fetchone()
+        
+        return (row[0], count) if row else None
+    
+    def add(self, content_key: str, contribution_id: int, hashes: np.ndarray, offsets: np.ndarray):
+        """Index a stored recording."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO recordings (content_key, contribution_id, hash_count) "
+                    "VALUES (?, ?, ?)",
+                    (content_key, contribution_id, len(hashes))
+                )
+                if cursor.rowcount == 0:
+                    return
+                recording_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO hashes (hash, recording_id, frame) VALUES (?, ?, ?)",
+                    ((h, recording_id, o) for h, o in zip(hashes.tolist(), offsets.tolist()))
+                )
+    
+    def remove(self, contribution_id: int) -> int:
+        """Drop a contribution's recordings from the index. Returns how many were removed."""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                recording_ids = [
+                    (recording_id,) for recording_id, in conn.execute(
+                        "SELECT id FROM recordings WHERE contribution_id = ?", (contribution_id,)
+                    )
+                ]
+                conn.executemany("DELETE FROM hashes WHERE recording_id = ?", recording_ids)
+                conn.executemany("DELETE FROM recordings WHERE id = ?", recording_ids)
+        return len(recording_ids)
+
+
+class AudioDeduplicator:
+    """Fingerprints contributions and checks them against the index."""
+    
+    def __init__(self, index: FingerprintIndex):
+        self.index = index
+    
+    def check(self, path: Path, content_key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fingerprint a new recording, raising DuplicateRecording on a match.
+        
+        Audio libsndfile cannot decode only gets the byte-identical check.
+        Returns the fingerprint so it can be indexed once the contribution
+        is stored.
+        """
+        contribution_id = self.index.find_by_content(content_key)
+        if contribution_id is not None:
+            raise DuplicateRecording(contribution_id, 1.0)
+        
+        try:
+            samples = load_samples(path, content_key)
+        except RuntimeError as e:
+            logger.warning("Skipping acoustic fingerprint", content_key=content_key, error=str(e))
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        
+        hashes, offsets = fingerprint(samples)
+        match = self.index.best_match(hashes, offsets)
+        if match is not None:
+            contribution_id, aligned = match
+            score = aligned / len(hashes)
+            if aligned >= settings.FINGERPRINT_MIN_MATCHES and score >= settings.FINGERPRINT_MIN_SCORE:
+                raise DuplicateRecording(contribution_id, round(score, 3))
+        return hashes, offsets
+    
+    def add(self, content_key: str, contribution_id: int, hashes: np.ndarray, offsets: np.ndarray):
+        self.index.add(content_key, contribution_id, hashes, offsets)
+    
+    def remove(self, contribution_id: int):
+        self.index.remove(contribution_id)
+
+
+audio_deduplicator = AudioDeduplicator(FingerprintIndex(settings.FINGERPRINT_INDEX_PATH))
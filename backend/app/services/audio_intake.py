@@ -0,0 +1,214 @@
+"""
+Bounded streaming intake for uploaded audio.
+
+Uploads are copied in UPLOAD_CHUNK_SIZE pieces to a temporary file while
+being hashed, so memory use per request does not grow with the file. The
+copy stops as soon as the upload exceeds MAX_FILE_SIZE or, for WAV files,
+the byte count implied by MAX_AUDIO_DURATION at the header's byte rate.
+Processing receives the temporary file's path.
+
+Starlette has already parsed the multipart body into a spooled temporary
+file by the time an endpoint runs, so the size checks here do not limit what
+the server reads from the client; UploadSizeLimitMiddleware does that.
+"""
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from fastapi import UploadFile
+import hashlib
+import os
+import struct
+import tempfile
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Bytes of the upload kept for header parsing
+_HEADER_BYTES = 64 * 1024
+
+# Multipart framing and the other form fields around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadRejected(Exception):
+    """Raised when an upload is too large, too long or malformed."""
+    
+    def __init__(self, detail: str, status_code: int = 413):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class WavInfo:
+    """Format details read from a RIFF/WAVE header."""
+    
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+    
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if not self.byte_rate or self.data_size is None:
+            return None
+        return self.data_size / self.byte_rate
+
+
+def parse_wav_header(header: bytes) -> Optional[WavInfo]:
+    """
+    Parse the fmt and data chunks of a WAV file from its leading bytes.
+    
+    Returns None if the bytes are not a RIFF/WAVE file. A data chunk size of
+    0 or 0xFFFFFFFF (written by streaming encoders) is reported as unknown.
+    """
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+    
+    info = {}
+    offset = 12
+    while offset + 8 <= len(header):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", header, offset)
+        body = offset + 8
+        
+        if chunk_id == b"fmt ":
+            if body + 16 > len(header):
+                break
+            audio_format, channels, sample_rate, byte_rate, block_align, bits = \
+                struct.unpack_from("<HHIIHH", header, body)
+            info.update(
+                audio_format=audio_format, channels=channels, sample_rate=sample_rate,
+                byte_rate=byte_rate, block_align=block_align, bits_per_sample=bits
+            )
+        elif chunk_id == b"data":
+            info["data_offset"] = body
+            info["data_size"] = None if chunk_size in (0, 0xFFFFFFFF) else chunk_size
+            break
+        
+        # Chunks are word aligned
+        offset = body + chunk_size + (chunk_size & 1)
+    
+    if "byte_rate" not in info:
+        raise UploadRejected("Malformed WAV header: missing fmt chunk", status_code=400)
+    
+    info.setdefault("data_offset", None)
+    info.setdefault("data_size", None)
+    return WavInfo(**info)
+
+
+class AudioUpload:
+    """An upload received to a temporary file."""
+    
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+    
+    def persist(self, destination: Path) -> Path:
+        """Move the received file to permanent storage."""
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(self.path, destination)
+        self.path = destination
+        self.persisted = True
+        return destination
+
+
+@asynccontextmanager
+async def receive_audio_upload(
+    upload: UploadFile,
+    request_size: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    max_duration: Optional[float] = None
+) -> AsyncIterator[AudioUpload]:
+    """
+    Stream an upload to a temporary file within the configured limits.
+    
+    The file is removed when the block exits unless it was persisted.
+    Raises UploadRejected if a limit is exceeded.
+    """
+    max_bytes = max_bytes or settings.MAX_FILE_SIZE
+    max_duration = max_duration or settings.MAX_AUDIO_DURATION
+    
+    if request_size is not None and request_size > max_bytes + MULTIPART_OVERHEAD:
+        raise UploadRejected(f"Upload exceeds {max_bytes} bytes")
+    
+    suffix = Path(upload.filename or "").suffix.lower()
+    fd, temp_path = tempfile.mkstemp(suffix=suffix, dir=settings.UPLOAD_TEMP_DIR or None)
+    result = AudioUpload(
+        path=Path(temp_path), filename=upload.filename, content_type=upload.content_type,
+        size=0, sha256=None, wav=None, duration_seconds=None, persisted=False
+    )
+    
+    try:
+        digest = hashlib.sha256()
+        header = bytearray()
+        header_parsed = False
+        limit = max_bytes
+        
+        with os.fdopen(fd, "wb") as f:
+            while True:
+                chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                if not header_parsed:
+                    header += chunk[:_HEADER_BYTES - len(header)]
+                    if len(header) >= _HEADER_BYTES:
+                        header_parsed = True
+                        limit = _parse_header(result, bytes(header), max_bytes, max_duration)
+                
+                result.size += len(chunk)
+                if result.size > limit:
+                    raise UploadRejected(
+                        f"Upload exceeds {max_bytes} bytes or {max_duration} seconds"
+                    )
+                
+                digest.update(chunk)
+                f.write(chunk)
+        
+        if result.size == 0:
+            raise UploadRejected("Uploaded file is empty", status_code=400)
+        if not header_parsed:
+            _parse_header(result, bytes(header), max_bytes, max_duration)
+        
+        result.sha256 = digest.hexdigest()
+        if result.wav is not None:
+            if result.wav.data_size is None and result.wav.data_offset is not None:
+                result.wav.data_size = result.size - result.wav.data_offset
+            result.duration_seconds = result.wav.duration_seconds
+        
+        logger.info(
+            "Received audio upload", filename=upload.filename, size=result.size,
+            duration_seconds=result.duration_seconds
+        )
+        yield result
+        
+    except UploadRejected as e:
+        logger.warning("Rejected audio upload", filename=upload.filename, reason=e.detail)
+        raise
+    finally:
+        if not result.persisted:
+            try:
+                os.unlink(result.path)
+            except FileNotFoundError:
+                pass
+
+
+def _parse_header(
+    result: AudioUpload, header: bytes, max_bytes: int, max_duration: float
+) -> int:
+    """Read WAV details if present and return the byte limit for the upload."""
+    wav = result.wav = parse_wav_header(header)
+    if wav is None:
+        # Other containers need decoding to find their duration
+        return max_bytes
+    
+    # Reject over-long files from the declared size before reading the rest
+    if wav.duration_seconds is not None and wav.duration_seconds > max_duration:
+        raise UploadRejected(
+            f"Audio is {wav.duration_seconds:.0f}s, longer than {max_duration} seconds"
+        )
+    
+    if wav.byte_rate and wav.data_offset is not None:
+        return min(max_bytes, wav.data_offset + int(wav.byte_rate * max_duration))
+    return max_bytes
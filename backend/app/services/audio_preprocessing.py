@@ -0,0 +1,273 @@
+"""
+Shared audio decoding, resampling and feature extraction.
+
+Files are decoded block by block with soundfile and resampled as they are
+read, so a long recording never needs its original-rate samples in memory
+at once. Resampling filters are designed once per rate pair.
+
+Decoded samples and features are kept in a content-addressed store of
+`.npy` files keyed by the audio's SHA-256. Reads are memory-mapped, so
+processing the same audio again costs no decoding and no copy. The store
+is a cache under FEATURE_STORE_MAX_BYTES shared by every worker (see
+app/services/disk_budget.py): the least recently read arrays are evicted,
+and an array that is still mapped stays readable after its file is gone.
+"""
+
+from functools import lru_cache
+from math import gcd
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Union
+from scipy.signal import firwin, resample_poly
+import os
+import re
+import tempfile
+import numpy as np
+import soundfile as sf
+import structlog
+
+from app.core.config import settings
+from app.services.disk_budget import DiskBudget
+
+logger = structlog.get_logger(__name__)
+
+SAMPLE_RATE = 16000
+BLOCK_FRAMES = 64 * 1024
+
+N_FFT = 400  # 25 ms
+HOP_LENGTH = 160  # 10 ms
+N_MELS = 40
+
+PCM_FEATURES = f"pcm-{SAMPLE_RATE}"
+LOG_MEL_FEATURES = f"logmel-{N_MELS}"
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+_NAME_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_.-]*$")
+
+
+class Resampler:
+    """Polyphase resampler for one rate pair with a precomputed anti-aliasing filter."""
+    
+    def __init__(self, orig_rate: int, target_rate: int):
+        g = gcd(orig_rate, target_rate)
+        self.up, self.down = target_rate // g, orig_rate // g
+        if self.identity:
+            self.filter = None
+            self.context = 0
+            return
+        
+        # Same Kaiser-windowed low-pass resample_poly designs by default
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        self.filter = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+        
+        # Input samples each block needs from its neighbours, in whole output steps
+        self.context = -(-(half_len // self.up + 1) // self.down) * self.down
+    
+    @property
+    def identity(self) -> bool:
+        return self.up == self.down
+    
+    def __call__(self, samples: np.ndarray) -> np.ndarray:
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.identity:
+            return samples
+        return resample_poly(samples, self.up, self.down, window=self.filter).astype(np.float32)
+    
+    def stream(self, blocks: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        """
+        Resample consecutive blocks of one signal.
+        
+        Each block is resampled with enough of its neighbours around it that
+        the concatenated output equals resampling the whole signal at once.
+        """
+        if self.identity:
+            for block in blocks:
+                yield np.asarray(block, dtype=np.float32)
+            return
+        
+        buffer = np.zeros(0, dtype=np.float32)
+        offset = 0  # Input index of buffer[0]
+        emitted = 0  # Input samples already resampled
+        total = 0
+        
+        for block in blocks:
+            buffer = np.concatenate((buffer, np.asarray(block, dtype=np.float32)))
+            total += len(block)
+            
+            end = (total - self.context) // self.down * self.down
+            if end > emitted:
+                yield self._segment(buffer, offset, emitted, end)
+                emitted = end
+                keep_from = max(0, emitted - self.context)
+                buffer = buffer[keep_from - offset:]
+                offset = keep_from
+        
+        if total > emitted:
+            yield self._segment(buffer, offset, emitted, total)
+    
+    def _segment(self, buffer: np.ndarray, offset: int, start: int, end: int) -> np.ndarray:
+        seg_start = max(0, start - self.context)
+        seg_end = min(offset + len(buffer), end + self.context)
+        resampled = self(buffer[seg_start - offset:seg_end - offset])
+        
+        skip = (start - seg_start) * self.up // self.down
+        count = -(-end * self.up // self.down) - start * self.up // self.down
+        return resampled[skip:skip + count]
+
+
+@lru_cache(maxsize=None)
+def get_resampler(orig_rate: int, target_rate: int = SAMPLE_RATE) -> Resampler:
+    """Shared resampler for a rate pair."""
+    return Resampler(orig_rate, target_rate)
+
+
+def iter_audio_blocks(
+    path: Union[str, Path],
+    target_rate: int = SAMPLE_RATE,
+    block_frames: int = BLOCK_FRAMES
+) -> Iterator[np.ndarray]:
+    """Decode a file block by block as mono float32 samples at `target_rate`."""
+    with sf.SoundFile(str(path)) as f:
+        resampler = get_resampler(f.samplerate, target_rate)
+        blocks = (
+            block.mean(axis=1)
+            for block in f.blocks(block_frames, dtype="float32", always_2d=True)
+        )
+        yield from resampler.stream(blocks)
+
+
+def decode_audio(
+    path: Union[str, Path],
+    target_rate: int = SAMPLE_RATE,
+    block_frames: int = BLOCK_FRAMES
+) -> np.ndarray:
+    """Decode a whole file as mono float32 samples at `target_rate`."""
+    blocks = list(iter_audio_blocks(path, target_rate, block_frames))
+    if not blocks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(blocks)
+
+
+def mel_filterbank(sample_rate: int = SAMPLE_RATE, n_fft: int = N_FFT, n_mels: int = N_MELS) -> np.ndarray:
+    """Triangular mel filters as an (n_fft // 2 + 1, n_mels) matrix."""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+    
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+    
+    mel_points = np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = mel_to_hz(mel_points) * n_fft / sample_rate
+    freqs = np.arange(n_fft // 2 + 1)[:, None]
+    
+    lower, center, upper = bins[:-2], bins[1:-1], bins[2:]
+    rising = (freqs - lower) / np.maximum(center - lower, 1e-6)
+    falling = (upper - freqs) / np.maximum(upper - center, 1e-6)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+_MEL_FILTERS = mel_filterbank()
+_WINDOW = np.hanning(N_FFT).astype(np.float32)
+
+
+def log_mel_features(samples: np.ndarray) -> np.ndarray:
+    """
+    Mean/variance-normalized log-mel features, one row per 10 ms frame.
+    
+    Framing is a strided view, so the whole signal goes through a single
+    batched FFT and filterbank product.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < N_FFT:
+        samples = np.pad(samples, (0, N_FFT - len(samples)))
+    
+    frames = np.lib.stride_tricks.sliding_window_view(samples, N_FFT)[::HOP_LENGTH]
+    power = np.abs(np.fft.rfft(frames * _WINDOW, axis=1)) ** 2
+    features = np.log(power @ _MEL_FILTERS + 1e-10)
+    
+    features -= features.mean(axis=0)
+    features /= features.std(axis=0) + 1e-5
+    return features.astype(np.float32)
+
+
+class FeatureStore:
+    """Arrays derived from audio, stored as .npy files per content hash under a byte budget."""
+    
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.budget = DiskBudget(self.root, max_bytes, ["??/*/*.npy"])
+    
+    def path_for(self, content_key: str, name: str) -> Path:
+        if not _KEY_PATTERN.match(content_key):
+            raise ValueError(f"Invalid content key: {content_key}")
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid feature name: {name}")
+        return self.root / content_key[:2] / content_key / f"{name}.npy"
+    
+    def get(self, content_key: str, name: str) -> Optional[np.ndarray]:
+        """Memory-mapped, read-only array, or None on a miss."""
+        path = self.path_for(content_key, name)
+        try:
+            array = np.load(path, mmap_mode="r", allow_pickle=False)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Discarding unreadable feature shard", path=str(path), error=str(e))
+            return None
+        
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted since it was mapped; the mapping is still readable
+            pass
+        return array
+    
+    def put(self, content_key: str, name: str, array: np.ndarray) -> np.ndarray:
+        """Store an array atomically and return it memory-mapped."""
+        path = self.path_for(content_key, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        
+        stored = np.load(path, mmap_mode="r", allow_pickle=False)
+        self.budget.add(path.stat().st_size - replaced, keep=path)
+        return stored
+    
+    def get_or_compute(
+        self, content_key: str, name: str, compute: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        array = self.get(content_key, name)
+        if array is None:
+            array = self.put(content_key, name, compute())
+        return array
+
+
+feature_store = FeatureStore(settings.FEATURE_STORE_DIR, settings.FEATURE_STORE_MAX_BYTES)
+
+
+def load_samples(path: Union[str, Path], content_key: Optional[str] = None) -> np.ndarray:
+    """16 kHz mono samples for a file, from the feature store when `content_key` is given."""
+    if content_key is None:
+        return decode_audio(path)
+    return feature_store.get_or_compute(content_key, PCM_FEATURES, lambda: decode_audio(path))
+
+
+def load_log_mel(path: Union[str, Path], content_key: Optional[str] = None) -> np.ndarray:
+    """Log-mel features for a file, from the feature store when `content_key` is given."""
+    if content_key is None:
+        return log_mel_features(decode_audio(path))
+    return feature_store.get_or_compute(
+        content_key, LOG_MEL_FEATURES, lambda: log_mel_features(load_samples(path, content_key))
+    )
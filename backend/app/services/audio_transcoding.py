@@ -0,0 +1,253 @@
+"""
+Background transcoding of stored WAV audio to compressed formats.
+
+Each stored WAV gets two variants:
+
+- Opus (in Ogg), a lossy but speech-friendly format about a tenth of the
+  size of 16-bit PCM, served by default;
+- FLAC, a lossless copy that can stand in for the original.
+
+Variants are encoded block by block with libsndfile on a small worker
+pool, then verified by decoding them again: the FLAC must reproduce the
+original samples exactly and the Opus must decode to the same duration.
+Only then are they recorded against the original.
+
+Originals are kept by default. With TRANSCODE_KEEP_ORIGINAL turned off,
+contributions are first repointed to the FLAC copy, and the original is
+deleted only once that is committed.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Set, Tuple, Union
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+import asyncio
+import hashlib
+import tempfile
+import numpy as np
+import soundfile as sf
+import structlog
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import ContributionAudio
+from app.services.audio_preprocessing import BLOCK_FRAMES, get_resampler
+from app.services.media_store import get_media_store, local_copy
+
+logger = structlog.get_logger(__name__)
+
+WAV_CONTENT_TYPES = {"audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave"}
+VARIANT_CONTENT_TYPES = {"opus": "audio/ogg", "flac": "audio/flac"}
+
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+FLAC_SUBTYPES = {"PCM_S8", "PCM_U8", "PCM_16", "PCM_24"}
+OPUS_DURATION_TOLERANCE = 0.05  # Seconds
+
+
+class TranscodeError(Exception):
+    """Raised when an encoded variant does not match its source."""
+
+
+def encode_opus(source: Union[Path, BinaryIO], destination: Path):
+    """Encode an audio file (a path or an open file) as Ogg Opus, resampling to an Opus rate if needed."""
+    with sf.SoundFile(source if hasattr(source, "read") else str(source)) as src:
+        rate = src.samplerate
+        if rate not in OPUS_SAMPLE_RATES:
+            rate = min(r for r in OPUS_SAMPLE_RATES if r >= min(rate, 48000))
+        resampler = get_resampler(src.samplerate, rate)
+        
+        with sf.SoundFile(
+            str(destination), "w", samplerate=rate, channels=1, format="OGG", subtype="OPUS"
+        ) as dst:
+            blocks = (
+                block.mean(axis=1)
+                for block in src.blocks(BLOCK_FRAMES, dtype="float32", always_2d=True)
+            )
+            for block in resampler.stream(blocks):
+                dst.write(block)
+
+
+def encode_flac(source: Path, destination: Path) -> bool:
+    """Encode a PCM file as FLAC; returns False if its sample format has no lossless FLAC form."""
+    with sf.SoundFile(str(source)) as src:
+        if src.subtype not in FLAC_SUBTYPES:
+            return False
+        subtype = "PCM_S8" if src.subtype == "PCM_U8" else src.subtype
+        
+        with sf.SoundFile(
+            str(destination), "w", samplerate=src.samplerate, channels=src.channels,
+            format="FLAC", subtype=subtype
+        ) as dst:
+            for block in src.blocks(BLOCK_FRAMES, dtype="int32", always_2d=True):
+                dst.write(block)
+    return True
+
+
+def verify_flac(source: Path, encoded: Path):
+    """Check that a FLAC file decodes to exactly the source's samples."""
+    with sf.SoundFile(str(source)) as src, sf.SoundFile(str(encoded)) as enc:
+        if (src.samplerate, src.channels, src.frames) != (enc.samplerate, enc.channels, enc.frames):
+            raise TranscodeError("FLAC format or length differs from the source")
+        
+        while True:
+            expected = src.read(BLOCK_FRAMES, dtype="int32", always_2d=True)
+            actual = enc.read(BLOCK_FRAMES, dtype="int32", always_2d=True)
+            if not np.array_equal(expected, actual):
+                raise TranscodeError("FLAC samples differ from the source")
+            if len(expected) == 0:
+                return
+
+
+def verify_opus(source: Path, encoded: Path):
+    """Check that an Opus file decodes completely to the source's duration."""
+    source_seconds = sf.info(str(source)).duration
+    
+    frames = 0
+    with sf.SoundFile(str(encoded)) as enc:
+        for block in enc.blocks(BLOCK_FRAMES, dtype="float32"):
+            frames += len(block)
+        encoded_seconds = frames / enc.samplerate
+    
+    if abs(encoded_seconds - source_seconds) > OPUS_DURATION_TOLERANCE:
+        raise TranscodeError(
+            f"Opus duration {encoded_seconds:.3f}s differs from source {source_seconds:.3f}s"
+        )
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def transcode_file(source: Path, workdir: Path) -> Dict[str, Tuple[Path, str]]:
+    """
+    Encode and verify the variants of one file.
+    
+    Returns {variant: (path, sha256)} for every variant that verified.
+    Runs on a worker thread; libsndfile releases the GIL while encoding.
+    """
+    variants = {}
+    
+    opus_path = workdir / "audio.opus"
+    encode_opus(source, opus_path)
+    verify_opus(source, opus_path)
+    variants["opus"] = (opus_path, _sha256(opus_path))
+    
+    flac_path = workdir / "audio.flac"
+    if encode_flac(source, flac_path):
+        verify_flac(source, flac_path)
+        variants["flac"] = (flac_path, _sha256(flac_path))
+    
+    return variants
+
+
+def repoint_contributions(key: str, replacement: str) -> int:
+    """Point contributed recordings stored under `key` at `replacement`; returns the rows changed."""
+    db = SessionLocal()
+    try:
+        changed = db.execute(
+            update(ContributionAudio)
+            .where(ContributionAudio.media_key == key)
+            .values(media_key=replacement)
+        ).rowcount
+        db.commit()
+        return changed
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class AudioTranscoder:
+    """Runs transcodes on a worker pool, one at a time per media key."""
+    
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.TRANSCODE_WORKERS, thread_name_prefix="transcode"
+            )
+        return self._executor
+    
+    def submit(self, key: str):
+        """Transcode stored media in the background; repeated submits are ignored."""
+        if key in self._in_flight:
+            return
+        self._in_flight.add(key)
+        
+        task = asyncio.create_task(self._run(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _run(self, key: str):
+        try:
+            await self.transcode(key)
+        except Exception as e:
+            logger.error("Transcoding failed", key=key, error=str(e))
+        finally:
+            self._in_flight.discard(key)
+    
+    async def transcode(self, key: str) -> Dict[str, str]:
+        """Create, verify and record the compressed variants of a stored WAV."""
+        store = get_media_store()
+        variants = await store.get_variants(key)
+        
+        if not variants:
+            media = await store.stat(key)
+            if media is None or media.content_type not in WAV_CONTENT_TYPES:
+                return {}
+            
+            loop = asyncio.get_running_loop()
+            with tempfile.TemporaryDirectory(dir=settings.UPLOAD_TEMP_DIR or None) as workdir:
+                async with local_copy(store, media, Path(workdir)) as source:
+                    encoded = await loop.run_in_executor(
+                        self.executor, transcode_file, source, Path(workdir)
+                    )
+                
+                for variant, (path, sha256) in encoded.items():
+                    await store.put(path, sha256, VARIANT_CONTENT_TYPES[variant])
+                    variants[variant] = sha256
+            
+            # Only now, with verified copies stored, does anything point away from the original
+            await store.set_variants(key, variants)
+            logger.info("Transcoded media", key=key, variants=variants, original_bytes=media.size)
+        
+        # Opt-in: the lossless copy replaces the original, including one stored again later
+        if "flac" in variants and not settings.TRANSCODE_KEEP_ORIGINAL:
+            await self._replace_original(store, key, variants)
+        return variants
+    
+    async def _replace_original(self, store, key: str, variants: Dict[str, str]):
+        flac_key = variants["flac"]
+        if "opus" in variants:
+            # So the FLAC key still serves the Opus variant by default
+            await store.set_variants(flac_key, {"opus": variants["opus"]})
+        
+        # Nothing may point at the original once it is gone; a failure here keeps it
+        repointed = await run_in_threadpool(repoint_contributions, key, flac_key)
+        
+        if await store.stat(key) is not None:
+            await store.delete(key)
+            logger.info(
+                "Replaced transcoded original", key=key, flac_key=flac_key, contributions=repointed
+            )
+    
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+audio_transcoder = AudioTranscoder()
@@ -2,17 +2,59 @@
 Community service for handling user contributions and feedback.
 """
 
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from fastapi import UploadFile
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, literal_column, or_, select, tuple_, update
+from sqlalchemy.orm import Session, selectinload
+import base64
 import structlog
 import time
 
-from app.models.user import UserContribution
+from app.core.config import settings
+from app.models.language import Language
+from app.models.translation import Translation
+from app.models.user import (
+    ContributionAudio, ContributionFeedback, ContributionTranslation, UserContribution
+)
+from app.services.audio_fingerprint import DuplicateRecording, audio_deduplicator
+from app.services.audio_intake import AudioUpload
+from app.services.audio_transcoding import audio_transcoder
+from app.services.media_store import get_media_store
 from app.schemas.translation import TranslationFeedback
 
 logger = structlog.get_logger(__name__)
 
+# Typed details loaded with each contribution in one extra query per type
+_WITH_DETAILS = (
+    selectinload(UserContribution.translation),
+    selectinload(UserContribution.audio),
+    selectinload(UserContribution.feedback)
+)
+
+
+class ModerationConflict(Exception):
+    """Raised when a contribution cannot be moderated by the requesting moderator."""
+
+
+def _encode_cursor(created_at: datetime, contribution_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{contribution_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, contribution_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(contribution_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def _claim_expiry():
+    # The database clock, which the claim_expires_at comparisons also use
+    return func.now() + timedelta(seconds=settings.MODERATION_CLAIM_SECONDS)
+
 
 class CommunityService:
     """Service for community features and contributions."""
@@ -31,11 +73,21 @@ class CommunityService:
     ) -> UserContribution:
         """Contribute a translation to the community database."""
         try:
+            language_ids = self._get_language_ids([source_lang, target_lang])
+            
             contribution = UserContribution(
                 user_id=1,  # Mock user ID - in production, get from auth
                 contribution_type="translation",
-                content=f"{source_lang}:{source_text}|{target_lang}:{target_text}",
-                verification_status="pending"
+                language_id=language_ids[source_lang],
+                verification_status="pending",
+                translation=ContributionTranslation(
+                    source_lang_id=language_ids[source_lang],
+                    target_lang_id=language_ids[target_lang],
+                    source_text=source_text,
+                    target_text=target_text,
+                    cultural_context=cultural_context,
+                    contributor_notes=contributor_notes
+                )
             )
             
             self.db.add(contribution)
@@ -52,31 +104,63 @@ class CommunityService:
     
     async def contribute_audio(
         self,
-        audio_file: UploadFile,
+        audio: AudioUpload,
         text: str,
         language_code: str,
         speaker_info: Optional[str] = None,
         cultural_context: Optional[str] = None
     ) -> UserContribution:
-        """Contribute audio recording for language preservation."""
+        """
+        Contribute audio recording for language preservation.
+        
+        Raises DuplicateRecording, before anything is stored, if the
+        recording matches an earlier contribution acoustically.
+        """
         try:
-            # In production, save the audio file to storage
-            # For now, just store metadata
+            language_id = self._get_language_ids([language_code])[language_code]
+            
+            fingerprint = await run_in_threadpool(
+                audio_deduplicator.check, audio.path, audio.sha256
+            )
+            
+            # Content-addressed, so re-uploads share one stored file
+            await get_media_store().put(audio.path, audio.sha256, audio.content_type)
             
             contribution = UserContribution(
                 user_id=1,  # Mock user ID
                 contribution_type="audio",
-                content=f"audio:{audio_file.filename}|text:{text}|lang:{language_code}",
-                verification_status="pending"
+                language_id=language_id,
+                verification_status="pending",
+                audio=ContributionAudio(
+                    language_id=language_id,
+                    transcript=text,
+                    filename=audio.filename,
+                    media_key=audio.sha256,
+                    speaker_info=speaker_info,
+                    cultural_context=cultural_context
+                )
             )
             
             self.db.add(contribution)
             self.db.commit()
             self.db.refresh(contribution)
             
+            try:
+                await run_in_threadpool(
+                    audio_deduplicator.add, audio.sha256, contribution.id, *fingerprint
+                )
+            except Exception as e:
+                logger.warning(
+                    "Failed to index audio fingerprint", contribution_id=contribution.id, error=str(e)
+                )
+            
+            audio_transcoder.submit(audio.sha256)
+            
             logger.info("Audio contribution submitted", contribution_id=contribution.id)
             return contribution
             
+        except DuplicateRecording:
+            raise
         except Exception as e:
             logger.error("Failed to contribute audio", error=str(e))
             self.db.rollback()
@@ -121,14 +205,20 @@ class CommunityService:
     async def submit_feedback(self, feedback: TranslationFeedback):
         """Submit feedback for translations or other content."""
         try:
-            # In production, store feedback in database and potentially
-            # update translation confidence scores
+            # In production, potentially update translation confidence scores
+            if self.db.get(Translation, feedback.translation_id) is None:
+                raise ValueError(f"Translation not found: {feedback.translation_id}")
             
             contribution = UserContribution(
                 user_id=1,  # Mock user ID
                 contribution_type="feedback",
-                content=f"translation_id:{feedback.translation_id}|rating:{feedback.rating}|feedback:{feedback.feedback_text}",
-                verification_status="approved"
+                verification_status="approved",
+                feedback=ContributionFeedback(
+                    translation_id=feedback.translation_id,
+                    rating=feedback.rating,
+                    feedback_text=feedback.feedback_text,
+                    is_correct=feedback.is_correct
+                )
             )
             
             self.db.add(contribution)
@@ -141,19 +231,235 @@ class CommunityService:
             self.db.rollback()
             raise
     
+    def _get_language_ids(self, language_codes: List[str]) -> Dict[str, int]:
+        """Get language IDs for several codes in one query."""
+        codes = set(language_codes)
+        rows = self.db.query(Language.code, Language.id).filter(
+            Language.code.in_(codes)
+        ).all()
+        
+        language_ids = {code: language_id for code, language_id in rows}
+        missing = codes - set(language_ids)
+        if missing:
+            raise ValueError(f"Language not found: {', '.join(sorted(missing))}")
+        
+        return language_ids
+    
     async def get_contributions(
         self, limit: int = 50, offset: int = 0, status: str = "all"
     ) -> List[UserContribution]:
-        """Get community contributions."""
+        """Get community contributions, oldest first."""
         try:
-            query = self.db.query(UserContribution)
+            query = self.db.query(UserContribution).options(*_WITH_DETAILS)
             
             if status != "all":
                 query = query.filter(UserContribution.verification_status == status)
             
-            contributions = query.offset(offset).limit(limit).all()
+            contributions = query.order_by(
+                UserContribution.created_at, UserContribution.id
+            ).offset(offset).limit(limit).all()
             return contributions
             
         except Exception as e:
             logger.error("Failed to get contributions", error=str(e))
             raise
+    
+    async def get_moderation_queue(
+        self,
+        size: int = 50,
+        cursor: Optional[str] = None,
+        language_code: Optional[str] = None,
+        contribution_type: Optional[str] = None,
+        include_claimed: bool = False
+    ) -> Tuple[List[UserContribution], Optional[str]]:
+        """
+        Pending contributions, oldest first, with keyset pagination.
+        
+        Pages continue after the (created_at, id) encoded in `cursor`, so
+        each one is a range scan of the queue index however deep it is.
+        Contributions under an active claim are left out unless
+        `include_claimed` is set.
+        
+        Returns (contributions, next_cursor).
+        """
+        try:
+            query = self.db.query(UserContribution).options(*_WITH_DETAILS).filter(
+                *self._queue_filters(language_code, contribution_type)
+            )
+            if not include_claimed:
+                query = query.filter(or_(
+                    UserContribution.claim_expires_at.is_(None),
+                    UserContribution.claim_expires_at < func.now()
+                ))
+            if cursor:
+                created_at, contribution_id = _decode_cursor(cursor)
+                query = query.filter(
+                    tuple_(UserContribution.created_at, UserContribution.id)
+                    > tuple_(created_at, contribution_id)
+                )
+            
+            rows = query.order_by(
+                UserContribution.created_at, UserContribution.id
+            ).limit(size + 1).all()
+            
+            contributions = rows[:size]
+            next_cursor = None
+            if len(rows) > size:
+                last = contributions[-1]
+                next_cursor = _encode_cursor(last.created_at, last.id)
+            return contributions, next_cursor
+            
+        except Exception as e:
+            logger.error("Failed to get moderation queue", error=str(e))
+            raise
+    
+    async def claim_contributions(
+        self,
+        moderator_id: int,
+        limit: int = 10,
+        language_code: Optional[str] = None,
+        contribution_type: Optional[str] = None
+    ) -> Tuple[List[UserContribution], Optional[datetime]]:
+        """
+        Claim the oldest unclaimed pending contributions for a moderator.
+        
+        Candidates are locked with FOR UPDATE SKIP LOCKED, so moderators
+        claiming at the same time get disjoint sets instead of waiting on
+        each other. A claim lasts MODERATION_CLAIM_SECONDS; claiming again
+        renews the moderator's own claims.
+        
+        Returns (contributions, claim expiry).
+        """
+        try:
+            claimed = self.db.execute(
+                self._claim_statement(moderator_id, limit, language_code, contribution_type)
+            ).all()
+            self.db.commit()
+            
+            if not claimed:
+                return [], None
+            
+            contributions = self.db.query(UserContribution).options(*_WITH_DETAILS).filter(
+                UserContribution.id.in_([row.id for row in claimed])
+            ).order_by(UserContribution.created_at, UserContribution.id).all()
+            
+            logger.info(
+                "Contributions claimed", moderator_id=moderator_id, count=len(contributions)
+            )
+            return contributions, claimed[0].claim_expires_at
+            
+        except Exception as e:
+            logger.error("Failed to claim contributions", error=str(e))
+            self.db.rollback()
+            raise
+    
+    async def moderate_contribution(
+        self,
+        contribution_id: int,
+        moderator_id: int,
+        status: str,
+        notes: Optional[str] = None
+    ) -> Optional[UserContribution]:
+        """
+        Approve or reject a pending contribution and release its claim.
+        
+        Raises ModerationConflict if it was already decided or another
+        moderator holds an active claim on it; returns None if it does not
+        exist.
+        """
+        try:
+            decided = self.db.execute(
+                update(UserContribution)
+                .where(
+                    UserContribution.id == contribution_id,
+                    UserContribution.verification_status == "pending",
+                    or_(
+                        UserContribution.claimed_by.is_(None),
+                        UserContribution.claimed_by == moderator_id,
+                        UserContribution.claim_expires_at < func.now()
+                    )
+                )
+                .values(
+                    verification_status=status,
+                    verified_by=moderator_id,
+                    verification_notes=notes,
+                    claimed_by=None,
+                    claim_expires_at=None
+                )
+                .execution_options(synchronize_session=False)
+            )
+            
+            if decided.rowcount == 0:
+                contribution = self.db.get(UserContribution, contribution_id)
+                if contribution is None:
+                    return None
+                if contribution.verification_status != "pending":
+                    raise ModerationConflict(
+                        f"Contribution {contribution_id} is already {contribution.verification_status}"
+                    )
+                raise ModerationConflict(
+                    f"Contribution {contribution_id} is claimed by another moderator"
+                )
+            
+            self.db.commit()
+            logger.info(
+                "Contribution moderated",
+                contribution_id=contribution_id, moderator_id=moderator_id, status=status
+            )
+            contribution = self.db.query(UserContribution).options(*_WITH_DETAILS).filter(
+                UserContribution.id == contribution_id
+            ).one()
+            
+            if status == "rejected" and contribution.contribution_type == "audio":
+                # A rejected recording should not block a better take as a duplicate
+                try:
+                    await run_in_threadpool(audio_deduplicator.remove, contribution_id)
+                except Exception as e:
+                    logger.warning(
+                        "Failed to remove audio fingerprint", contribution_id=contribution_id, error=str(e)
+                    )
+            return contribution
+            
+        except ModerationConflict:
+            raise
+        except Exception as e:
+            logger.error("Failed to moderate contribution", error=str(e))
+            self.db.rollback()
+            raise
+    
+    def _claim_statement(
+        self,
+        moderator_id: int,
+        limit: int,
+        language_code: Optional[str],
+        contribution_type: Optional[str]
+    ):
+        candidates = (
+            select(UserContribution.id)
+            .where(*self._queue_filters(language_code, contribution_type))
+            .where(or_(
+                UserContribution.claim_expires_at.is_(None),
+                UserContribution.claim_expires_at < func.now(),
+                UserContribution.claimed_by == moderator_id
+            ))
+            .order_by(UserContribution.created_at, UserContribution.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return (
+            update(UserContribution)
+            .where(UserContribution.id.in_(candidates.scalar_subquery()))
+            .values(claimed_by=moderator_id, claim_expires_at=_claim_expiry())
+            .returning(UserContribution.id, UserContribution.claim_expires_at)
+            .execution_options(synchronize_session=False)
+        )
+    
+    def _queue_filters(self, language_code: Optional[str], contribution_type: Optional[str]) -> list:
+        # Inlined rather than bound, so even a generic plan matches the queue index's predicate
+        filters = [UserContribution.verification_status == literal_column("'pending'")]
+        if language_code:
+            language_id = self._get_language_ids([language_code])[language_code]
+            filters.append(UserContribution.language_id == language_id)
+        if contribution_type:
+            filters.append(UserContribution.contribution_type == contribution_type)
+        return filters
@@ -0,0 +1,274 @@
+"""
+One-time migration of pipe-delimited contributions to the typed tables.
+
+Before the typed tables existed, contribution details were packed into
+`user_contributions.content`:
+
+- translation: "{source_lang}:{source_text}|{target_lang}:{target_text}"
+- audio: "audio:{filename}|text:{text}|lang:{code}" plus "|sha256:{key}"
+- feedback: "translation_id:{id}|rating:{rating}|feedback:{text}"
+
+Rows are streamed in primary-key order and each batch is committed on its
+own, so the migration never holds a long transaction and can be stopped and
+rerun: rows that already have typed details are not read again. Rows that
+cannot be parsed unambiguously keep their content and are logged for manual
+review. The legacy content is left in place either way.
+
+`prepare` also adds the columns and indexes later changes to
+user_contributions rely on, since create_all does not alter existing
+tables.
+
+Usage: python -m app.services.contribution_migration
+"""
+
+from typing import Dict, List, Optional, Set
+from sqlalchemy import exists, insert, text, update
+from sqlalchemy.orm import Session
+import argparse
+import re
+import structlog
+
+from app.core.database import Base
+from app.models.language import Language
+from app.models.translation import Translation
+from app.models.user import (
+    ContributionAudio, ContributionFeedback, ContributionTranslation, UserContribution
+)
+
+logger = structlog.get_logger(__name__)
+
+TYPED_TABLES = (ContributionTranslation, ContributionAudio, ContributionFeedback)
+
+_AUDIO_PATTERN = re.compile(
+    r"^audio:(?P<filename>.*?)\|text:(?P<text>.*)\|lang:(?P<lang>[^|:]+)"
+    r"(?:\|sha256:(?P<sha256>[0-9a-f]{64}))?$",
+    re.DOTALL
+)
+_FEEDBACK_PATTERN = re.compile(
+    r"^translation_id:(?P<translation_id>\d+)\|rating:(?P<rating>[1-5])\|feedback:(?P<text>.*)$",
+    re.DOTALL
+)
+_LANGUAGE_BOUNDARY = re.compile(r"\|([^|:]+):")
+
+
+def parse_translation(content: str, language_codes: Set[str]) -> Optional[dict]:
+    """
+    Split a legacy translation into its languages and texts.
+    
+    Either text may itself contain "|" or ":", so the target is found as the
+    one "|{code}:" whose code is a known language. None if there is not
+    exactly one such boundary.
+    """
+    source_lang, separator, rest = content.partition(":")
+    if not separator or source_lang not in language_codes:
+        return None
+    
+    boundaries = [
+        match for match in _LANGUAGE_BOUNDARY.finditer(rest)
+        if match.group(1) in language_codes
+    ]
+    if len(boundaries) != 1:
+        return None
+    
+    boundary = boundaries[0]
+    return {
+        "source_lang": source_lang,
+        "source_text": rest[:boundary.start()],
+        "target_lang": boundary.group(1),
+        "target_text": rest[boundary.end():]
+    }
+
+
+def parse_audio(content: str) -> Optional[dict]:
+    """Split a legacy audio contribution into filename, transcript, language and media key."""
+    match = _AUDIO_PATTERN.match(content)
+    return match.groupdict() if match else None
+
+
+def parse_feedback(content: str) -> Optional[dict]:
+    """Split legacy feedback into translation ID, rating and text."""
+    match = _FEEDBACK_PATTERN.match(content)
+    if not match:
+        return None
+    
+    feedback_text = match.group("text")
+    return {
+        "translation_id": int(match.group("translation_id")),
+        "rating": int(match.group("rating")),
+        # Missing feedback text was formatted as "None"
+        "feedback_text": None if feedback_text == "None" else feedback_text
+    }
+
+
+class ContributionMigrator:
+    """Moves legacy contribution content into the typed tables, batch by batch."""
+    
+    def __init__(self, db: Session, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+    
+    def prepare(self):
+        """
+        Bring an existing user_contributions table up to date.
+        
+        Creates the typed tables, relaxes the legacy column (new rows leave it
+        empty) and adds the moderation claim columns and queue index.
+        """
+        bind = self.db.get_bind()
+        Base.metadata.create_all(bind=bind, tables=[model.__table__ for model in TYPED_TABLES])
+        
+        self.db.execute(text("ALTER TABLE user_contributions ALTER COLUMN content DROP NOT NULL"))
+        self.db.execute(text(
+            "ALTER TABLE user_contributions "
+            "ADD COLUMN IF NOT EXISTS claimed_by INTEGER REFERENCES users (id), "
+            "ADD COLUMN IF NOT EXISTS claim_expires_at TIMESTAMP WITH TIME ZONE"
+        ))
+        self.db.commit()
+        
+        for index in UserContribution.__table__.indexes:
+            index.create(bind=bind, checkfirst=True)
+    
+    def run(self) -> Dict[str, int]:
+        """
+        Migrate every legacy row that has no typed details yet.
+        
+        Returns counts of migrated and skipped rows.
+        """
+        counts = {"migrated": 0, "skipped": 0}
+        language_ids = dict(self.db.query(Language.code, Language.id).all())
+        last_id = 0
+        
+        try:
+            while True:
+                rows = self._next_batch(last_id)
+                if not rows:
+                    break
+                
+                self._migrate_batch(rows, language_ids, counts)
+                self.db.commit()
+                last_id = rows[-1].id
+                logger.info("Migrated contribution batch", last_id=last_id, **counts)
+            
+            logger.info("Contribution migration finished", **counts)
+            return counts
+            
+        except Exception as e:
+            logger.error("Contribution migration failed", last_id=last_id, error=str(e))
+            self.db.rollback()
+            raise
+    
+    def _next_batch(self, last_id: int) -> List:
+        # Keyset on the primary key, so each batch is an index range scan
+        query = self.db.query(
+            UserContribution.id,
+            UserContribution.contribution_type,
+            UserContribution.content,
+            UserContribution.language_id
+        ).filter(
+            UserContribution.id > last_id,
+            UserContribution.content.isnot(None)
+        )
+        for model in TYPED_TABLES:
+            query = query.filter(~exists().where(model.contribution_id == UserContribution.id))
+        
+        return query.order_by(UserContribution.id).limit(self.batch_size).all()
+    
+    def _migrate_batch(self, rows: List, language_ids: Dict[str, int], counts: Dict[str, int]):
+        typed: Dict[type, List[dict]] = {model: [] for model in TYPED_TABLES}
+        language_updates = []
+        
+        language_codes = set(language_ids)
+        
+        # Feedback must point at an existing translation; check the whole batch at once
+        feedback = {
+            row.id: parse_feedback(row.content)
+            for row in rows if row.contribution_type == "feedback"
+        }
+        targets = {parsed["translation_id"] for parsed in feedback.values() if parsed}
+        known_translations = {
+            translation_id for translation_id, in self.db.query(Translation.id).filter(
+                Translation.id.in_(targets)
+            )
+        } if targets else set()
+        
+        for row in rows:
+            language_id = None
+            
+            if row.contribution_type == "translation":
+                parsed = parse_translation(row.content, language_codes)
+                if parsed is not None:
+                    language_id = language_ids[parsed["source_lang"]]
+                    typed[ContributionTranslation].append({
+                        "contribution_id": row.id,
+                        "source_lang_id": language_id,
+                        "target_lang_id": language_ids[parsed["target_lang"]],
+                        "source_text": parsed["source_text"],
+                        "target_text": parsed["target_text"]
+                    })
+                    
+            elif row.contribution_type == "audio":
+                parsed = parse_audio(row.content)
+                if parsed is not None and parsed["lang"] in language_ids:
+                    language_id = language_ids[parsed["lang"]]
+                    typed[ContributionAudio].append({
+                        "contribution_id": row.id,
+                        "language_id": language_id,
+                        "transcript": parsed["text"],
+                        "filename": parsed["filename"][:255] or None,
+                        "media_key": parsed["sha256"]
+                    })
+                else:
+                    parsed = None
+                    
+            elif row.contribution_type == "feedback":
+                parsed = feedback[row.id]
+                if parsed is not None and parsed["translation_id"] in known_translations:
+                    typed[ContributionFeedback].append({"contribution_id": row.id, **parsed})
+                else:
+                    parsed = None
+                    
+            else:
+                parsed = None
+            
+            if parsed is None:
+                counts["skipped"] += 1
+                logger.warning(
+                    "Skipping unparseable contribution",
+                    contribution_id=row.id, contribution_type=row.contribution_type
+                )
+                continue
+            
+            counts["migrated"] += 1
+            if language_id is not None and row.language_id is None:
+                language_updates.append({"id": row.id, "language_id": language_id})
+        
+        for model, values in typed.items():
+            if values:
+                self.db.execute(insert(model), values)
+        if language_updates:
+            self.db.execute(update(UserContribution), language_updates)
+
+
+def main():
+    from app.core.database import SessionLocal
+    from app.core.logging import setup_logging
+    
+    parser = argparse.ArgumentParser(
+        description="Move pipe-delimited contribution content into the typed tables"
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    
+    setup_logging()
+    db = SessionLocal()
+    try:
+        migrator = ContributionMigrator(db, batch_size=args.batch_size)
+        migrator.prepare()
+        counts = migrator.run()
+        print(f"Migrated {counts['migrated']}, skipped {counts['skipped']} contributions")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Byte budget for a cache directory shared by several worker processes.
+
+The directory's running total is kept in a `.usage` file that is only read
+and written under an exclusive flock on `.lock`, so every worker sees the
+bytes the others have written. When a write takes the total past the
+budget, the directory is rescanned and the least recently used files
+(oldest mtime; caches touch files they serve) are deleted down to
+LOW_WATER of the budget. The scan also corrects the total for files that
+were added or removed behind the cache's back.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+import fcntl
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Evict below the budget so every write near the limit does not rescan
+LOW_WATER = 0.9
+
+
+class DiskBudget:
+    """Cross-process LRU byte budget over the files matching `patterns` under `root`."""
+    
+    def __init__(self, root: Path, max_bytes: int, patterns: Sequence[str]):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.patterns = tuple(patterns)
+    
+    def add(self, delta: int, keep: Optional[Path] = None) -> int:
+        """
+        Record `delta` bytes written and evict if the budget is exceeded.
+        
+        `keep` is never evicted, so a file just written survives its own
+        write. Returns the directory's total after any eviction.
+        """
+        with self._locked():
+            total = self._read_usage()
+            if total is None or total + delta > self.max_bytes:
+                total = self._evict(keep)
+            else:
+                total += delta
+            self._write_usage(total)
+        return total
+    
+    def usage(self) -> int:
+        """Current total, rescanning if it has not been recorded yet."""
+        with self._locked():
+            total = self._read_usage()
+            if total is None:
+                total = self._evict(None)
+                self._write_usage(total)
+        return total
+    
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+    
+    def _read_usage(self) -> Optional[int]:
+        try:
+            return int((self.root / ".usage").read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def _write_usage(self, total: int):
+        (self.root / ".usage").write_text(str(total))
+    
+    def _files(self) -> List[Tuple[float, int, Path]]:
+        files = []
+        for pattern in self.patterns:
+            for path in self.root.glob(pattern):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return sorted(files)
+    
+    def _evict(self, keep: Optional[Path]) -> int:
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return total
+        
+        target = int(self.max_bytes * LOW_WATER)
+        evicted = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        
+        logger.info("Evicted cache files", root=str(self.root), files=evicted, total_bytes=total)
+        return total
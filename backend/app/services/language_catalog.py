@@ -0,0 +1,197 @@
+"""
+Immutable in-memory snapshot of the language catalog.
+
+The catalog is a handful of rows that change only through the admin
+endpoints, so reads are served from a snapshot built once per change instead
+of querying Postgres per request. Each snapshot carries precomputed tier,
+family and status indexes and a strong ETag derived from its content.
+Workers announce rebuilds over Redis pub/sub so peers drop their stale copy.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+from types import MappingProxyType
+from sqlalchemy.orm import Session
+import asyncio
+import hashlib
+import json
+import uuid
+import structlog
+
+from app.core.config import settings
+from app.core.database import get_redis
+from app.models.language import Language as LanguageModel
+from app.schemas.language import Language
+from app.services.text_normalization import reset_text_normalizer
+
+logger = structlog.get_logger(__name__)
+
+# Rendered bodies kept per snapshot; filter values are client supplied
+_MAX_RENDERED = 1024
+
+
+def _index(languages: Tuple[Language, ...], attribute: str) -> MappingProxyType:
+    groups: Dict = {}
+    for language in languages:
+        groups.setdefault(getattr(language, attribute), []).append(language)
+    return MappingProxyType({key: tuple(group) for key, group in groups.items()})
+
+
+class LanguageSnapshot:
+    """Read-only view of the active languages at one point in time."""
+    
+    def __init__(self, languages: List[Language], version: int):
+        self.version = version
+        self.languages: Tuple[Language, ...] = tuple(sorted(languages, key=lambda l: l.id))
+        self.by_code = MappingProxyType({l.code: l for l in self.languages})
+        self.by_tier = _index(self.languages, "priority_tier")
+        self.by_family = _index(self.languages, "family")
+        self.by_status = _index(self.languages, "status")
+        
+        self._documents = MappingProxyType({
+            l.code: l.model_dump(mode="json") for l in self.languages
+        })
+        canonical = json.dumps(
+            [self._documents[l.code] for l in self.languages],
+            sort_keys=True, separators=(",", ":")
+        )
+        self.etag = '"' + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32] + '"'
+        self._rendered: Dict[tuple, bytes] = {}
+    
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header value covers this snapshot."""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+    
+    def filter(
+        self,
+        tier: Optional[int] = None,
+        status: Optional[str] = None,
+        family: Optional[str] = None
+    ) -> Tuple[Language, ...]:
+        """Languages matching all given filters, starting from the narrowest index."""
+        groups = []
+        if tier is not None:
+            groups.append(self.by_tier.get(tier, ()))
+        if family:
+            groups.append(self.by_family.get(family, ()))
+        if status:
+            groups.append(self.by_status.get(status, ()))
+        if not groups:
+            return self.languages
+        
+        candidates = min(groups, key=len)
+        if len(groups) > 1:
+            candidates = tuple(
+                l for l in candidates
+                if (tier is None or l.priority_tier == tier)
+                and (not family or l.family == family)
+                and (not status or l.status == status)
+            )
+        return candidates
+    
+    def document(self, language: Language) -> dict:
+        """Precomputed JSON-ready form of a language."""
+        return self._documents[language.code]
+    
+    def render(self, key: tuple, build: Callable[[], object]) -> bytes:
+        """Serialize `build()` once per snapshot and key."""
+        body = self._rendered.get(key)
+        if body is None:
+            body = json.dumps(build(), separators=(",", ":")).encode("utf-8")
+            if len(self._rendered) < _MAX_RENDERED:
+                self._rendered[key] = body
+        return body
+
+
+class LanguageCatalog:
+    """Holds the current snapshot and keeps workers' copies in sync."""
+    
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.instance_id = uuid.uuid4().hex
+        self._snapshot: Optional[LanguageSnapshot] = None
+        self._version = 0
+    
+    def get(self, db: Session) -> LanguageSnapshot:
+        """Current snapshot, building it from the database if missing or stale."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.rebuild(db)
+        return snapshot
+    
+    def rebuild(self, db: Session) -> LanguageSnapshot:
+        """Build a fresh snapshot and swap it in."""
+        rows = db.query(LanguageModel).filter(LanguageModel.is_active == True).all()
+        self._version += 1
+        snapshot = LanguageSnapshot(
+            [Language.model_validate(row) for row in rows], self._version
+        )
+        self._snapshot = snapshot
+        logger.info(
+            "Built language catalog snapshot",
+            version=snapshot.version, languages=len(snapshot.languages), etag=snapshot.etag
+        )
+        return snapshot
+    
+    def invalidate(self):
+        """Drop the current snapshot; the next read rebuilds it."""
+        self._snapshot = None
+    
+    async def publish(self, snapshot: LanguageSnapshot):
+        """Tell other workers the catalog changed."""
+        redis_client = get_redis()
+        if redis_client is None:
+            return
+        
+        try:
+            await redis_client.publish(
+                self.channel,
+                json.dumps({"origin": self.instance_id, "etag": snapshot.etag})
+            )
+        except Exception as e:
+            # Peers keep serving their snapshot until their next change
+            logger.warning("Failed to publish language catalog change", error=str(e))
+    
+    async def listen(self):
+        """Invalidate the local snapshot when another worker announces a change."""
+        while True:
+            redis_client = get_redis()
+            if redis_client is None:
+                return
+            
+            try:
+                pubsub = redis_client.pubsub()
+                await pubsub.subscribe(self.channel)
+                # Changes made while unsubscribed would otherwise be missed
+                self.invalidate()
+                
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self._handle_message(message.get("data"))
+                    
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Language catalog subscription lost", error=str(e))
+                await asyncio.sleep(5)
+    
+    def _handle_message(self, data):
+        try:
+            event = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        
+        if event.get("origin") == self.instance_id:
+            return
+        
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.etag != event.get("etag"):
+            logger.info("Language catalog changed on another worker", etag=event.get("etag"))
+            self.invalidate()
+            reset_text_normalizer()
+
+
+language_catalog = LanguageCatalog(settings.LANGUAGE_CATALOG_CHANNEL)
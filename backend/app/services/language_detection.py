@@ -2,12 +2,21 @@
 Language detection service.
 """
 
-from typing import List, Dict
+from collections import OrderedDict
+from typing import List, Dict, Optional, Union
 from sqlalchemy.orm import Session
+import threading
 import structlog
 
+from app.core.config import settings
+from app.services.language_identification import get_language_identifier
+from app.services.text_normalization import NormalizedText, get_text_normalizer
+
 logger = structlog.get_logger(__name__)
 
+# ISO 639-2 code reported when no supported language is recognized
+UNDETERMINED_LANGUAGE = "und"
+
 
 class LanguageDetectionResult:
     """Result of language detection."""
@@ -18,78 +27,157 @@ class LanguageDetectionResult:
         self.alternatives = alternatives or []
 
 
+class DetectionCache:
+    """Thread-safe LRU of detection results keyed by normalized text digest."""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, LanguageDetectionResult]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, digest: str) -> Optional[LanguageDetectionResult]:
+        with self._lock:
+            result = self._entries.get(digest)
+            if result is not None:
+                self._entries.move_to_end(digest)
+            return result
+    
+    def put(self, digest: str, result: LanguageDetectionResult):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[digest] = result
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+detection_cache = DetectionCache(settings.DETECTION_CACHE_SIZE)
+
+
 class LanguageDetectionService:
     """Service for detecting language of input text."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session] = None):
         self.db = db
     
-    async def detect_language(self, text: str) -> LanguageDetectionResult:
+    async def detect_language(self, text: Union[str, NormalizedText]) -> LanguageDetectionResult:
         """
         Detect the language of the input text.
-        This is a mock implementation - in production, integrate with:
-        - langdetect library
-        - fastText language identification
-        - Custom trained models
+        
+        Uses the character n-gram model when one has been trained (see
+        ml-pipeline/src/language_id_training.py) and falls back to keyword
+        matching otherwise. Results are cached by normalized text digest.
         """
         try:
-            # Mock language detection logic
-            text_lower = text.lower()
+            normalized = get_text_normalizer(self.db).ensure(text)
             
-            # Simple keyword-based detection for demonstration
-            swahili_keywords = ["hujambo", "asante", "kwaheri", "habari", "mzuri", "sana"]
-            kikuyu_keywords = ["ni wega", "wendo", "mukinyu", "gikuyu"]
-            luo_keywords = ["oyawore", "adhi", "dholuo", "joluo"]
+            identifier = get_language_identifier()
+            if identifier is None:
+                return self._detect_by_keywords(normalized)
             
-            swahili_score = sum(1 for word in swahili_keywords if word in text_lower)
-            kikuyu_score = sum(1 for word in kikuyu_keywords if word in text_lower)
-            luo_score = sum(1 for word in luo_keywords if word in text_lower)
+            result = detection_cache.get(normalized.digest)
+            if result is None:
+                result = self._to_result(identifier.predict(normalized.key))
+                detection_cache.put(normalized.digest, result)
+            return result
             
-            # Determine detected language
-            if swahili_score > 0:
-                return LanguageDetectionResult(
-                    language="sw",
-                    confidence=0.8,
-                    alternatives=[
-                        {"language": "ki", "confidence": 0.1},
-                        {"language": "luo", "confidence": 0.1}
-                    ]
-                )
-            elif kikuyu_score > 0:
-                return LanguageDetectionResult(
-                    language="ki",
-                    confidence=0.8,
-                    alternatives=[
-                        {"language": "sw", "confidence": 0.1},
-                        {"language": "luo", "confidence": 0.1}
-                    ]
-                )
-            elif luo_score > 0:
-                return LanguageDetectionResult(
-                    language="luo",
-                    confidence=0.8,
-                    alternatives=[
-                        {"language": "sw", "confidence": 0.1},
-                        {"language": "ki", "confidence": 0.1}
-                    ]
-                )
-            else:
-                # Default to English if no Kenyan language detected
-                return LanguageDetectionResult(
-                    language="en",
-                    confidence=0.6,
-                    alternatives=[
-                        {"language": "sw", "confidence": 0.2},
-                        {"language": "ki", "confidence": 0.1},
-                        {"language": "luo", "confidence": 0.1}
-                    ]
-                )
-                
         except Exception as e:
             logger.error("Language detection failed", error=str(e))
-            # Return default result on error
+            return LanguageDetectionResult(language=UNDETERMINED_LANGUAGE, confidence=0.0)
+    
+    async def detect_languages(
+        self, texts: List[Union[str, NormalizedText]]
+    ) -> List[LanguageDetectionResult]:
+        """
+        Detect the language of many texts at once.
+        
+        With a trained model, texts missing from the detection cache are
+        featurized into one sparse matrix and scored together; repeated
+        texts within the batch are scored once.
+        """
+        try:
+            normalizer = get_text_normalizer(self.db)
+            normalized = [normalizer.ensure(text) for text in texts]
+            
+            identifier = get_language_identifier()
+            if identifier is None:
+                return [self._detect_by_keywords(item) for item in normalized]
+            
+            results = {}
+            misses = {}
+            for item in normalized:
+                if item.digest in results or item.digest in misses:
+                    continue
+                cached = detection_cache.get(item.digest)
+                if cached is not None:
+                    results[item.digest] = cached
+                else:
+                    misses[item.digest] = item.key
+            
+            if misses:
+                predictions = identifier.predict_batch(list(misses.values()))
+                for digest, prediction in zip(misses, predictions):
+                    results[digest] = self._to_result(prediction)
+                    detection_cache.put(digest, results[digest])
+            
+            return [results[item.digest] for item in normalized]
+            
+        except Exception as e:
+            logger.error("Batch language detection failed", error=str(e))
+            raise
+    
+    def _to_result(self, predictions: List[Dict]) -> LanguageDetectionResult:
+        return LanguageDetectionResult(
+            language=predictions[0]["language"],
+            confidence=predictions[0]["confidence"],
+            alternatives=predictions[1:]
+        )
+    
+    def _detect_by_keywords(self, normalized: NormalizedText) -> LanguageDetectionResult:
+        """Keyword-based detection used when no trained model is available."""
+        text_lower = normalized.key
+        
+        # Simple keyword-based detection for demonstration
+        swahili_keywords = ["hujambo", "asante", "kwaheri", "habari", "mzuri", "sana"]
+        kikuyu_keywords = ["ni wega", "wendo", "mukinyu", "gikuyu"]
+        luo_keywords = ["oyawore", "adhi", "dholuo", "joluo"]
+        
+        swahili_score = sum(1 for word in swahili_keywords if word in text_lower)
+        kikuyu_score = sum(1 for word in kikuyu_keywords if word in text_lower)
+        luo_score = sum(1 for word in luo_keywords if word in text_lower)
+        
+        # Determine detected language
+        if swahili_score > 0:
+            return LanguageDetectionResult(
+                language="sw",
+                confidence=0.8,
+                alternatives=[
+                    {"language": "ki", "confidence": 0.1},
+                    {"language": "luo", "confidence": 0.1}
+                ]
+            )
+        elif kikuyu_score > 0:
+            return LanguageDetectionResult(
+                language="ki",
+                confidence=0.8,
+                alternatives=[
+                    {"language": "sw", "confidence": 0.1},
+                    {"language": "luo", "confidence": 0.1}
+                ]
+            )
+        elif luo_score > 0:
             return LanguageDetectionResult(
-                language="en",
-                confidence=0.5,
-                alternatives=[]
+                language="luo",
+                confidence=0.8,
+                alternatives=[
+                    {"language": "sw", "confidence": 0.1},
+                    {"language": "ki", "confidence": 0.1}
+                ]
             )
+        else:
+            return LanguageDetectionResult(language=UNDETERMINED_LANGUAGE, confidence=0.0)
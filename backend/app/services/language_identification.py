@@ -0,0 +1,201 @@
+"""
+Character n-gram language identification model.
+
+The model is a multinomial naive Bayes classifier over hashed character
+n-grams, trained by ml-pipeline/src/language_id_training.py. It is stored as
+a directory of .npy arrays plus a JSON metadata file and memory-mapped at
+load, so worker processes share the pages.
+"""
+
+from pathlib import Path
+from typing import List, Optional
+import json
+import numpy as np
+import scipy.sparse as sp
+import structlog
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Hashing constants - must match ml-pipeline/src/language_id_training.py
+_HASH_MULTIPLIER = np.uint64(1000003)
+_HASH_SHIFT = np.uint64(29)
+
+
+def hash_ngrams(text: str, ngram_range: tuple, n_buckets: int) -> np.ndarray:
+    """
+    Hash every character n-gram of `text` into a bucket index.
+    
+    The text is padded with a space on each side so word boundaries form
+    n-grams of their own. Hashing is a vectorized polynomial rolling hash
+    over Unicode code points.
+    """
+    codes = _code_points(f" {text} ")
+    return _hash_code_points(codes, ngram_range, n_buckets, len(codes))
+
+
+def _code_points(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+
+def _hash_code_points(codes: np.ndarray, ngram_range: tuple, n_buckets: int, max_starts: int) -> np.ndarray:
+    # Only n-grams starting in the first `max_starts` positions are hashed
+    buckets = []
+    
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        count = min(len(codes) - n + 1, max_starts)
+        if count <= 0:
+            break
+        
+        hashes = np.full(count, n, dtype=np.uint64)
+        for k in range(n):
+            hashes = hashes * _HASH_MULTIPLIER + codes[k:k + count]
+        hashes ^= hashes >> _HASH_SHIFT
+        buckets.append(hashes % np.uint64(n_buckets))
+    
+    if not buckets:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(buckets).astype(np.int64)
+
+
+class LanguageIdentifier:
+    """Memory-mapped character n-gram naive Bayes classifier."""
+    
+    def __init__(self, model_dir: str, window_chars: int = 256, margin: float = 4.6):
+        path = Path(model_dir)
+        self.window_chars = window_chars
+        self.margin = margin  # Log-odds lead needed to stop early (4.6 ~ 100:1)
+        with open(path / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        
+        self.labels: List[str] = meta["labels"]
+        self.n_buckets: int = meta["n_buckets"]
+        self.ngram_range = tuple(meta["ngram_range"])
+        self.temperature: float = meta.get("temperature", 1.0)
+        self.version: str = meta.get("version", "unknown")
+        
+        # (n_buckets, n_labels) log P(ngram | language)
+        self.log_probs = np.load(path / "log_probs.npy", mmap_mode="r")
+        self.log_priors = np.load(path / "log_priors.npy")
+    
+    def probabilities(self, scores: np.ndarray) -> np.ndarray:
+        """Temperature-calibrated softmax over log posteriors."""
+        scaled = scores / self.temperature
+        scaled = scaled - scaled.max(axis=-1, keepdims=True)
+        exp = np.exp(scaled)
+        return exp / exp.sum(axis=-1, keepdims=True)
+    
+    def featurize_batch(self, texts: List[str]) -> sp.csr_matrix:
+        """Build a (n_texts, n_buckets) sparse matrix of n-gram counts."""
+        return self._count_matrix([
+            hash_ngrams(text, self.ngram_range, self.n_buckets) for text in texts
+        ])
+    
+    def _count_matrix(self, buckets: List[np.ndarray]) -> sp.csr_matrix:
+        lengths = np.fromiter((len(b) for b in buckets), dtype=np.int64, count=len(buckets))
+        
+        rows = np.repeat(np.arange(len(buckets)), lengths)
+        cols = np.concatenate(buckets) if buckets else np.zeros(0, dtype=np.int64)
+        data = np.ones(len(cols), dtype=np.float32)
+        
+        # Duplicate (row, bucket) entries are summed into counts
+        return sp.coo_matrix(
+            (data, (rows, cols)), shape=(len(buckets), self.n_buckets)
+        ).tocsr()
+    
+    def score_batch(self, texts: List[str]) -> np.ndarray:
+        """
+        Log posteriors for each text, scoring long texts window by window.
+        
+        Every round scores the n-grams starting in the next `window_chars`
+        positions of the still-undecided texts with one sparse matrix
+        multiply. Windows overlap by `max_n - 1` characters and only the text
+        ends are padded, so a text scored to the end gets exactly the n-grams
+        of `featurize_batch`. A text stops being scored once its top label
+        leads the runner-up by `margin` (in calibrated log-odds), so detection
+        cost is bounded by a prefix of the text.
+        """
+        scores = np.tile(self.log_priors, (len(texts), 1)).astype(np.float32)
+        padded = [f" {text} " for text in texts]
+        # Positions where an n-gram of the shortest order can still start
+        starts = np.array([len(text) - self.ngram_range[0] + 1 for text in padded], dtype=np.int64)
+        span = self.window_chars + self.ngram_range[1] - 1
+        offset = 0
+        active = np.arange(len(texts))
+        
+        while len(active):
+            windows = [
+                _hash_code_points(
+                    _code_points(padded[i][offset:offset + span]),
+                    self.ngram_range, self.n_buckets, self.window_chars
+                )
+                for i in active
+            ]
+            scores[active] += np.asarray(self._count_matrix(windows) @ self.log_probs)
+            offset += self.window_chars
+            
+            remaining = starts[active] > offset
+            if not remaining.any():
+                break
+            
+            top_two = np.partition(scores[active], -2, axis=1)[:, -2:] / self.temperature
+            decided = (top_two[:, 1] - top_two[:, 0]) >= self.margin
+            active = active[remaining & ~decided]
+        
+        return scores
+    
+    def predict(self, text: str, top_k: int = 4) -> List[dict]:
+        """Return the `top_k` most likely languages with calibrated probabilities."""
+        return self.predict_batch([text], top_k)[0]
+    
+    def predict_batch(self, texts: List[str], top_k: int = 4) -> List[List[dict]]:
+        """Score many texts together and return the top languages for each."""
+        if not texts:
+            return []
+        
+        probs = self.probabilities(self.score_batch(texts))
+        return [self._top_k(row, top_k) for row in probs]
+    
+    def _top_k(self, probs: np.ndarray, top_k: int) -> List[dict]:
+        order = np.argsort(probs)[::-1][:top_k]
+        return [
+            {"language": self.labels[i], "confidence": round(float(probs[i]), 4)}
+            for i in order
+        ]
+
+
+_language_identifier: Optional[LanguageIdentifier] = None
+_language_identifier_loaded = False
+
+
+def get_language_identifier() -> Optional[LanguageIdentifier]:
+    """
+    Get the process-wide language identification model.
+    
+    Returns None if no trained model is present at LANGUAGE_ID_MODEL_DIR.
+    """
+    global _language_identifier, _language_identifier_loaded
+    
+    if not _language_identifier_loaded:
+        _language_identifier_loaded = True
+        model_dir = Path(settings.LANGUAGE_ID_MODEL_DIR)
+        
+        if (model_dir / "meta.json").exists():
+            try:
+                _language_identifier = LanguageIdentifier(
+                    str(model_dir),
+                    window_chars=settings.DETECTION_WINDOW_CHARS,
+                    margin=settings.DETECTION_EARLY_EXIT_MARGIN
+                )
+                logger.info(
+                    "Loaded language identification model",
+                    version=_language_identifier.version,
+                    languages=len(_language_identifier.labels)
+                )
+            except Exception as e:
+                logger.error("Failed to load language identification model", error=str(e))
+        else:
+            logger.warning("No language identification model found", path=str(model_dir))
+    
+    return _language_identifier
@@ -0,0 +1,181 @@
+"""
+Bulk, idempotent import of languages from a JSON or CSV catalog file.
+
+Rows are inserted in batches with `INSERT ... ON CONFLICT (code) DO
+NOTHING`, so the same file can be imported on every deploy without touching
+languages that already exist and may have been edited by an admin. With
+`--force` existing rows are updated from the catalog instead, except for
+`is_active`, which only admins change. The bundled catalog at
+app/data/languages.json seeds a fresh database.
+
+Usage: python -m app.services.language_import path/to/languages.csv [--force]
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Union
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+import argparse
+import csv
+import json
+import redis
+import structlog
+
+from app.core.config import settings
+from app.models.language import Language
+from app.schemas.language import LanguageImport
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_CATALOG = Path(__file__).resolve().parent.parent / "data" / "languages.json"
+
+# Optional details keep their stored value when the catalog leaves them blank
+_KEEP_IF_MISSING = ("family", "speaker_count", "orthography_notes", "cultural_context")
+
+# Never overwritten on existing rows; activation is managed by admins
+_ADMIN_MANAGED = ("code", "is_active")
+
+
+def read_language_catalog(path: Union[str, Path]) -> Iterator[LanguageImport]:
+    """
+    Read and validate languages from a catalog file.
+    
+    JSON files hold an array of objects; CSV files have a header row with the
+    same field names. Empty CSV cells are treated as missing.
+    """
+    path = Path(path)
+    
+    if path.suffix.lower() == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                record = {key: value for key, value in row.items() if value not in (None, "")}
+                yield _validate(record, f"{path.name}:{line_number}")
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        for index, record in enumerate(records):
+            yield _validate(record, f"{path.name}[{index}]")
+
+
+def _validate(record: Dict, location: str) -> LanguageImport:
+    try:
+        return LanguageImport.model_validate(record)
+    except ValueError as e:
+        raise ValueError(f"Invalid language at {location}: {e}") from e
+
+
+class LanguageImporter:
+    """Batched insert or upsert of language records keyed on language code."""
+    
+    def __init__(self, db: Session, batch_size: int = 500, update_existing: bool = False):
+        self.db = db
+        self.batch_size = batch_size
+        self.update_existing = update_existing
+    
+    def import_file(self, path: Union[str, Path]) -> Dict[str, int]:
+        """Import a JSON or CSV catalog file."""
+        return self.import_languages(read_language_catalog(path))
+    
+    def import_languages(self, languages: Iterable[LanguageImport]) -> Dict[str, int]:
+        """
+        Import languages in batches within a single transaction.
+        
+        Returns counts of inserted, updated and skipped (already present) rows.
+        """
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        batch: Dict[str, dict] = {}
+        
+        try:
+            for language in languages:
+                # A code repeated within a batch would fail ON CONFLICT; last one wins
+                batch[language.code] = language.model_dump()
+                if len(batch) >= self.batch_size:
+                    self._upsert(list(batch.values()), counts)
+                    batch = {}
+            
+            if batch:
+                self._upsert(list(batch.values()), counts)
+            
+            self.db.commit()
+            logger.info("Imported languages", **counts)
+            return counts
+            
+        except Exception as e:
+            logger.error("Failed to import languages", error=str(e))
+            self.db.rollback()
+            raise
+    
+    def _upsert(self, rows: List[dict], counts: Dict[str, int]):
+        inserted = updated = 0
+        for was_inserted, in self.db.execute(self._statement(rows)):
+            if was_inserted:
+                inserted += 1
+            else:
+                updated += 1
+        
+        counts["inserted"] += inserted
+        counts["updated"] += updated
+        # DO NOTHING returns no row for languages that already exist
+        counts["skipped"] += len(rows) - inserted - updated
+    
+    def _statement(self, rows: List[dict]):
+        statement = insert(Language).values(rows)
+        
+        if not self.update_existing:
+            statement = statement.on_conflict_do_nothing(index_elements=[Language.code])
+        else:
+            excluded = statement.excluded
+            updates = {
+                column: excluded[column]
+                for column in rows[0]
+                if column not in _ADMIN_MANAGED
+            }
+            for column in _KEEP_IF_MISSING:
+                updates[column] = func.coalesce(excluded[column], getattr(Language, column))
+            updates["updated_at"] = func.now()
+            
+            statement = statement.on_conflict_do_update(
+                index_elements=[Language.code], set_=updates
+            )
+        
+        return statement.returning(literal_column("xmax = 0").label("inserted"))
+
+
+def main():
+    from app.core.database import SessionLocal
+    from app.core.logging import setup_logging
+    
+    parser = argparse.ArgumentParser(description="Import languages from a JSON or CSV catalog")
+    parser.add_argument("path", nargs="?", default=str(DEFAULT_CATALOG))
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Update existing languages from the catalog (is_active is never changed)"
+    )
+    args = parser.parse_args()
+    
+    setup_logging()
+    db = SessionLocal()
+    try:
+        importer = LanguageImporter(db, batch_size=args.batch_size, update_existing=args.force)
+        counts = importer.import_file(args.path)
+        print(
+            f"Inserted {counts['inserted']}, updated {counts['updated']}, "
+            f"skipped {counts['skipped']} languages"
+        )
+    finally:
+        db.close()
+    
+    # Running API workers rebuild their catalog snapshot on the next read
+    try:
+        redis.from_url(settings.REDIS_URL).publish(
+            settings.LANGUAGE_CATALOG_CHANNEL,
+            json.dumps({"origin": "import", "etag": None})
+        )
+    except Exception as e:
+        logger.warning("Failed to announce language import", error=str(e))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,15 @@ Language service for managing language data.
 
 from typing import List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import func
+import json
 import structlog
 
 from app.models.language import Language
-from app.schemas.language import LanguageCreate, LanguageUpdate
+from app.schemas.language import Language as LanguageSchema, LanguageCreate, LanguageUpdate
+from app.services.language_import import DEFAULT_CATALOG, LanguageImporter
+from app.services.language_catalog import LanguageSnapshot, language_catalog
+from app.services.text_normalization import reset_text_normalizer
 
 logger = structlog.get_logger(__name__)
 
@@ -19,6 +23,15 @@ class LanguageService:
     def __init__(self, db: Session):
         self.db = db
     
+    async def get_catalog(self) -> LanguageSnapshot:
+        """Get the current in-memory snapshot of active languages."""
+        try:
+            return language_catalog.get(self.db)
+            
+        except Exception as e:
+            logger.error("Failed to load language catalog", error=str(e))
+            raise
+    
     async def get_languages(
         self,
         page: int = 1,
@@ -26,75 +39,118 @@ class LanguageService:
         tier: Optional[int] = None,
         status: Optional[str] = None,
         family: Optional[str] = None
-    ) -> Tuple[List[Language], int]:
+    ) -> Tuple[List[LanguageSchema], int]:
         """Get paginated list of languages with optional filtering."""
+        snapshot = await self.get_catalog()
+        languages = snapshot.filter(tier=tier, status=status, family=family)
+        
+        offset = (page - 1) * size
+        return list(languages[offset:offset + size]), len(languages)
+    
+    async def search_languages(
+        self,
+        size: int = 50,
+        page: Optional[int] = None,
+        after_id: Optional[int] = None,
+        tier: Optional[int] = None,
+        status: Optional[str] = None,
+        family: Optional[str] = None,
+        include_inactive: bool = False,
+        estimate_total: bool = False
+    ) -> Tuple[List[Language], Optional[int], Optional[int]]:
+        """
+        Filtered listing straight from the database in a single query.
+        
+        With `after_id` the listing uses keyset pagination on id, fetching one
+        extra row to tell whether another page follows; the total is only
+        reported as a planner estimate when `estimate_total` is set. Otherwise
+        pages are offset-based and the total comes from a `count(*) OVER()`
+        window on the same query.
+        
+        Returns (languages, total, next_cursor).
+        """
         try:
-            query = self.db.query(Language).filter(Language.is_active == True)
-            
-            # Apply filters
+            query = self.db.query(Language)
+            if not include_inactive:
+                query = query.filter(Language.is_active == True)
             if tier is not None:
                 query = query.filter(Language.priority_tier == tier)
-            
-            if status:
-                query = query.filter(Language.status == status)
-            
             if family:
                 query = query.filter(Language.family == family)
+            if status:
+                query = query.filter(Language.status == status)
             
-            # Get total count
-            total = query.count()
+            if after_id is not None or page is None:
+                total = self._estimate_count(query) if estimate_total else None
+                
+                if after_id is not None:
+                    query = query.filter(Language.id > after_id)
+                rows = query.order_by(Language.id).limit(size + 1).all()
+                
+                languages = rows[:size]
+                next_cursor = languages[-1].id if len(rows) > size else None
+                return languages, total, next_cursor
             
-            # Apply pagination
             offset = (page - 1) * size
-            languages = query.offset(offset).limit(size).all()
-            
-            return languages, total
+            rows = (
+                query.add_columns(func.count().over().label("total"))
+                .order_by(Language.id)
+                .offset(offset)
+                .limit(size)
+                .all()
+            )
+            
+            if rows:
+                total = rows[0].total
+            elif offset:
+                # Past the last page the window has no row to report on
+                total = query.count()
+            else:
+                total = 0
+            
+            languages = [row[0] for row in rows]
+            next_cursor = languages[-1].id if offset + len(languages) < total else None
+            return languages, total, next_cursor
             
         except Exception as e:
-            logger.error("Failed to get languages", error=str(e))
+            logger.error("Failed to search languages", error=str(e))
             raise
     
-    async def get_language_by_code(self, language_code: str) -> Optional[Language]:
-        """Get language by its code."""
+    def _estimate_count(self, query) -> Optional[int]:
+        """Planner row estimate for a query, without executing it."""
+        # Compiled with bound parameters so filter values never enter the SQL text
+        compiled = query.statement.compile(dialect=self.db.get_bind().dialect)
+        if compiled.positiontup is not None:
+            params = tuple(compiled.params[name] for name in compiled.positiontup)
+        else:
+            params = compiled.params
         try:
-            return self.db.query(Language).filter(
-                and_(
-                    Language.code == language_code,
-                    Language.is_active == True
-                )
-            ).first()
-            
+            # Savepoint so a failed EXPLAIN does not abort the listing query
+            with self.db.begin_nested():
+                plan = self.db.connection().exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {compiled}", params
+                ).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
         except Exception as e:
-            logger.error("Failed to get language by code", error=str(e))
-            raise
+            logger.warning("Failed to estimate language count", error=str(e))
+            return None
     
-    async def get_languages_by_tier(self, tier: int) -> List[Language]:
+    async def get_language_by_code(self, language_code: str) -> Optional[LanguageSchema]:
+        """Get language by its code."""
+        snapshot = await self.get_catalog()
+        return snapshot.by_code.get(language_code)
+    
+    async def get_languages_by_tier(self, tier: int) -> List[LanguageSchema]:
         """Get languages by priority tier."""
-        try:
-            return self.db.query(Language).filter(
-                and_(
-                    Language.priority_tier == tier,
-                    Language.is_active == True
-                )
-            ).all()
-            
-        except Exception as e:
-            logger.error("Failed to get languages by tier", error=str(e))
-            raise
+        snapshot = await self.get_catalog()
+        return list(snapshot.by_tier.get(tier, ()))
     
-    async def get_languages_by_family(self, family: str) -> List[Language]:
+    async def get_languages_by_family(self, family: str) -> List[LanguageSchema]:
         """Get languages by language family."""
-        try:
-            return self.db.query(Language).filter(
-                and_(
-                    Language.family == family,
-                    Language.is_active == True
-                )
-            ).all()
-            
-        except Exception as e:
-            logger.error("Failed to get languages by family", error=str(e))
-            raise
+        snapshot = await self.get_catalog()
+        return list(snapshot.by_family.get(family, ()))
     
     async def create_language(self, language_data: LanguageCreate) -> Language:
         """Create a new language entry."""
@@ -113,6 +169,10 @@ class LanguageService:
             self.db.commit()
             self.db.refresh(language)
             
+            # Pick up any orthography variants on the next request
+            reset_text_normalizer()
+            await self._refresh_catalog()
+            
             return language
             
         except Exception as e:
@@ -140,6 +200,10 @@ class LanguageService:
             self.db.commit()
             self.db.refresh(language)
             
+            if "orthography_notes" in update_data:
+                reset_text_normalizer()
+            await self._refresh_catalog()
+            
             return language
             
         except Exception as e:
@@ -147,173 +211,31 @@ class LanguageService:
             self.db.rollback()
             raise
     
+    async def _refresh_catalog(self):
+        """Rebuild the local catalog snapshot and announce it to other workers."""
+        try:
+            snapshot = language_catalog.rebuild(self.db)
+        except Exception as e:
+            # The write is committed; fall back to rebuilding on the next read
+            logger.error("Failed to rebuild language catalog", error=str(e))
+            language_catalog.invalidate()
+            return
+        
+        await language_catalog.publish(snapshot)
+    
     async def seed_initial_languages(self):
-        """Seed the database with initial Kenyan languages."""
+        """
+        Seed the database with the bundled Kenyan language catalog.
+        
+        Only languages missing from the database are inserted, so it is safe
+        to run on every deploy and never undoes admin edits. Catalog changes
+        to existing languages are applied with `language_import --force`.
+        """
         try:
-            # Check if languages already exist
-            existing_count = self.db.query(Language).count()
-            if existing_count > 0:
-                logger.info("Languages already seeded, skipping")
-                return
-            
-            # Tier 1 languages (High Resource)
-            tier1_languages = [
-                {
-                    "name": "Swahili",
-                    "code": "sw",
-                    "family": "Bantu",
-                    "status": "active",
-                    "speaker_count": 15000000,
-                    "priority_tier": 1,
-                    "cultural_context": "National language of Kenya and Tanzania, widely spoken across East Africa"
-                },
-                {
-                    "name": "Kikuyu",
-                    "code": "ki",
-                    "family": "Bantu",
-                    "status": "active",
-                    "speaker_count": 8000000,
-                    "priority_tier": 1,
-                    "cultural_context": "Major language of the Kikuyu people, central Kenya"
-                },
-                {
-                    "name": "Luo",
-                    "code": "luo",
-                    "family": "Nilotic",
-                    "status": "active",
-                    "speaker_count": 5000000,
-                    "priority_tier": 1,
-                    "cultural_context": "Language of the Luo people, western Kenya"
-                },
-                {
-                    "name": "Luhya",
-                    "code": "luy",
-                    "family": "Bantu",
-                    "status": "active",
-                    "speaker_count": 6000000,
-                    "priority_tier": 1,
-                    "cultural_context": "Language family of the Luhya people, western Kenya"
-                },
-                {
-                    "name": "Kamba",
-                    "code": "kam",
-                    "family": "Bantu",
-                    "status": "active",
-                    "speaker_count": 4000000,
-                    "priority_tier": 1,
-                    "cultural_context": "Language of the Kamba people, eastern Kenya"
-                }
-            ]
-            
-            # Tier 2 languages (Medium Resource)
-            tier2_languages = [
-                {
-                    "name": "Kalenjin",
-                    "code": "kln",
-                    "family": "Nilotic",
-                    "status": "active",
-                    "speaker_count": 5000000,
-                    "priority_tier": 2,
-                    "cultural_context": "Language family of the Kalenjin people, Rift Valley"
-                },
-                {
-                    "name": "Kisii",
-                    "code": "guz",
-                    "family": "Bantu",
-                    "status": "active",
-                    "speaker_count": 2000000,
-                    "priority_tier": 2,
-                    "cultural_context": "Language of the Kisii people, southwestern Kenya"
-                },
-                {
-                    "name": "Meru",
-                    "code": "mer",
-                    "family": "Bantu",
-                    "status": "active",
-                    "speaker_count": 2000000,
-                    "priority_tier": 2,
-                    "cultural_context": "Language of the Meru people, eastern Kenya"
-                },
-                {
-                    "name": "Turkana",
-                    "code": "tuv",
-                    "family": "Nilotic",
-                    "status": "active",
-                    "speaker_count": 1000000,
-                    "priority_tier": 2,
-                    "cultural_context": "Language of the Turkana people, northwestern Kenya"
-                },
-                {
-                    "name": "Maasai",
-                    "code": "mas",
-                    "family": "Nilotic",
-                    "status": "active",
-                    "speaker_count": 1000000,
-                    "priority_tier": 2,
-                    "cultural_context": "Language of the Maasai people, southern Kenya and northern Tanzania"
-                }
-            ]
-            
-            # Tier 3 languages (Low/Endangered)
-            tier3_languages = [
-                {
-                    "name": "Samburu",
-                    "code": "saq",
-                    "family": "Nilotic",
-                    "status": "endangered",
-                    "speaker_count": 200000,
-                    "priority_tier": 3,
-                    "cultural_context": "Language of the Samburu people, northern Kenya"
-                },
-                {
-                    "name": "Pokot",
-                    "code": "pko",
-                    "family": "Nilotic",
-                    "status": "endangered",
-                    "speaker_count": 200000,
-                    "priority_tier": 3,
-                    "cultural_context": "Language of the Pokot people, northwestern Kenya"
-                },
-                {
-                    "name": "Borana",
-                    "code": "gax",
-                    "family": "Cushitic",
-                    "status": "endangered",
-                    "speaker_count": 100000,
-                    "priority_tier": 3,
-                    "cultural_context": "Language of the Borana people, northern Kenya"
-                },
-                {
-                    "name": "Rendille",
-                    "code": "rel",
-                    "family": "Cushitic",
-                    "status": "endangered",
-                    "speaker_count": 50000,
-                    "priority_tier": 3,
-                    "cultural_context": "Language of the Rendille people, northern Kenya"
-                },
-                {
-                    "name": "El Molo",
-                    "code": "elo",
-                    "family": "Cushitic",
-                    "status": "critically_endangered",
-                    "speaker_count": 1000,
-                    "priority_tier": 3,
-                    "cultural_context": "Critically endangered language of the El Molo people, northern Kenya"
-                }
-            ]
-            
-            # Add all languages
-            all_languages = tier1_languages + tier2_languages + tier3_languages
-            
-            for lang_data in all_languages:
-                language = Language(**lang_data)
-                self.db.add(language)
-            
-            self.db.commit()
-            logger.info(f"Seeded {len(all_languages)} languages")
+            counts = LanguageImporter(self.db).import_file(DEFAULT_CATALOG)
+            await self._refresh_catalog()
+            logger.info("Seeded languages", **counts)
             
         except Exception as e:
             logger.error("Failed to seed initial languages", error=str(e))
-            self.db.rollback()
             raise
@@ -0,0 +1,258 @@
+"""
+Content-addressed storage for contributed media.
+
+Each file is stored once under the SHA-256 of its bytes, so the same
+recording uploaded again costs nothing. Files are written from the intake's
+temporary file in chunks and read back as async iterators over any byte
+range, so neither direction holds a whole file in memory.
+
+GridFS (through Motor) is the production backend; a filesystem backend
+keeps local development and testing free of MongoDB.
+"""
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+from fastapi.concurrency import run_in_threadpool
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+import aiofiles
+import json
+import os
+import re
+import shutil
+import tempfile
+import structlog
+
+from app.core.config import settings
+from app.core.database import get_mongodb
+
+logger = structlog.get_logger(__name__)
+
+CHUNK_SIZE = 255 * 1024  # GridFS default chunk size
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _check_key(key: str):
+    if not _KEY_PATTERN.match(key):
+        raise ValueError(f"Invalid media key: {key}")
+
+
+class StoredMedia:
+    """A stored file: its key, size and type, and a local path if it has one."""
+    
+    def __init__(self, **kwargs):
+        self.path: Optional[Path] = None
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+class FilesystemMediaStore:
+    """Media as files under a local directory, with a JSON sidecar for metadata."""
+    
+    def __init__(self, root: str):
+        self.root = Path(root)
+    
+    def _path(self, key: str) -> Path:
+        _check_key(key)
+        return self.root / key[:2] / key
+    
+    async def put(self, source: Path, key: str, content_type: str) -> StoredMedia:
+        """Store `source` under `key` unless it is already stored."""
+        existing = await self.stat(key)
+        if existing is not None:
+            return existing
+        
+        path = self._path(key)
+        await run_in_threadpool(self._write, source, path, content_type)
+        logger.info("Stored media", key=key, backend="filesystem")
+        return await self.stat(key)
+    
+    def _write(self, source: Path, path: Path, content_type: str):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with open(source, "rb") as src, os.fdopen(fd, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            # Sidecar first, so a visible file always has its metadata
+            path.with_suffix(".json").write_text(json.dumps({"content_type": content_type}))
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+    
+    async def stat(self, key: str) -> Optional[StoredMedia]:
+        path = self._path(key)
+        try:
+            size = os.stat(path).st_size
+            metadata = json.loads(path.with_suffix(".json").read_text())
+        except FileNotFoundError:
+            return None
+        return StoredMedia(key=key, size=size, content_type=metadata["content_type"], path=path)
+    
+    async def get_variants(self, key: str) -> Dict[str, str]:
+        """Keys of encoded variants of `key`, by variant name."""
+        try:
+            return json.loads(self._path(key).with_suffix(".variants.json").read_text())
+        except FileNotFoundError:
+            return {}
+    
+    async def set_variants(self, key: str, variants: Dict[str, str]):
+        path = self._path(key).with_suffix(".variants.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(variants))
+        os.replace(temp_path, path)
+    
+    async def read_range(self, key: str, offset: int, count: int) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self._path(key), "rb") as f:
+            await f.seek(offset)
+            remaining = count
+            while remaining > 0:
+                chunk = await f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    
+    async def delete(self, key: str):
+        """Delete the stored bytes; recorded variants are kept."""
+        path = self._path(key)
+        for target in (path, path.with_suffix(".json")):
+            try:
+                os.unlink(target)
+            except FileNotFoundError:
+                pass
+
+
+class GridFSMediaStore:
+    """Media in a GridFS bucket, one file per key (the GridFS filename)."""
+    
+    def __init__(self, database, bucket_name: str = "media"):
+        self.files = database[f"{bucket_name}.files"]
+        self.variants = database[f"{bucket_name}.variants"]
+        self.bucket = AsyncIOMotorGridFSBucket(
+            database, bucket_name=bucket_name, chunk_size_bytes=CHUNK_SIZE
+        )
+    
+    async def put(self, source: Path, key: str, content_type: str) -> StoredMedia:
+        """Stream `source` into GridFS under `key` unless it is already stored."""
+        existing = await self.stat(key)
+        if existing is not None:
+            return existing
+        
+        _check_key(key)
+        grid_in = self.bucket.open_upload_stream(
+            key, metadata={"content_type": content_type, "sha256": key}
+        )
+        try:
+            async with aiofiles.open(source, "rb") as f:
+                while True:
+                    chunk = await f.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await grid_in.write(chunk)
+            await grid_in.close()
+        except Exception:
+            await grid_in.abort()
+            raise
+        
+        logger.info("Stored media", key=key, backend="gridfs")
+        return await self.stat(key)
+    
+    async def stat(self, key: str) -> Optional[StoredMedia]:
+        _check_key(key)
+        document = await self.files.find_one({"filename": key}, sort=[("uploadDate", -1)])
+        if document is None:
+            return None
+        return StoredMedia(
+            key=key, size=document["length"], content_type=document["metadata"]["content_type"]
+        )
+    
+    async def get_variants(self, key: str) -> Dict[str, str]:
+        """Keys of encoded variants of `key`, by variant name."""
+        _check_key(key)
+        document = await self.variants.find_one({"_id": key})
+        return document["variants"] if document else {}
+    
+    async def set_variants(self, key: str, variants: Dict[str, str]):
+        _check_key(key)
+        await self.variants.replace_one({"_id": key}, {"variants": variants}, upsert=True)
+    
+    async def read_range(self, key: str, offset: int, count: int) -> AsyncIterator[bytes]:
+        _check_key(key)
+        grid_out = await self.bucket.open_download_stream_by_name(key)
+        # Seeking only fetches the chunks the range covers
+        grid_out.seek(offset)
+        remaining = count
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    
+    async def delete(self, key: str):
+        """Delete the stored bytes; recorded variants are kept."""
+        _check_key(key)
+        async for document in self.files.find({"filename": key}, {"_id": 1}):
+            await self.bucket.delete(document["_id"])
+
+
+_gridfs_store: Optional[GridFSMediaStore] = None
+
+
+def get_media_store():
+    """The configured media store (MEDIA_STORE_BACKEND)."""
+    global _gridfs_store
+    
+    if settings.MEDIA_STORE_BACKEND == "filesystem":
+        return FilesystemMediaStore(settings.MEDIA_STORE_DIR)
+    
+    if _gridfs_store is None:
+        database = get_mongodb()
+        if database is None:
+            raise RuntimeError("MongoDB is not connected")
+        _gridfs_store = GridFSMediaStore(database)
+    return _gridfs_store
+
+
+async def resolve_media(store, key: str, variant: str = "auto") -> Optional[StoredMedia]:
+    """
+    The stored file to serve for `key`.
+    
+    "auto" prefers the compressed Opus variant; "original" falls back to the
+    lossless FLAC copy once the original has been replaced by it.
+    """
+    variants = await store.get_variants(key)
+    
+    if variant == "auto":
+        candidates = [variants.get("opus"), key, variants.get("flac")]
+    elif variant == "original":
+        candidates = [key, variants.get("flac")]
+    else:
+        candidates = [variants.get(variant)]
+    
+    for candidate in candidates:
+        if candidate is not None:
+            media = await store.stat(candidate)
+            if media is not None:
+                return media
+    return None
+
+
+@asynccontextmanager
+async def local_copy(store, media: StoredMedia, workdir: Path) -> AsyncIterator[Path]:
+    """A local path for stored media, downloading it into `workdir` if the backend is remote."""
+    if media.path is not None:
+        yield media.path
+        return
+    
+    path = workdir / media.key
+    async with aiofiles.open(path, "wb") as f:
+        async for chunk in store.read_range(media.key, 0, media.size):
+            await f.write(chunk)
+    try:
+        yield path
+    finally:
+        os.unlink(path)
@@ -0,0 +1,365 @@
+"""
+Pronunciation scoring by aligning learner audio to a reference recording.
+
+The reference is a human recording of the prompt: an approved community
+audio contribution with the same normalized transcript. Synthesized speech
+is not used, since the placeholder synthesizer produces silence. Both
+recordings are trimmed to their voiced span, turned into normalized log-mel
+features and aligned with dynamic time warping. The reference is segmented
+into phoneme-sized spans (graphemes and common digraphs, spread evenly over
+the reference until a forced aligner is available), and the alignment cost
+inside each span gives that phoneme's score. Attempts without speech are
+rejected rather than scored.
+
+Reference features only depend on the prompt and its recording, so they
+are computed once and cached in memory and on disk. All features go
+through the shared feature store, so a recording is only decoded once.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from starlette.concurrency import run_in_threadpool
+import asyncio
+import hashlib
+import math
+import multiprocessing
+import tempfile
+import threading
+import numpy as np
+import structlog
+
+from app.core.config import settings
+from app.services.audio_preprocessing import (
+    HOP_LENGTH, N_FFT, N_MELS, SAMPLE_RATE, load_log_mel, load_samples
+)
+from app.services.media_store import get_media_store, local_copy, resolve_media
+
+logger = structlog.get_logger(__name__)
+
+# Multi-letter sounds written as digraphs across Kenyan orthographies
+DIGRAPHS = ("ng'", "ny", "ng", "sh", "ch", "th", "dh", "gh", "kh", "mb", "nd", "nj", "nz")
+
+# A frame is voiced when it is this far above the recording's quiet frames,
+# and never below the absolute minimum
+VOICED_ABOVE_FLOOR_DB = 9.0
+VOICED_MIN_DB = -50.0
+
+
+def dtw_align(
+    reference: np.ndarray, attempt: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Align two feature sequences with dynamic time warping.
+    
+    The accumulated-cost matrix is filled one anti-diagonal at a time: every
+    cell on a diagonal depends only on the two previous diagonals, so each
+    diagonal is a single vectorized update. Returns the warping path as
+    reference and attempt frame indices, plus the frame distance at each
+    step of the path.
+    """
+    n, m = len(reference), len(attempt)
+    cost = frame_distances(reference, attempt)
+    
+    accumulated = np.full((n + 1, m + 1), np.inf, dtype=np.float32)
+    accumulated[0, 0] = 0.0
+    
+    for diagonal in range(2, n + m + 1):
+        i = np.arange(max(1, diagonal - m), min(n, diagonal - 1) + 1)
+        j = diagonal - i
+        accumulated[i, j] = cost[i - 1, j - 1] + np.minimum(
+            np.minimum(accumulated[i - 1, j], accumulated[i, j - 1]),
+            accumulated[i - 1, j - 1]
+        )
+    
+    # Backtrack from the end
+    path_i, path_j = [n - 1], [m - 1]
+    i, j = n, m
+    while i > 1 or j > 1:
+        steps = (accumulated[i - 1, j - 1], accumulated[i - 1, j], accumulated[i, j - 1])
+        move = int(np.argmin(steps))
+        if move == 0:
+            i, j = i - 1, j - 1
+        elif move == 1:
+            i -= 1
+        else:
+            j -= 1
+        path_i.append(i - 1)
+        path_j.append(j - 1)
+    
+    path_ref, path_attempt = np.array(path_i[::-1]), np.array(path_j[::-1])
+    return path_ref, path_attempt, cost[path_ref, path_attempt]
+
+
+def frame_distances(reference: np.ndarray, attempt: np.ndarray) -> np.ndarray:
+    """Euclidean distance between every pair of frames."""
+    squared = (
+        (reference ** 2).sum(axis=1)[:, None]
+        + (attempt ** 2).sum(axis=1)[None, :]
+        - 2.0 * reference @ attempt.T
+    )
+    return np.sqrt(np.maximum(squared, 0.0)).astype(np.float32)
+
+
+def split_phonemes(key: str) -> List[str]:
+    """Split normalized text into phoneme-like units (letters and digraphs)."""
+    letters = "".join(c for c in key if c.isalpha() or c == "'")
+    units = []
+    i = 0
+    while i < len(letters):
+        for digraph in DIGRAPHS:
+            if letters.startswith(digraph, i):
+                units.append(digraph)
+                i += len(digraph)
+                break
+        else:
+            if letters[i] != "'":
+                units.append(letters[i])
+            i += 1
+    return units
+
+
+def voiced_span(samples: np.ndarray) -> Optional[Tuple[int, int]]:
+    """
+    First and one-past-last feature frame containing speech, or None if none does.
+    
+    Frames match `log_mel_features`. The noise floor is the 10th percentile
+    of frame levels, so steady noise of any level is not counted as speech.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    if len(samples) < N_FFT:
+        samples = np.pad(samples, (0, N_FFT - len(samples)))
+    
+    frames = np.lib.stride_tricks.sliding_window_view(samples, N_FFT)[::HOP_LENGTH]
+    levels = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    floor = np.percentile(levels, 10)
+    voiced = np.flatnonzero(levels > max(VOICED_MIN_DB, floor + VOICED_ABOVE_FLOOR_DB))
+    
+    if len(voiced) == 0:
+        return None
+    return int(voiced[0]), int(voiced[-1]) + 1
+
+
+class ReferenceFeatures:
+    """Features and phoneme spans for one reference prompt."""
+    
+    def __init__(self, features: np.ndarray, phonemes: List[str], boundaries: np.ndarray):
+        self.features = features
+        self.phonemes = phonemes
+        self.boundaries = boundaries  # Start frame of each phoneme, plus the end
+    
+    def phoneme_index(self, frames: np.ndarray) -> np.ndarray:
+        """Phoneme index for each reference frame index."""
+        return np.searchsorted(self.boundaries, frames, side="right") - 1
+
+
+def build_reference(
+    path: Union[str, Path], content_key: Optional[str], reference_key: str
+) -> Optional[ReferenceFeatures]:
+    """Reference features for a recording of the prompt, or None if it has no speech."""
+    span = voiced_span(load_samples(path, content_key))
+    if span is None:
+        return None
+    
+    features = np.array(load_log_mel(path, content_key)[span[0]:span[1]])
+    phonemes = split_phonemes(reference_key)
+    
+    # Spread phonemes evenly until a forced aligner provides real boundaries
+    boundaries = np.linspace(0, len(features), len(phonemes) + 1).astype(np.int64)
+    return ReferenceFeatures(features, phonemes, boundaries)
+
+
+def score_features(reference: ReferenceFeatures, attempt: np.ndarray) -> Dict:
+    """Score attempt features against a reference; see `PronunciationScorer.score`."""
+    path_ref, _, step_costs = dtw_align(reference.features, attempt)
+    
+    n_phonemes = len(reference.phonemes)
+    if n_phonemes == 0:
+        return {"score": 0.0, "phoneme_scores": {}, "weakest": []}
+    
+    phoneme_ids = reference.phoneme_index(path_ref)
+    counts = np.bincount(phoneme_ids, minlength=n_phonemes)
+    totals = np.bincount(phoneme_ids, weights=step_costs, minlength=n_phonemes)
+    mean_costs = totals / np.maximum(counts, 1)
+    
+    # Distances between normalized frames of unrelated speech are about sqrt(2 * N_MELS)
+    scores = np.exp(-mean_costs / math.sqrt(N_MELS))
+    
+    per_phoneme: Dict[str, List[float]] = {}
+    for phoneme, value in zip(reference.phonemes, scores):
+        per_phoneme.setdefault(phoneme, []).append(float(value))
+    phoneme_scores = {
+        phoneme: round(sum(values) / len(values), 3)
+        for phoneme, values in per_phoneme.items()
+    }
+    
+    overall = float(np.average(scores, weights=np.maximum(counts, 1)))
+    weakest = sorted(phoneme_scores, key=phoneme_scores.get)[:2]
+    return {
+        "score": round(overall, 3),
+        "phoneme_scores": phoneme_scores,
+        "weakest": weakest
+    }
+
+
+def score_file(
+    reference: ReferenceFeatures, path: Union[str, Path], content_key: Optional[str] = None
+) -> Dict:
+    """
+    Score an attempt stored in `path`, reusing its cached features when `content_key` is given.
+    
+    Raises ValueError for attempts that are too long or contain no speech.
+    """
+    span = voiced_span(load_samples(path, content_key))
+    if span is None:
+        raise ValueError("No speech detected in the recording")
+    
+    attempt = load_log_mel(path, content_key)[span[0]:span[1]]
+    if len(attempt) > settings.PRONUNCIATION_MAX_SECONDS * SAMPLE_RATE // HOP_LENGTH + 1:
+        # The alignment matrix grows with the product of both lengths
+        raise ValueError(
+            f"Pronunciation attempts must be at most {settings.PRONUNCIATION_MAX_SECONDS} seconds"
+        )
+    return score_features(reference, attempt)
+
+
+class PronunciationScorer:
+    """Scores learner attempts against cached reference features."""
+    
+    def __init__(self, cache_dir: str, memory_entries: int):
+        self.cache_dir = Path(cache_dir)
+        self.memory_entries = memory_entries
+        self._references: "OrderedDict[str, ReferenceFeatures]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def reference_key(self, reference_key: str, language_code: str, media_key: str) -> str:
+        material = f"{language_code}\x00{reference_key}\x00{media_key}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+    
+    async def get_reference(
+        self, reference_key: str, language_code: str, media_key: str
+    ) -> Optional[ReferenceFeatures]:
+        """
+        Features of the reference recording `media_key` for a prompt.
+        
+        Served from memory, then disk, and otherwise computed from the stored
+        recording. None if the recording is missing or has no speech.
+        """
+        cache_key = self.reference_key(reference_key, language_code, media_key)
+        
+        with self._lock:
+            reference = self._references.get(cache_key)
+            if reference is not None:
+                self._references.move_to_end(cache_key)
+                return reference
+        
+        path = self.cache_dir / cache_key[:2] / f"{cache_key}.npz"
+        reference = await run_in_threadpool(self._load, path)
+        if reference is None:
+            reference = await self._compute_reference(reference_key, media_key)
+            if reference is None:
+                return None
+            await run_in_threadpool(self._save, path, reference)
+        
+        with self._lock:
+            self._references[cache_key] = reference
+            while len(self._references) > self.memory_entries:
+                self._references.popitem(last=False)
+        return reference
+    
+    def score(self, reference: ReferenceFeatures, path: Path, content_key: Optional[str]) -> Dict:
+        """
+        Score a learner attempt stored at `path`.
+        
+        Returns an overall score in [0, 1], a score per phoneme and the
+        phonemes most in need of practice.
+        """
+        return score_file(reference, path, content_key)
+    
+    async def score_files(
+        self, reference: ReferenceFeatures, files: List[Tuple[Path, Optional[str]]]
+    ) -> List[Union[Dict, Exception]]:
+        """
+        Score many attempts at the same prompt across worker processes.
+        
+        `files` holds (path, content key) pairs. The reference is shipped to
+        the workers with each file. Results are in input order; a file that
+        fails to decode or score yields its exception instead of a result.
+        """
+        if self._pool is None:
+            # Forking a process that runs an event loop and model threads can
+            # copy a held lock into the child; spawn starts workers clean
+            self._pool = ProcessPoolExecutor(
+                max_workers=settings.PRONUNCIATION_WORKERS or None,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        
+        loop = asyncio.get_running_loop()
+        return await asyncio.gather(
+            *(
+                loop.run_in_executor(self._pool, score_file, reference, str(path), content_key)
+                for path, content_key in files
+            ),
+            return_exceptions=True
+        )
+    
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+    
+    async def _compute_reference(self, reference_key: str, media_key: str) -> Optional[ReferenceFeatures]:
+        store = get_media_store()
+        media = await resolve_media(store, media_key, "original")
+        if media is None:
+            logger.warning("Reference recording is missing from the media store", media_key=media_key)
+            return None
+        
+        with tempfile.TemporaryDirectory(dir=settings.UPLOAD_TEMP_DIR or None) as workdir:
+            async with local_copy(store, media, Path(workdir)) as path:
+                reference = await run_in_threadpool(build_reference, path, media.key, reference_key)
+        
+        if reference is None:
+            logger.warning("Reference recording has no speech", media_key=media_key)
+        return reference
+    
+    def _load(self, path: Path) -> Optional[ReferenceFeatures]:
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                return ReferenceFeatures(
+                    data["features"], [str(p) for p in data["phonemes"]], data["boundaries"]
+                )
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Discarding unreadable reference features", path=str(path), error=str(e))
+            return None
+    
+    def _save(self, path: Path, reference: ReferenceFeatures):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp.npz")
+        np.savez(
+            temp_path,
+            features=reference.features,
+            phonemes=np.array(reference.phonemes, dtype=str),
+            boundaries=reference.boundaries
+        )
+        temp_path.replace(path)
+
+
+_pronunciation_scorer: Optional[PronunciationScorer] = None
+
+
+def get_pronunciation_scorer() -> PronunciationScorer:
+    """Get the process-wide pronunciation scorer."""
+    global _pronunciation_scorer
+    
+    if _pronunciation_scorer is None:
+        _pronunciation_scorer = PronunciationScorer(
+            settings.PRONUNCIATION_CACHE_DIR,
+            memory_entries=settings.PRONUNCIATION_CACHE_SIZE
+        )
+    
+    return _pronunciation_scorer
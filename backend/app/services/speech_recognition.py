@@ -0,0 +1,277 @@
+"""
+Resident Whisper speech recognition with batched decoding.
+
+Each worker process loads the Whisper model once and keeps it resident.
+Requests are queued and collected into batches: every clip is cut into
+Whisper's fixed 30-second windows, so windows from different clips share
+one padded length and are decoded together, one batch per language. The
+model runs on a dedicated thread so the event loop is never blocked. When
+Whisper is not installed, a mock recognizer keeps the API usable.
+
+Windows are hard cuts without overlap, so a word spoken across a 30-second
+boundary can be split or dropped in long uploads. The streaming endpoint
+avoids this by transcribing VAD segments, which end in silence.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+import asyncio
+import math
+import time
+import numpy as np
+import structlog
+
+from app.core.config import settings
+from app.services.audio_preprocessing import SAMPLE_RATE, load_samples
+
+logger = structlog.get_logger(__name__)
+
+WINDOW_SECONDS = 30  # Whisper's fixed input length
+
+# Decoding options per platform language. Whisper only knows Swahili and
+# English among the platform languages; other codes let the model detect
+# the language rather than forcing an unrelated one.
+DECODING_OPTIONS: Dict[str, dict] = {
+    "sw": {"language": "sw"},
+    "en": {"language": "en"},
+}
+DEFAULT_DECODING_OPTIONS: dict = {"language": None}
+
+MOCK_TRANSCRIPTIONS = {
+    "sw": "Hujambo, jina langu ni...",
+    "ki": "Ni wega, nitwa...",
+    "luo": "Oyawore, nyinga...",
+    "en": "Hello, my name is..."
+}
+
+
+class TranscriptionRequest:
+    """A clip waiting in the recognition queue."""
+    
+    def __init__(self, audio, language_code: str, future: asyncio.Future):
+        self.audio = audio
+        self.language_code = language_code
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.n_windows = max(1, math.ceil(len(audio) / (SAMPLE_RATE * WINDOW_SECONDS)))
+
+
+def share_inference_time(batch_ms: float, window_counts: List[int]) -> List[int]:
+    """Split a batch's decoding time between its clips by their number of windows."""
+    total = sum(window_counts)
+    return [int(batch_ms * n / total) for n in window_counts]
+
+
+class SpeechRecognitionEngine:
+    """Queue-fed Whisper recognizer that decodes clips in batches."""
+    
+    def __init__(
+        self,
+        model_name: str,
+        max_batch_windows: int = 8,
+        batch_wait_ms: int = 20,
+        device: Optional[str] = None
+    ):
+        self.model_name = model_name
+        self.max_batch_windows = max_batch_windows
+        self.batch_wait = batch_wait_ms / 1000
+        self.device = device
+        self.model = None
+        self.mock = False
+        # Whisper models are not thread-safe; all inference runs on one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    def _load_model(self):
+        if self.model is not None or self.mock:
+            return
+        
+        try:
+            import torch
+            import whisper
+            
+            device = self.device or ("cuda" if torch.cuda.is_available() else "cpu")
+            self.model = whisper.load_model(
+                self.model_name, device=device, download_root=settings.MODEL_CACHE_DIR
+            )
+            logger.info("Loaded Whisper model", model=self.model_name, device=device)
+        except ImportError:
+            self.mock = True
+            logger.warning("Whisper not installed, using mock speech recognition")
+    
+    async def transcribe(
+        self, audio_path: Path, language_code: str, content_key: Optional[str] = None
+    ) -> dict:
+        """
+        Transcribe an audio file.
+        
+        Audio is decoded through the shared preprocessing pipeline, which
+        reuses the decoded samples when `content_key` was seen before.
+        Returns the text, confidence and detected language along with the
+        clip duration, time spent queued, inference time and real-time
+        factor (inference time / audio duration). Inference time is the
+        clip's share of its batch's decoding time, by number of windows.
+        """
+        loop = asyncio.get_running_loop()
+        start_time = time.monotonic()
+        
+        await loop.run_in_executor(self._executor, self._load_model)
+        if self.mock:
+            return self._mock_transcription(language_code, None, start_time)
+        
+        try:
+            audio = await loop.run_in_executor(None, load_samples, audio_path, content_key)
+        except RuntimeError:
+            # Containers libsndfile cannot read go through Whisper's ffmpeg loader
+            import whisper
+            audio = await loop.run_in_executor(None, whisper.load_audio, str(audio_path))
+        return await self.transcribe_audio(audio, language_code, start_time)
+    
+    async def transcribe_audio(
+        self, audio: np.ndarray, language_code: str, start_time: Optional[float] = None
+    ) -> dict:
+        """Transcribe 16 kHz mono float32 samples already in memory."""
+        loop = asyncio.get_running_loop()
+        start_time = start_time or time.monotonic()
+        duration = len(audio) / SAMPLE_RATE
+        
+        await loop.run_in_executor(self._executor, self._load_model)
+        if self.mock:
+            return self._mock_transcription(language_code, duration, start_time)
+        
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._batch_loop())
+        
+        future = loop.create_future()
+        await self._queue.put(TranscriptionRequest(audio, language_code, future))
+        result = await future
+        
+        result.update(
+            duration_seconds=round(duration, 3),
+            real_time_factor=round(result["inference_ms"] / 1000 / duration, 4) if duration else None,
+            processing_time_ms=int((time.monotonic() - start_time) * 1000)
+        )
+        return result
+    
+    async def _batch_loop(self):
+        """Collect queued clips into batches and decode them on the model thread."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            n_windows = batch[0].n_windows
+            deadline = loop.time() + self.batch_wait
+            
+            while n_windows < self.max_batch_windows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                n_windows += request.n_windows
+            
+            # Callers that went away (e.g. a closed stream) cancel their future
+            batch = [request for request in batch if not request.future.cancelled()]
+            if not batch:
+                continue
+            
+            started_at = time.monotonic()
+            try:
+                results = await loop.run_in_executor(self._executor, self._decode_batch, batch)
+            except Exception as e:
+                logger.error("Batched transcription failed", error=str(e), clips=len(batch))
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+            
+            for request, result in zip(batch, results):
+                result["queue_wait_ms"] = int((started_at - request.enqueued_at) * 1000)
+                if not request.future.done():
+                    request.future.set_result(result)
+    
+    def _decode_batch(self, batch: List[TranscriptionRequest]) -> List[dict]:
+        """Decode every 30-second window of the batch, one model call per language."""
+        import torch
+        import whisper
+        
+        start_time = time.monotonic()
+        window = SAMPLE_RATE * WINDOW_SECONDS
+        by_language: Dict[str, list] = {}
+        
+        for index, request in enumerate(batch):
+            for k in range(request.n_windows):
+                # Copy out of the read-only feature store mapping for torch
+                segment = whisper.pad_or_trim(np.array(request.audio[k * window:(k + 1) * window]))
+                by_language.setdefault(request.language_code, []).append(
+                    (index, whisper.log_mel_spectrogram(segment))
+                )
+        
+        decoded: List[list] = [[] for _ in batch]
+        for language_code, windows in by_language.items():
+            options = whisper.DecodingOptions(
+                task="transcribe",
+                without_timestamps=True,
+                fp16=self.model.device.type == "cuda",
+                **DECODING_OPTIONS.get(language_code, DEFAULT_DECODING_OPTIONS)
+            )
+            mel = torch.stack([m for _, m in windows]).to(self.model.device)
+            for (index, _), result in zip(windows, whisper.decode(self.model, mel, options)):
+                decoded[index].append(result)
+        
+        # Each clip is charged its share, so RTF does not grow with batch size
+        inference_ms = share_inference_time(
+            (time.monotonic() - start_time) * 1000, [request.n_windows for request in batch]
+        )
+        results = []
+        for segments, clip_ms in zip(decoded, inference_ms):
+            spoken = [s for s in segments if s.no_speech_prob < 0.6] or segments
+            results.append({
+                "text": " ".join(s.text.strip() for s in spoken if s.text.strip()),
+                "confidence": round(
+                    sum(math.exp(s.avg_logprob) for s in spoken) / len(spoken), 4
+                ),
+                "language_detected": segments[0].language,
+                "inference_ms": clip_ms
+            })
+        
+        return results
+    
+    def _mock_transcription(
+        self, language_code: str, duration: Optional[float], start_time: float
+    ) -> dict:
+        return {
+            "text": MOCK_TRANSCRIPTIONS.get(language_code, "Transcribed audio text"),
+            "confidence": 0.85,
+            "language_detected": language_code,
+            "duration_seconds": duration,
+            "inference_ms": 0,
+            "queue_wait_ms": 0,
+            "real_time_factor": None,
+            "processing_time_ms": int((time.monotonic() - start_time) * 1000)
+        }
+
+
+_speech_recognizer: Optional[SpeechRecognitionEngine] = None
+
+
+def get_speech_recognizer() -> SpeechRecognitionEngine:
+    """Get the process-wide speech recognition engine."""
+    global _speech_recognizer
+    
+    if _speech_recognizer is None:
+        _speech_recognizer = SpeechRecognitionEngine(
+            settings.WHISPER_MODEL,
+            max_batch_windows=settings.WHISPER_MAX_BATCH_WINDOWS,
+            batch_wait_ms=settings.WHISPER_BATCH_WAIT_MS,
+            device=settings.WHISPER_DEVICE or None
+        )
+    
+    return _speech_recognizer
@@ -0,0 +1,82 @@
+"""
+Speech synthesis backend.
+
+No TTS model for the platform languages is integrated yet, so synthesis
+produces silence of roughly the length the text would take to read. The
+interface returns float samples so a real model can replace `synthesize`
+without touching caching or serving.
+"""
+
+from pathlib import Path
+from typing import List, Union
+import re
+import struct
+import wave
+import numpy as np
+
+SAMPLE_RATE = 16000
+SECONDS_PER_CHARACTER = 0.1  # Rough reading pace used by the mock
+
+
+class SpeechSynthesizer:
+    """Text-to-speech model wrapper."""
+    
+    def __init__(self, sample_rate: int = SAMPLE_RATE):
+        self.sample_rate = sample_rate
+    
+    def synthesize(self, text: str, language_code: str, voice: str = "default") -> np.ndarray:
+        """Synthesize `text` to mono float32 samples in [-1, 1]."""
+        # Mock implementation - in production, integrate with:
+        # - Coqui / MMS TTS models fine-tuned for Kenyan languages
+        # - Google Text-to-Speech, Azure Cognitive Services, Amazon Polly
+        duration = len(text) * SECONDS_PER_CHARACTER
+        return np.zeros(int(duration * self.sample_rate), dtype=np.float32)
+
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences for incremental synthesis."""
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def streaming_wav_header(sample_rate: int = SAMPLE_RATE) -> bytes:
+    """
+    Header for a 16-bit mono WAV stream of unknown length.
+    
+    The RIFF and data sizes are set to 0xFFFFFFFF, which players treat as
+    "read until the end of the stream".
+    """
+    return b"".join((
+        b"RIFF", struct.pack("<I", 0xFFFFFFFF), b"WAVE",
+        b"fmt ", struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16),
+        b"data", struct.pack("<I", 0xFFFFFFFF)
+    ))
+
+
+def to_pcm16(samples: np.ndarray) -> bytes:
+    """Convert float samples to little-endian 16-bit PCM."""
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def write_wav(path: Union[str, Path], samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """Write mono float samples as a 16-bit PCM WAV file."""
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(to_pcm16(samples))
+
+
+_speech_synthesizer = None
+
+
+def get_speech_synthesizer() -> SpeechSynthesizer:
+    """Get the process-wide speech synthesizer."""
+    global _speech_synthesizer
+    
+    if _speech_synthesizer is None:
+        _speech_synthesizer = SpeechSynthesizer()
+    
+    return _speech_synthesizer
@@ -0,0 +1,125 @@
+"""
+Incremental speech-to-text over a stream of audio frames.
+
+Frames are decoded to float samples and fed through the energy VAD; each
+utterance it closes is resampled to 16 kHz and queued on the shared Whisper
+engine right away, so transcripts come back one utterance behind the
+speaker instead of after the whole recording.
+"""
+
+from typing import Set
+from fastapi import WebSocket
+import asyncio
+import numpy as np
+import structlog
+
+from app.core.config import settings
+from app.services.audio_preprocessing import get_resampler
+from app.services.speech_recognition import SAMPLE_RATE, WINDOW_SECONDS, get_speech_recognizer
+from app.services.voice_activity import EnergyVAD, SpeechSegment
+
+logger = structlog.get_logger(__name__)
+
+
+class StreamLimitExceeded(Exception):
+    """Raised when a stream runs past MAX_AUDIO_DURATION."""
+
+
+class StreamingTranscriptionSession:
+    """Per-connection state: frame decoding, segmentation and result ordering."""
+    
+    def __init__(self, language_code: str, sample_rate: int, encoding: str):
+        self.language_code = language_code
+        self.sample_rate = sample_rate
+        self.encoding = encoding
+        self.received_seconds = 0.0
+        self.vad = EnergyVAD(sample_rate=sample_rate, max_segment_seconds=WINDOW_SECONDS)
+        self._segments = 0
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._tasks: Set[asyncio.Task] = set()
+        self._opus_decoder = None
+        
+        if encoding == "opus":
+            try:
+                import opuslib
+            except Exception:
+                # opuslib raises a plain Exception when libopus itself is missing
+                raise ValueError("Opus streams are not available on this server")
+            if sample_rate not in (8000, 12000, 16000, 24000, 48000):
+                raise ValueError("Opus streams must use 8, 12, 16, 24 or 48 kHz")
+            self._opus_decoder = opuslib.Decoder(sample_rate, 1)
+    
+    def feed(self, data: bytes):
+        """Decode one message of audio and start transcribing completed utterances."""
+        samples = self._decode(data)
+        self.received_seconds += len(samples) / self.sample_rate
+        if self.received_seconds > settings.MAX_AUDIO_DURATION:
+            raise StreamLimitExceeded(f"Stream exceeds {settings.MAX_AUDIO_DURATION} seconds")
+        
+        for segment in self.vad.feed(samples):
+            self._transcribe(segment)
+    
+    def finish(self):
+        """Transcribe whatever is still open and mark the end of results."""
+        segment = self.vad.flush()
+        if segment is not None:
+            self._transcribe(segment)
+        self._pending.put_nowait(None)
+    
+    def cancel(self):
+        """Stop transcriptions still queued or running, e.g. after a disconnect."""
+        for task in self._tasks:
+            task.cancel()
+    
+    async def send_results(self, websocket: WebSocket):
+        """Send transcripts back in segment order as they complete."""
+        texts = []
+        while True:
+            item = await self._pending.get()
+            if item is None:
+                await websocket.send_json({"type": "final", "text": " ".join(texts)})
+                return
+            
+            index, segment, task = item
+            try:
+                result = await task
+            except Exception as e:
+                logger.error("Segment transcription failed", segment=index, error=str(e))
+                await websocket.send_json({"type": "error", "segment": index})
+                continue
+            
+            if result["text"]:
+                texts.append(result["text"])
+            await websocket.send_json({
+                "type": "partial",
+                "segment": index,
+                "start": round(segment.start, 3),
+                "end": round(segment.end, 3),
+                "text": result["text"],
+                "confidence": result["confidence"],
+                "real_time_factor": result["real_time_factor"],
+                "queue_wait_ms": result["queue_wait_ms"]
+            })
+    
+    def _transcribe(self, segment: SpeechSegment):
+        # Resample whole utterances so chunk boundaries leave no artifacts
+        audio = get_resampler(self.sample_rate, SAMPLE_RATE)(segment.audio)
+        
+        task = asyncio.create_task(
+            get_speech_recognizer().transcribe_audio(audio, self.language_code)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._pending.put_nowait((self._segments, segment, task))
+        self._segments += 1
+    
+    def _decode(self, data: bytes) -> np.ndarray:
+        if self.encoding == "float32":
+            return np.frombuffer(data[:len(data) - len(data) % 4], dtype="<f4")
+        
+        if self._opus_decoder is not None:
+            # 120 ms is the longest Opus frame
+            data = self._opus_decoder.decode(data, self.sample_rate * 120 // 1000)
+        
+        pcm = np.frombuffer(data[:len(data) - len(data) % 2], dtype="<i2")
+        return pcm.astype(np.float32) / 32768.0
@@ -0,0 +1,187 @@
+"""
+Canonical text normalization shared by detection, caching and inference.
+"""
+
+from typing import Dict, List, Optional, Union
+from sqlalchemy.orm import Session
+import hashlib
+import re
+import unicodedata
+import structlog
+
+from app.models.language import Language
+
+logger = structlog.get_logger(__name__)
+
+# Typographic punctuation folded to its ASCII equivalent. This table and the
+# key regexes below must match ml-pipeline/src/language_id_training.py, which
+# trains the language identifier on the same keys.
+_PUNCTUATION_TABLE = str.maketrans({
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u02bc": "'",  # modifier letter apostrophe, e.g. ng' in Swahili and Luo
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2013": "-",
+    "\u2014": "-",
+    "\u2026": "...",
+    "\u00a0": " ",
+})
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION_RE = re.compile(r"[\s.!?,;:]+$")
+
+# Orthography variant lines in Language.orthography_notes, e.g. "ĩ => i"
+_VARIANT_LINE_RE = re.compile(r"^\s*(\S+)\s*(?:=>|->)\s*(\S+)\s*$", re.MULTILINE)
+
+
+class NormalizedText:
+    """
+    Text after canonical normalization.
+    
+    `text` is the display form (NFC, folded punctuation, collapsed whitespace).
+    `key` is the matching form used for cache keys, detection and dictionary
+    lookups: casefolded, orthography variants mapped to their canonical
+    spelling and trailing punctuation stripped.
+    """
+    
+    def __init__(self, original: str, text: str, key: str, language_code: Optional[str] = None):
+        self.original = original
+        self.text = text
+        self.key = key
+        self.language_code = language_code
+        self._digest = None
+    
+    @property
+    def digest(self) -> str:
+        """SHA-256 hex digest of the matching key."""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.key.encode("utf-8")).hexdigest()
+        return self._digest
+    
+    def __repr__(self):
+        return f"<NormalizedText(key='{self.key[:50]}', language_code='{self.language_code}')>"
+
+
+class TextNormalizer:
+    """Precompiled normalization pipeline with per-language orthography variants."""
+    
+    def __init__(self, orthography_variants: Optional[Dict[str, Dict[str, str]]] = None):
+        self._variants: Dict[str, Dict[str, str]] = {}
+        self._variant_patterns: Dict[str, re.Pattern] = {}
+        
+        for language_code, variants in (orthography_variants or {}).items():
+            self.set_orthography_variants(language_code, variants)
+    
+    def set_orthography_variants(self, language_code: str, variants: Dict[str, str]):
+        """Register variant -> canonical spellings for a language."""
+        table = {
+            unicodedata.normalize("NFC", variant).casefold(): unicodedata.normalize("NFC", canonical).casefold()
+            for variant, canonical in variants.items()
+        }
+        
+        if not table:
+            self._variants.pop(language_code, None)
+            self._variant_patterns.pop(language_code, None)
+            return
+        
+        # Longest variants first so multi-character spellings win
+        alternatives = sorted(table, key=len, reverse=True)
+        self._variants[language_code] = table
+        self._variant_patterns[language_code] = re.compile(
+            "|".join(re.escape(variant) for variant in alternatives)
+        )
+    
+    def load_orthography(self, db: Session):
+        """Load orthography variants recorded in Language.orthography_notes."""
+        rows = db.query(Language.code, Language.orthography_notes).filter(
+            Language.orthography_notes.isnot(None)
+        ).all()
+        
+        for code, notes in rows:
+            variants = dict(_VARIANT_LINE_RE.findall(notes or ""))
+            self.set_orthography_variants(code, variants)
+        
+        logger.info("Loaded orthography variants", languages=len(self._variants))
+    
+    def normalize(self, text: str, language_code: Optional[str] = None) -> NormalizedText:
+        """Run the full normalization pipeline over raw input text."""
+        display = unicodedata.normalize("NFC", text).translate(_PUNCTUATION_TABLE)
+        display = _WHITESPACE_RE.sub(" ", display).strip()
+        
+        base_key = _TRAILING_PUNCTUATION_RE.sub("", display.casefold())
+        normalized = NormalizedText(text, display, base_key)
+        return self.for_language(normalized, language_code)
+    
+    def for_language(self, normalized: NormalizedText, language_code: Optional[str]) -> NormalizedText:
+        """Apply a language's orthography variants to already normalized text."""
+        if language_code == normalized.language_code:
+            return normalized
+        
+        key = normalized.key
+        if normalized.language_code is not None:
+            # Re-derive the language-neutral key before applying other variants
+            key = _TRAILING_PUNCTUATION_RE.sub("", normalized.text.casefold())
+        
+        pattern = self._variant_patterns.get(language_code)
+        if pattern is not None:
+            table = self._variants[language_code]
+            key = pattern.sub(lambda match: table[match.group(0)], key)
+        
+        return NormalizedText(normalized.original, normalized.text, key, language_code)
+    
+    def ensure(
+        self, text: Union[str, NormalizedText], language_code: Optional[str] = None
+    ) -> NormalizedText:
+        """Normalize raw text, or adapt already normalized text to a language."""
+        if isinstance(text, NormalizedText):
+            return self.for_language(text, language_code)
+        return self.normalize(text, language_code)
+    
+    def invariant_words(self, normalized: NormalizedText) -> List[str]:
+        """
+        Words of the key that every text with the same key contains, ignoring case.
+        
+        Skips words with punctuation (folded from typographic forms) and words
+        touched by an orthography variant of the key's language.
+        """
+        table = self._variants.get(normalized.language_code, {})
+        spellings = set(table) | set(table.values())
+        return [
+            word for word in normalized.key.split()
+            if word.isalpha() and not any(spelling in word for spelling in spellings)
+        ]
+
+
+_text_normalizer: Optional[TextNormalizer] = None
+
+
+def get_text_normalizer(db: Optional[Session] = None) -> TextNormalizer:
+    """
+    Get the process-wide text normalizer.
+    
+    Orthography variants are loaded from the database the first time a
+    session is available.
+    """
+    global _text_normalizer
+    
+    if _text_normalizer is None:
+        normalizer = TextNormalizer()
+        if db is None:
+            return normalizer
+        
+        try:
+            normalizer.load_orthography(db)
+        except Exception as e:
+            logger.error("Failed to load orthography variants", error=str(e))
+            return normalizer
+        
+        _text_normalizer = normalizer
+    
+    return _text_normalizer
+
+
+def reset_text_normalizer():
+    """Drop the cached normalizer so orthography variants are reloaded."""
+    global _text_normalizer
+    _text_normalizer = None
@@ -0,0 +1,121 @@
+"""
+Schema upgrade and backfill for the translation cache key.
+
+Cached translations are looked up by `translations.source_hash`, the
+SHA-256 of the normalized source text. Databases created before the column
+existed need it added along with its lookup index, and rows without a hash
+are never found by the cache, so the hash is backfilled from `source_text`
+with the same normalizer the translation service uses.
+
+Rows are read in primary-key order and each batch is committed on its own,
+so the backfill never holds a long transaction and can be rerun. After
+orthography variants change, `--all` recomputes every hash.
+
+Usage: python -m app.services.translation_cache_migration [--all]
+"""
+
+from typing import Dict, List
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+import argparse
+import structlog
+
+from app.models.language import Language
+from app.models.translation import Translation
+from app.services.text_normalization import TextNormalizer
+
+logger = structlog.get_logger(__name__)
+
+
+class TranslationHashMigrator:
+    """Adds and backfills translations.source_hash, batch by batch."""
+    
+    def __init__(self, db: Session, batch_size: int = 1000):
+        self.db = db
+        self.batch_size = batch_size
+    
+    def prepare(self):
+        """Add the hash column and cache lookup index to an existing table."""
+        self.db.execute(text(
+            "ALTER TABLE translations ADD COLUMN IF NOT EXISTS source_hash VARCHAR(64)"
+        ))
+        self.db.commit()
+        
+        bind = self.db.get_bind()
+        for index in Translation.__table__.indexes:
+            index.create(bind=bind, checkfirst=True)
+    
+    def run(self, recompute: bool = False) -> Dict[str, int]:
+        """
+        Hash translations that have no source_hash, or every row with `recompute`.
+        
+        Returns counts of updated and unchanged rows.
+        """
+        counts = {"updated": 0, "unchanged": 0}
+        normalizer = TextNormalizer()
+        normalizer.load_orthography(self.db)
+        language_codes = dict(self.db.query(Language.id, Language.code).all())
+        last_id = 0
+        
+        try:
+            while True:
+                rows = self._next_batch(last_id, recompute)
+                if not rows:
+                    break
+                
+                updates = []
+                for row in rows:
+                    digest = normalizer.normalize(
+                        row.source_text, language_codes.get(row.source_lang_id)
+                    ).digest
+                    if digest == row.source_hash:
+                        counts["unchanged"] += 1
+                    else:
+                        updates.append({"id": row.id, "source_hash": digest})
+                
+                if updates:
+                    self.db.execute(update(Translation), updates)
+                    counts["updated"] += len(updates)
+                self.db.commit()
+                last_id = rows[-1].id
+            
+            logger.info("Translation hash backfill finished", **counts)
+            return counts
+            
+        except Exception as e:
+            logger.error("Translation hash backfill failed", last_id=last_id, error=str(e))
+            self.db.rollback()
+            raise
+    
+    def _next_batch(self, last_id: int, recompute: bool) -> List:
+        query = self.db.query(
+            Translation.id, Translation.source_lang_id, Translation.source_text, Translation.source_hash
+        ).filter(Translation.id > last_id)
+        if not recompute:
+            query = query.filter(Translation.source_hash.is_(None))
+        
+        return query.order_by(Translation.id).limit(self.batch_size).all()
+
+
+def main():
+    from app.core.database import SessionLocal
+    from app.core.logging import setup_logging
+    
+    parser = argparse.ArgumentParser(description="Add and backfill translation cache hashes")
+    parser.add_argument("--all", action="store_true", help="Recompute every hash")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    
+    setup_logging()
+    db = SessionLocal()
+    try:
+        migrator = TranslationHashMigrator(db, batch_size=args.batch_size)
+        migrator.prepare()
+        counts = migrator.run(recompute=args.all)
+        print(f"Updated {counts['updated']}, unchanged {counts['unchanged']} translations")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Offline bulk translation jobs with JSONL input and output.
+
+Jobs live under settings.JOB_DIR, one directory per job holding the uploaded
+input.jsonl, the results.jsonl written as lines are processed, and a
+status.json file. Jobs run on a Celery worker when CELERY_BROKER_URL is set
+(the worker must share JOB_DIR) and on an in-process thread pool otherwise.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional
+from fastapi import UploadFile
+import asyncio
+import json
+import os
+import uuid
+import structlog
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.translation_service import TranslationService
+
+logger = structlog.get_logger(__name__)
+
+
+class TranslationJobStore:
+    """Filesystem layout and status bookkeeping for translation jobs."""
+    
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or settings.JOB_DIR)
+    
+    def job_dir(self, job_id: str) -> Path:
+        # Job IDs are uuid4 hex strings; reject anything that could escape root
+        if len(job_id) != 32 or not all(c in "0123456789abcdef" for c in job_id):
+            raise ValueError(f"Invalid job ID: {job_id}")
+        return self.root / job_id
+    
+    def input_path(self, job_id: str) -> Path:
+        return self.job_dir(job_id) / "input.jsonl"
+    
+    def results_path(self, job_id: str) -> Path:
+        return self.job_dir(job_id) / "results.jsonl"
+    
+    async def create_job(
+        self,
+        upload: UploadFile,
+        source_lang: str,
+        target_lang: str,
+        model_version: Optional[str] = None
+    ) -> dict:
+        """Stream an uploaded JSONL file to disk and register a queued job."""
+        job_id = uuid.uuid4().hex
+        job_dir = self.job_dir(job_id)
+        job_dir.mkdir(parents=True)
+        
+        total = 0
+        last_byte = b"\n"
+        with open(self.input_path(job_id), "wb") as f:
+            while True:
+                chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                total += chunk.count(b"\n")
+                last_byte = chunk[-1:]
+        
+        if last_byte != b"\n":
+            total += 1  # Final line without a trailing newline
+        
+        now = datetime.now(timezone.utc).isoformat()
+        status = {
+            "job_id": job_id,
+            "status": "queued",
+            "source_lang": source_lang,
+            "target_lang": target_lang,
+            "model_version": model_version,
+            "total": total,
+            "processed": 0,
+            "failed": 0,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        self.write_status(job_id, status)
+        
+        return status
+    
+    def read_status(self, job_id: str) -> Optional[dict]:
+        """Read a job's status, or None if the job does not exist."""
+        try:
+            with open(self.job_dir(job_id) / "status.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def write_status(self, job_id: str, status: dict):
+        """Atomically replace a job's status file."""
+        status["updated_at"] = datetime.now(timezone.utc).isoformat()
+        path = self.job_dir(job_id) / "status.json"
+        tmp_path = path.with_suffix(".tmp")
+        
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(status, f)
+        os.replace(tmp_path, path)
+    
+    def iter_results(self, job_id: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Stream the results file in fixed-size chunks."""
+        with open(self.results_path(job_id), "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+async def process_translation_job(job_id: str, store: Optional[TranslationJobStore] = None):
+    """Translate a job's input in chunks, appending JSONL results as it goes."""
+    store = store or TranslationJobStore()
+    status = store.read_status(job_id)
+    if status is None:
+        logger.error("Translation job not found", job_id=job_id)
+        return
+    
+    status.update(status="running", processed=0, failed=0, error=None)
+    store.write_status(job_id, status)
+    logger.info("Translation job started", job_id=job_id, total=status["total"])
+    
+    db = SessionLocal()
+    try:
+        translation_service = TranslationService(db)
+        
+        with open(store.input_path(job_id), "r", encoding="utf-8") as source, \
+                open(store.results_path(job_id), "w", encoding="utf-8") as results:
+            line_number = 0
+            while True:
+                lines = list(islice(source, settings.JOB_CHUNK_SIZE))
+                if not lines:
+                    break
+                
+                records = await _translate_chunk(
+                    translation_service, lines, line_number, status
+                )
+                line_number += len(lines)
+                
+                for record in records:
+                    results.write(json.dumps(record, ensure_ascii=False) + "\n")
+                results.flush()
+                
+                status["processed"] += len(records)
+                status["failed"] += sum(1 for record in records if "error" in record)
+                store.write_status(job_id, status)
+        
+        status["status"] = "completed"
+        store.write_status(job_id, status)
+        logger.info(
+            "Translation job completed", job_id=job_id,
+            processed=status["processed"], failed=status["failed"]
+        )
+        
+    except Exception as e:
+        logger.error("Translation job failed", job_id=job_id, error=str(e))
+        status.update(status="failed", error=str(e))
+        store.write_status(job_id, status)
+    finally:
+        db.close()
+
+
+async def _translate_chunk(
+    translation_service: TranslationService,
+    lines: List[str],
+    first_line: int,
+    status: dict
+) -> List[dict]:
+    """Translate one chunk of JSONL lines, grouped by language pair."""
+    records = [None] * len(lines)
+    groups = {}
+    
+    for i, line in enumerate(lines):
+        record = {"line": first_line + i + 1}
+        try:
+            item = json.loads(line)
+            record["id"] = item.get("id")
+            text = item["text"]
+            if not isinstance(text, str) or not text.strip():
+                raise ValueError("text must be a non-empty string")
+            pair = (
+                item.get("source_lang") or status["source_lang"],
+                item.get("target_lang") or status["target_lang"]
+            )
+            # A bad line must not fail the batch of the pair it would join
+            if not all(isinstance(code, str) for code in pair):
+                raise ValueError("source_lang and target_lang must be strings")
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            record["error"] = f"Invalid input line: {e}"
+            records[i] = record
+            continue
+        
+        record.update(source_text=text, source_lang=pair[0], target_lang=pair[1])
+        records[i] = record
+        groups.setdefault(pair, []).append(i)
+    
+    for (source_lang, target_lang), indexes in groups.items():
+        try:
+            results = await translation_service.translate_many(
+                [records[i]["source_text"] for i in indexes],
+                source_lang,
+                target_lang,
+                status.get("model_version")
+            )
+        except Exception as e:
+            translation_service.db.rollback()
+            for i in indexes:
+                records[i]["error"] = str(e)
+            continue
+        
+        for i, result in zip(indexes, results):
+            records[i].update(
+                target_text=result.target_text,
+                confidence_score=result.confidence_score,
+                model_version=result.model_version
+            )
+    
+    return records
+
+
+def _run_job(job_id: str):
+    asyncio.run(process_translation_job(job_id))
+
+
+class TranslationJobRunner:
+    """Dispatches jobs to Celery when configured, or to a local worker pool."""
+    
+    def __init__(self):
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def submit(self, job_id: str):
+        if settings.CELERY_BROKER_URL:
+            from app.worker import run_translation_job
+            run_translation_job.delay(job_id)
+            return
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.JOB_WORKERS,
+                thread_name_prefix="translation-job"
+            )
+        self._executor.submit(_run_job, job_id)
+
+
+job_runner = TranslationJobRunner()
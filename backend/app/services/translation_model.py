@@ -0,0 +1,197 @@
+"""
+Translation model wrapper with separate encode and decode steps.
+"""
+
+from typing import Dict, List, Optional
+import structlog
+
+from app.core.config import settings
+from app.services.text_normalization import NormalizedText
+
+logger = structlog.get_logger(__name__)
+
+# FLORES-200 codes used by NLLB tokenizers, for the platform languages NLLB covers
+NLLB_LANGUAGE_CODES = {
+    "en": "eng_Latn",
+    "sw": "swh_Latn",
+    "ki": "kik_Latn",
+    "luo": "luo_Latn",
+    "kam": "kam_Latn",
+    "gax": "gaz_Latn",
+    "so": "som_Latn",
+}
+
+
+class EncodedSource:
+    """Encoder output for a source text, reusable across target decoders."""
+    
+    def __init__(
+        self, source: NormalizedText, source_lang: str, encoder_outputs=None, attention_mask=None
+    ):
+        self.source = source
+        self.source_lang = source_lang
+        self.encoder_outputs = encoder_outputs
+        self.attention_mask = attention_mask
+
+
+class TranslationModel:
+    """
+    Sequence-to-sequence translation model.
+    
+    Encoding and decoding are exposed separately so that a source text can be
+    encoded once and decoded into several target languages.
+    """
+    
+    def __init__(self, model_name: Optional[str] = None):
+        self.model_name = model_name
+        self.tokenizer = None
+        self.model = None
+        self.language_codes: Dict[str, str] = {}  # Platform code -> tokenizer code
+        
+        if model_name:
+            self._load_model()
+    
+    def _load_model(self):
+        """Load the Hugging Face model and tokenizer."""
+        from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+        
+        logger.info("Loading translation model", model=self.model_name)
+        self.tokenizer = AutoTokenizer.from_pretrained(
+            self.model_name, cache_dir=settings.HUGGINGFACE_CACHE_DIR
+        )
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(
+            self.model_name, cache_dir=settings.HUGGINGFACE_CACHE_DIR
+        )
+        self.model.eval()
+        
+        if "nllb" in type(self.tokenizer).__name__.lower():
+            self.language_codes = NLLB_LANGUAGE_CODES
+    
+    def model_language(self, language_code: str) -> str:
+        """The tokenizer's code for a platform language code."""
+        return self.language_codes.get(language_code, language_code)
+    
+    def language_token_id(self, language_code: str) -> int:
+        """
+        Token ID that starts generation in a target language.
+        
+        Tokenizers name language tokens differently (M2M100 uses "__sw__",
+        NLLB uses "swh_Latn"), so both forms are looked up by token.
+        """
+        model_code = self.model_language(language_code)
+        for token in (model_code, f"__{model_code}__"):
+            token_id = self.tokenizer.convert_tokens_to_ids(token)
+            if token_id is not None and token_id != self.tokenizer.unk_token_id:
+                return token_id
+        raise ValueError(f"Model {self.model_name} does not support language: {language_code}")
+    
+    def encode(self, source: NormalizedText, source_lang: str) -> EncodedSource:
+        """Run the encoder over normalized source text."""
+        if self.model is None:
+            return EncodedSource(source, source_lang)
+        
+        import torch
+        
+        self.tokenizer.src_lang = self.model_language(source_lang)
+        inputs = self.tokenizer(source.text, return_tensors="pt")
+        with torch.no_grad():
+            encoder_outputs = self.model.get_encoder()(**inputs)
+        
+        return EncodedSource(
+            source,
+            source_lang,
+            encoder_outputs=encoder_outputs,
+            attention_mask=inputs["attention_mask"]
+        )
+    
+    def decode(self, encoded: EncodedSource, target_lang: str) -> str:
+        """Decode a previously encoded source into the target language."""
+        if encoded.source_lang == target_lang:
+            return encoded.source.text
+        
+        if self.model is None:
+            return self._mock_decode(encoded, target_lang)
+        
+        import torch
+        
+        with torch.no_grad():
+            generated = self.model.generate(
+                encoder_outputs=encoded.encoder_outputs,
+                attention_mask=encoded.attention_mask,
+                forced_bos_token_id=self.language_token_id(target_lang)
+            )
+        return self.tokenizer.batch_decode(generated, skip_special_tokens=True)[0]
+    
+    def translate_batch(
+        self, sources: List[NormalizedText], source_lang: str, target_lang: str
+    ) -> List[str]:
+        """Translate a batch of normalized texts in one padded forward pass."""
+        if self.model is None or source_lang == target_lang:
+            return [
+                self.decode(EncodedSource(source, source_lang), target_lang)
+                for source in sources
+            ]
+        
+        import torch
+        
+        self.tokenizer.src_lang = self.model_language(source_lang)
+        inputs = self.tokenizer(
+            [source.text for source in sources], return_tensors="pt", padding=True
+        )
+        with torch.no_grad():
+            generated = self.model.generate(
+                **inputs,
+                forced_bos_token_id=self.language_token_id(target_lang)
+            )
+        return self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+    
+    def _mock_decode(self, encoded: EncodedSource, target_lang: str) -> str:
+        """
+        Mock decoder used until trained models are available.
+        In production, integrate with:
+        - OpenNMT-py models
+        - Hugging Face Transformers
+        - Custom trained models
+        """
+        source_text = encoded.source.text
+        source_key = encoded.source.key
+        source_lang = encoded.source_lang
+        
+        if source_lang == "en" and target_lang == "sw":
+            # English to Swahili mock
+            mock_translations = {
+                "hello": "hujambo",
+                "good morning": "habari za asubuhi",
+                "thank you": "asante",
+                "how are you": "habari yako",
+                "goodbye": "kwaheri"
+            }
+            return mock_translations.get(source_key, f"[{source_text}] (translated to Swahili)")
+            
+        elif source_lang == "sw" and target_lang == "en":
+            # Swahili to English mock
+            mock_translations = {
+                "hujambo": "hello",
+                "habari za asubuhi": "good morning",
+                "asante": "thank you",
+                "habari yako": "how are you",
+                "kwaheri": "goodbye"
+            }
+            return mock_translations.get(source_key, f"[{source_text}] (translated to English)")
+            
+        else:
+            # Generic mock for other language pairs
+            return f"[{source_text}] (translated from {source_lang} to {target_lang})"
+
+
+_translation_model: Optional[TranslationModel] = None
+
+
+def get_translation_model() -> TranslationModel:
+    """Get the process-wide translation model, loading it on first use."""
+    global _translation_model
+    
+    if _translation_model is None:
+        _translation_model = TranslationModel(settings.TRANSLATION_MODEL_NAME or None)
+    
+    return _translation_model
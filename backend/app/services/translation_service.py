@@ -2,18 +2,37 @@
 Translation service for handling translation logic.
 """
 
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict, Union
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
+from starlette.concurrency import run_in_threadpool
 import structlog
 import time
 
+from app.core.admission import Deadline
+from app.core.config import settings
 from app.models.translation import Translation, TranslationRequest
 from app.models.language import Language
 from app.schemas.translation import TranslationHistory, TranslationFeedback
+from app.services.language_detection import (
+    UNDETERMINED_LANGUAGE, LanguageDetectionResult, LanguageDetectionService
+)
+from app.services.text_normalization import NormalizedText, get_text_normalizer
+from app.services.translation_model import get_translation_model
 
 logger = structlog.get_logger(__name__)
 
+# Source language value that requests inline language detection
+AUTO_SOURCE_LANG = "auto"
+
+
+class TranslationResult:
+    """Result of a translation, including the hops taken to produce it."""
+    
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
 
 class TranslationService:
     """Service for handling translation operations."""
@@ -23,74 +42,452 @@ class TranslationService:
     
     async def translate(
         self,
-        source_text: str,
+        source_text: Union[str, NormalizedText],
         source_lang: str,
         target_lang: str,
-        model_version: Optional[str] = None
-    ) -> dict:
+        model_version: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> TranslationResult:
         """
         Translate text from source language to target language.
+        
+        Pairs without a direct model are routed through the pivot language
+        (e.g. ki -> sw -> luo). Each hop is cached on its own, so translating
+        one source into many targets reuses the first hop.
+        
+        The source is normalized once here (or by the caller) and the same
+        normalized text is used for the cache key and for inference. If the
+        deadline passes before inference starts, DeadlineExceeded is raised.
+        
+        With source_lang="auto" the language is detected from the normalized
+        text and the detection is reported on the result.
         """
         try:
-            # For now, implement a simple mock translation
-            # In production, this would integrate with ML models
+            source, source_lang, detection = await self._resolve_source(source_text, source_lang)
+            results = await self._translate_targets(
+                source, source_lang, [target_lang], model_version, deadline
+            )
+            return self._with_detection(results[target_lang], detection)
             
-            # Check if we have a cached translation
-            cached_translation = self._get_cached_translation(
-                source_text, source_lang, target_lang
+        except Exception as e:
+            logger.error("Translation failed", error=str(e))
+            raise
+    
+    async def translate_multi(
+        self,
+        source_text: Union[str, NormalizedText],
+        source_lang: str,
+        target_langs: List[str],
+        model_version: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, TranslationResult]:
+        """
+        Translate one source text into several target languages.
+        
+        The source is encoded once and the encoder outputs are shared by the
+        decoder for every target. Cached translations for all targets are
+        fetched in a single query.
+        """
+        try:
+            source, source_lang, detection = await self._resolve_source(source_text, source_lang)
+            results = await self._translate_targets(
+                source, source_lang, list(dict.fromkeys(target_langs)), model_version, deadline
+            )
+            return {
+                target_lang: self._with_detection(result, detection)
+                for target_lang, result in results.items()
+            }
+            
+        except Exception as e:
+            logger.error("Multi-target translation failed", error=str(e))
+            raise
+    
+    async def _translate_targets(
+        self,
+        source: NormalizedText,
+        source_lang: str,
+        target_langs: List[str],
+        model_version: Optional[str],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, TranslationResult]:
+        """Translate into each target, fanning out per hop of the planned routes."""
+        routes = {
+            target_lang: self._plan_route(source_lang, target_lang)
+            for target_lang in target_langs
+        }
+        
+        # First hop: source -> target (direct) or source -> pivot
+        first_hop_targets = list(dict.fromkeys(route[0][1] for route in routes.values()))
+        first_hops = await self._translate_fan_out(
+            source, source_lang, first_hop_targets, model_version, deadline
+        )
+        
+        # Second hop: pivot -> target, sharing a single pivot translation
+        pivot_targets = list(dict.fromkeys(
+            route[1][1] for route in routes.values() if len(route) > 1
+        ))
+        second_hops = {}
+        if pivot_targets:
+            pivot = settings.PIVOT_LANGUAGE
+            intermediate = get_text_normalizer(self.db).normalize(
+                first_hops[pivot]["target_text"], pivot
             )
+            second_hops = await self._translate_fan_out(
+                intermediate, pivot, pivot_targets, model_version, deadline
+            )
+        
+        results = {}
+        for target_lang, route in routes.items():
+            hops = [first_hops[route[0][1]]]
+            if len(route) > 1:
+                hops.append(second_hops[target_lang])
+            results[target_lang] = self._build_result(hops)
+        
+        return results
+    
+    async def translate_many(
+        self,
+        source_texts: List[Union[str, NormalizedText]],
+        source_lang: str,
+        target_lang: str,
+        model_version: Optional[str] = None,
+        deadline: Optional[Deadline] = None
+    ) -> List[TranslationResult]:
+        """
+        Translate many texts between the same pair of languages.
+        
+        Each hop looks up all texts in the translation cache with one query
+        and sends the misses to the model as batches. With source_lang="auto"
+        all texts are detected in one batch and translated in groups of the
+        same detected language.
+        """
+        try:
+            normalizer = get_text_normalizer(self.db)
+            
+            if source_lang != AUTO_SOURCE_LANG:
+                sources = [normalizer.ensure(text, source_lang) for text in source_texts]
+                return await self._translate_pair_batch(
+                    sources, source_lang, target_lang, model_version, deadline
+                )
             
-            if cached_translation:
-                return {
-                    "target_text": cached_translation.target_text,
-                    "confidence_score": cached_translation.confidence_score,
-                    "model_version": cached_translation.model_version
-                }
+            normalized = [normalizer.ensure(text) for text in source_texts]
+            detections = await LanguageDetectionService(self.db).detect_languages(normalized)
+            self._check_detected(detections)
             
-            # Perform translation (mock implementation)
-            target_text = await self._perform_translation(
-                source_text, source_lang, target_lang, model_version
+            groups = {}
+            for i, detection in enumerate(detections):
+                groups.setdefault(detection.language, []).append(i)
+            
+            results = [None] * len(normalized)
+            for language, indexes in groups.items():
+                group_results = await self._translate_pair_batch(
+                    [normalizer.for_language(normalized[i], language) for i in indexes],
+                    language,
+                    target_lang,
+                    model_version,
+                    deadline
+                )
+                for i, result in zip(indexes, group_results):
+                    results[i] = self._with_detection(result, detections[i])
+            
+            return results
+            
+        except Exception as e:
+            logger.error("Batch translation failed", error=str(e))
+            raise
+    
+    async def _translate_pair_batch(
+        self,
+        sources: List[NormalizedText],
+        source_lang: str,
+        target_lang: str,
+        model_version: Optional[str],
+        deadline: Optional[Deadline] = None
+    ) -> List[TranslationResult]:
+        """Translate normalized texts between one language pair, hop by hop."""
+        normalizer = get_text_normalizer(self.db)
+        hops_per_text = [[] for _ in sources]
+        
+        for hop_source, hop_target in self._plan_route(source_lang, target_lang):
+            hop_results = await self._translate_hop_batch(
+                sources, hop_source, hop_target, model_version, deadline
+            )
+            for hops, hop in zip(hops_per_text, hop_results):
+                hops.append(hop)
+            
+            sources = [normalizer.normalize(hop["target_text"], hop_target) for hop in hop_results]
+        
+        return [self._build_result(hops) for hops in hops_per_text]
+    
+    async def _resolve_source(
+        self, source_text: Union[str, NormalizedText], source_lang: str
+    ) -> Tuple[NormalizedText, str, Optional[LanguageDetectionResult]]:
+        """Normalize the source, detecting its language when source_lang is "auto"."""
+        normalizer = get_text_normalizer(self.db)
+        
+        if source_lang != AUTO_SOURCE_LANG:
+            return normalizer.ensure(source_text, source_lang), source_lang, None
+        
+        normalized = normalizer.ensure(source_text)
+        detection = await LanguageDetectionService(self.db).detect_language(normalized)
+        self._check_detected([detection])
+        return normalizer.for_language(normalized, detection.language), detection.language, detection
+    
+    def _check_detected(self, detections: List[LanguageDetectionResult]):
+        """Raise ValueError unless every detected source language is a supported one."""
+        languages = {detection.language for detection in detections}
+        if UNDETERMINED_LANGUAGE in languages:
+            raise ValueError("Could not detect the source language; set source_lang explicitly")
+        
+        supported = {code for code, in self.db.query(Language.code).filter(Language.code.in_(languages))}
+        unsupported = languages - supported
+        if unsupported:
+            raise ValueError(
+                f"Detected source language is not supported: {', '.join(sorted(unsupported))}"
             )
+    
+    def _build_result(self, hops: List[dict]) -> TranslationResult:
+        """Combine the hops of a route into a single translation result."""
+        confidence = 1.0
+        for hop in hops:
+            confidence *= hop["confidence_score"] or 0.0
+        
+        return TranslationResult(
+            source_lang=hops[0]["source_lang"],
+            target_text=hops[-1]["target_text"],
+            confidence_score=round(confidence, 4),
+            model_version=hops[-1]["model_version"],
+            hops=hops,
+            detected_language=None,
+            detection_confidence=None
+        )
+    
+    def _with_detection(
+        self, result: TranslationResult, detection: Optional[LanguageDetectionResult]
+    ) -> TranslationResult:
+        """Record an inline language detection on a translation result."""
+        if detection is not None:
+            result.detected_language = detection.language
+            result.detection_confidence = detection.confidence
+        return result
+    
+    def _plan_route(self, source_lang: str, target_lang: str) -> List[Tuple[str, str]]:
+        """Plan the (source, target) hops needed to translate between two languages."""
+        pivot = settings.PIVOT_LANGUAGE
+        direct_languages = set(settings.DIRECT_PAIR_LANGUAGES)
+        
+        if (
+            source_lang == target_lang
+            or source_lang in direct_languages
+            or target_lang in direct_languages
+        ):
+            return [(source_lang, target_lang)]
+        
+        return [(source_lang, pivot), (pivot, target_lang)]
+    
+    async def _translate_fan_out(
+        self,
+        source: NormalizedText,
+        source_lang: str,
+        target_langs: List[str],
+        model_version: Optional[str],
+        deadline: Optional[Deadline] = None
+    ) -> Dict[str, dict]:
+        """
+        Translate a single hop into several targets.
+        
+        All targets are looked up in the translation cache with one query; the
+        misses share one encoder pass and are decoded per target.
+        """
+        start_time = time.time()
+        
+        language_ids = self._get_language_ids([source_lang] + target_langs)
+        cached = self._get_cached_translations(
+            source, source_lang, target_langs, language_ids
+        )
+        lookup_ms = int((time.time() - start_time) * 1000)
+        
+        hops = {}
+        for target_lang, translation in cached.items():
+            hops[target_lang] = {
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "target_text": translation.target_text,
+                "confidence_score": translation.confidence_score,
+                "model_version": translation.model_version,
+                "cached": True,
+                "latency_ms": lookup_ms
+            }
+        
+        missing = [target_lang for target_lang in target_langs if target_lang not in cached]
+        if not missing:
+            return hops
+        
+        # Drop the request rather than start inference it can no longer use
+        if deadline is not None:
+            deadline.check("inference")
+        
+        # Encode once, decode per target
+        model = get_translation_model()
+        encode_start = time.time()
+        encoded = await run_in_threadpool(model.encode, source, source_lang)
+        encode_ms = int((time.time() - encode_start) * 1000)
+        
+        for target_lang in missing:
+            if deadline is not None:
+                deadline.check("decoding")
+            
+            decode_start = time.time()
+            target_text = await run_in_threadpool(model.decode, encoded, target_lang)
+            decode_ms = int((time.time() - decode_start) * 1000)
             
             # Store translation in database
-            translation = Translation(
-                source_lang_id=self._get_language_id(source_lang),
-                target_lang_id=self._get_language_id(target_lang),
-                source_text=source_text,
+            self.db.add(Translation(
+                source_lang_id=language_ids[source_lang],
+                target_lang_id=language_ids[target_lang],
+                source_text=source.text,
+                source_hash=source.digest,
                 target_text=target_text,
                 confidence_score=0.85,  # Mock confidence
                 model_version=model_version or "v1.0",
                 is_verified=False
-            )
-            
-            self.db.add(translation)
-            self.db.commit()
-            self.db.refresh(translation)
+            ))
             
-            return {
+            hops[target_lang] = {
+                "source_lang": source_lang,
+                "target_lang": target_lang,
                 "target_text": target_text,
                 "confidence_score": 0.85,
-                "model_version": model_version or "v1.0"
+                "model_version": model_version or "v1.0",
+                "cached": False,
+                "latency_ms": lookup_ms + encode_ms + decode_ms
             }
+        
+        self.db.commit()
+        return hops
+    
+    async def _translate_hop_batch(
+        self,
+        sources: List[NormalizedText],
+        source_lang: str,
+        target_lang: str,
+        model_version: Optional[str],
+        deadline: Optional[Deadline] = None
+    ) -> List[dict]:
+        """
+        Translate a single hop for many texts.
+        
+        Cache hits for every text are fetched with one query. Misses are
+        deduplicated by digest and translated in model batches.
+        """
+        start_time = time.time()
+        
+        language_ids = self._get_language_ids([source_lang, target_lang])
+        digests = list({source.digest for source in sources})
+        
+        translations = {}
+        for i in range(0, len(digests), settings.TRANSLATION_BATCH_SIZE):
+            rows = self.db.query(Translation).filter(
+                and_(
+                    Translation.source_lang_id == language_ids[source_lang],
+                    Translation.target_lang_id == language_ids[target_lang],
+                    Translation.source_hash.in_(digests[i:i + settings.TRANSLATION_BATCH_SIZE])
+                )
+            ).all()
+            for translation in rows:
+                translations.setdefault(translation.source_hash, {
+                    "target_text": translation.target_text,
+                    "confidence_score": translation.confidence_score,
+                    "model_version": translation.model_version,
+                    "cached": True
+                })
+        
+        missing = list({
+            source.digest: source for source in sources if source.digest not in translations
+        }.values())
+        
+        if missing:
+            if deadline is not None:
+                deadline.check("inference")
             
-        except Exception as e:
-            logger.error("Translation failed", error=str(e))
-            raise
+            model = get_translation_model()
+            for i in range(0, len(missing), settings.TRANSLATION_BATCH_SIZE):
+                if deadline is not None:
+                    deadline.check("inference")
+                
+                chunk = missing[i:i + settings.TRANSLATION_BATCH_SIZE]
+                target_texts = await run_in_threadpool(
+                    model.translate_batch, chunk, source_lang, target_lang
+                )
+                
+                for source, target_text in zip(chunk, target_texts):
+                    self.db.add(Translation(
+                        source_lang_id=language_ids[source_lang],
+                        target_lang_id=language_ids[target_lang],
+                        source_text=source.text,
+                        source_hash=source.digest,
+                        target_text=target_text,
+                        confidence_score=0.85,  # Mock confidence
+                        model_version=model_version or "v1.0",
+                        is_verified=False
+                    ))
+                    translations[source.digest] = {
+                        "target_text": target_text,
+                        "confidence_score": 0.85,
+                        "model_version": model_version or "v1.0",
+                        "cached": False
+                    }
+            
+            self.db.commit()
+        
+        latency_ms = int((time.time() - start_time) * 1000)
+        return [
+            dict(
+                translations[source.digest],
+                source_lang=source_lang,
+                target_lang=target_lang,
+                latency_ms=latency_ms
+            )
+            for source in sources
+        ]
     
-    def _get_cached_translation(
-        self, source_text: str, source_lang: str, target_lang: str
-    ) -> Optional[Translation]:
-        """Get cached translation from database."""
-        source_lang_id = self._get_language_id(source_lang)
-        target_lang_id = self._get_language_id(target_lang)
+    def _get_cached_translations(
+        self,
+        source: NormalizedText,
+        source_lang: str,
+        target_langs: List[str],
+        language_ids: Dict[str, int]
+    ) -> Dict[str, Translation]:
+        """Get cached translations for several target languages in one query."""
+        target_codes = {language_ids[code]: code for code in target_langs}
         
-        return self.db.query(Translation).filter(
+        translations = self.db.query(Translation).filter(
             and_(
-                Translation.source_lang_id == source_lang_id,
-                Translation.target_lang_id == target_lang_id,
-                Translation.source_text == source_text
+                Translation.source_lang_id == language_ids[source_lang],
+                Translation.source_hash == source.digest,
+                Translation.target_lang_id.in_(list(target_codes))
             )
-        ).first()
+        ).all()
+        
+        cached = {}
+        for translation in translations:
+            cached.setdefault(target_codes[translation.target_lang_id], translation)
+        
+        return cached
+    
+    def _get_language_ids(self, language_codes: List[str]) -> Dict[str, int]:
+        """Get language IDs for several codes in one query."""
+        codes = set(language_codes)
+        rows = self.db.query(Language.code, Language.id).filter(
+            Language.code.in_(codes)
+        ).all()
+        
+        language_ids = {code: language_id for code, language_id in rows}
+        missing = codes - set(language_ids)
+        if missing:
+            raise ValueError(f"Language not found: {', '.join(sorted(missing))}")
+        
+        return language_ids
     
     def _get_language_id(self, language_code: str) -> int:
         """Get language ID by code."""
@@ -103,43 +500,6 @@ class TranslationService:
         
         return language.id
     
-    async def _perform_translation(
-        self, source_text: str, source_lang: str, target_lang: str, model_version: Optional[str]
-    ) -> str:
-        """
-        Perform actual translation using ML models.
-        This is a mock implementation - in production, integrate with:
-        - OpenNMT-py models
-        - Hugging Face Transformers
-        - Custom trained models
-        """
-        # Mock translation logic
-        if source_lang == "en" and target_lang == "sw":
-            # English to Swahili mock
-            mock_translations = {
-                "hello": "hujambo",
-                "good morning": "habari za asubuhi",
-                "thank you": "asante",
-                "how are you": "habari yako",
-                "goodbye": "kwaheri"
-            }
-            return mock_translations.get(source_text.lower(), f"[{source_text}] (translated to Swahili)")
-        
-        elif source_lang == "sw" and target_lang == "en":
-            # Swahili to English mock
-            mock_translations = {
-                "hujambo": "hello",
-                "habari za asubuhi": "good morning",
-                "asante": "thank you",
-                "habari yako": "how are you",
-                "kwaheri": "goodbye"
-            }
-            return mock_translations.get(source_text.lower(), f"[{source_text}] (translated to English)")
-        
-        else:
-            # Generic mock for other language pairs
-            return f"[{source_text}] (translated from {source_lang} to {target_lang})"
-    
     async def log_translation_request(
         self,
         source_text: str,
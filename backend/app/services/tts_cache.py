@@ -0,0 +1,103 @@
+"""
+Content-addressed disk cache for synthesized speech.
+
+Files are named by a SHA-256 of the normalized text, language code and
+voice, so identical requests map to the same file across processes and
+restarts. Each key can have one file per format (WAV as synthesized, Opus
+for delivery). The byte budget is shared by every worker using the
+directory (see app/services/disk_budget.py): files are evicted least
+recently used first, and hits touch the file's mtime to keep that order.
+
+Any worker may evict a file at any time, so entries are handed out as open
+files; an open file stays readable after it is unlinked.
+"""
+
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+import hashlib
+import os
+import re
+import tempfile
+import structlog
+
+from app.core.config import settings
+from app.services.disk_budget import DiskBudget
+
+logger = structlog.get_logger(__name__)
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+FORMATS = ("wav", "opus")
+
+
+def tts_cache_key(normalized_text: str, language_code: str, voice: str) -> str:
+    """Cache key for a synthesis request."""
+    material = "\x00".join((language_code, voice, normalized_text))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """LRU cache of audio files under a byte budget shared across processes."""
+    
+    def __init__(self, root: str, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.budget = DiskBudget(self.root, max_bytes, [f"??/*.{fmt}" for fmt in FORMATS])
+    
+    def path_for(self, key: str, fmt: str = "wav") -> Path:
+        if not _KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid cache key: {key}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        return self.root / key[:2] / f"{key}.{fmt}"
+    
+    def get(self, key: str, fmt: str = "wav") -> Optional[Path]:
+        """
+        Path of a cached file, or None on a miss.
+        
+        The file can be evicted right after this returns; use `open` to read it.
+        """
+        path = self.path_for(key, fmt)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+    
+    def open(self, key: str, fmt: str = "wav") -> Optional[BinaryIO]:
+        """Open a cached file for reading, or None on a miss. The caller closes it."""
+        path = self.path_for(key, fmt)
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            # Evicted since it was opened; the open file is still readable
+            pass
+        return f
+    
+    def put(self, key: str, write: Callable[[Path], None], fmt: str = "wav") -> Path:
+        """Create an entry by calling `write` on a temporary path, then publish it atomically."""
+        path = self.path_for(key, fmt)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(Path(temp_path))
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(temp_path, path)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+        
+        self.budget.add(path.stat().st_size - replaced, keep=path)
+        return path
+
+
+tts_cache = TTSCache(settings.TTS_CACHE_DIR, settings.TTS_CACHE_MAX_BYTES)
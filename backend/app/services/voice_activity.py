@@ -0,0 +1,159 @@
+"""
+Energy-based voice activity detection for streaming audio.
+
+Incoming samples are split into short frames whose RMS level is compared
+against an adaptive noise floor: the quietest frame level over the last
+couple of seconds (minimum statistics). The minimum is taken over every
+frame, speech included, so the floor follows background noise of any level
+as long as the speaker pauses now and then, and the first few hundred
+milliseconds of a stream only calibrate it. A segment opens when speech starts (with a
+little pre-roll so onsets are not clipped) and closes after a run of
+silence or when it reaches the maximum segment length, at which point it
+is handed to the recognizer.
+"""
+
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+import numpy as np
+
+
+class SpeechSegment:
+    """A completed stretch of speech."""
+    
+    def __init__(self, audio: np.ndarray, start: float, end: float):
+        self.audio = audio
+        self.start = start
+        self.end = end
+
+
+class EnergyVAD:
+    """Streaming segmenter over 16 kHz mono float32 samples."""
+    
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        threshold_db: float = 9.0,
+        min_level_db: float = -50.0,
+        min_speech_ms: int = 240,
+        end_silence_ms: int = 600,
+        pre_roll_ms: int = 210,
+        max_segment_seconds: float = 30.0,
+        noise_window_ms: int = 2000,
+        calibration_ms: int = 300
+    ):
+        self.sample_rate = sample_rate
+        self.frame_size = sample_rate * frame_ms // 1000
+        self.threshold_db = threshold_db  # Level above the noise floor counted as speech
+        self.min_level_db = min_level_db  # Absolute level below which nothing is speech
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.end_silence_frames = max(1, end_silence_ms // frame_ms)
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+        self.max_segment_frames = int(max_segment_seconds * 1000) // frame_ms
+        self.noise_window_frames = max(1, noise_window_ms // frame_ms)
+        self.calibration_frames = calibration_ms // frame_ms
+        
+        self.noise_floor_db = min_level_db
+        # (frame index, level) with increasing levels; the first is the window minimum
+        self._noise_window: Deque[Tuple[int, float]] = deque()
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._frames: List[np.ndarray] = []
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._in_segment = False
+        self._segment_start = 0
+        self._frame_index = 0
+    
+    def feed(self, samples: np.ndarray) -> List[SpeechSegment]:
+        """Add samples and return any segments they complete."""
+        samples = np.concatenate([self._pending, samples.astype(np.float32, copy=False)])
+        n_frames = len(samples) // self.frame_size
+        self._pending = samples[n_frames * self.frame_size:]
+        if n_frames == 0:
+            return []
+        
+        frames = samples[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        levels = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        
+        segments = []
+        for frame, level in zip(frames, levels):
+            segment = self._step(frame, float(level))
+            if segment is not None:
+                segments.append(segment)
+        return segments
+    
+    def flush(self) -> Optional[SpeechSegment]:
+        """Close any open segment at the end of the stream."""
+        if self._pending.size:
+            self._frames.append(self._pending)
+            self._pending = np.zeros(0, dtype=np.float32)
+        if self._in_segment:
+            return self._close()
+        return None
+    
+    def _track_noise_floor(self, level: float):
+        window = self._noise_window
+        while window and window[-1][1] >= level:
+            window.pop()
+        window.append((self._frame_index, level))
+        if window[0][0] <= self._frame_index - self.noise_window_frames:
+            window.popleft()
+        self.noise_floor_db = window[0][1]
+    
+    def _step(self, frame: np.ndarray, level: float) -> Optional[SpeechSegment]:
+        self._track_noise_floor(level)
+        is_speech = (
+            self._frame_index >= self.calibration_frames
+            and level > max(self.min_level_db, self.noise_floor_db + self.threshold_db)
+        )
+        
+        self._frames.append(frame)
+        self._frame_index += 1
+        
+        if not self._in_segment:
+            if is_speech:
+                self._in_segment = True
+                self._speech_frames = 1
+                self._silence_run = 0
+                self._frames = self._frames[-(self.pre_roll_frames + 1):]
+                self._segment_start = self._frame_index - len(self._frames)
+            else:
+                del self._frames[:-self.pre_roll_frames or len(self._frames)]
+            return None
+        
+        if is_speech:
+            self._speech_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+        
+        if len(self._frames) >= self.max_segment_frames:
+            return self._close()
+        if self._silence_run >= self.end_silence_frames:
+            if self._speech_frames < self.min_speech_frames:
+                # A click or cough, not speech
+                self._reset()
+                return None
+            return self._close()
+        return None
+    
+    def _close(self) -> Optional[SpeechSegment]:
+        frames = self._frames
+        if self._silence_run:
+            # Keep a short tail of the closing silence
+            frames = frames[:len(frames) - self._silence_run + self.pre_roll_frames]
+        
+        start = self._segment_start * self.frame_size / self.sample_rate
+        segment = SpeechSegment(
+            np.concatenate(frames),
+            start=start,
+            end=start + sum(len(f) for f in frames) / self.sample_rate
+        )
+        self._reset()
+        return segment
+    
+    def _reset(self):
+        self._frames = []
+        self._in_segment = False
+        self._speech_frames = 0
+        self._silence_run = 0
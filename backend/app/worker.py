@@ -0,0 +1,28 @@
+"""
+Celery worker for background jobs.
+
+Run with: celery -A app.worker worker --loglevel=info
+"""
+
+import asyncio
+from celery import Celery
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+
+setup_logging()
+
+celery_app = Celery(
+    "kenyan_languages",
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL,
+)
+celery_app.conf.task_acks_late = True
+celery_app.conf.worker_prefetch_multiplier = 1
+
+
+@celery_app.task(name="translation.run_job")
+def run_translation_job(job_id: str):
+    """Process a bulk translation job."""
+    from app.services.translation_jobs import process_translation_job
+    
+    asyncio.run(process_translation_job(job_id))
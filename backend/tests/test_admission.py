@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionController, AdmissionRejected, Deadline, DeadlineExceeded
+
+
+async def test_admits_up_to_concurrency_then_queues():
+    controller = AdmissionController("test", max_concurrency=1, max_queue_depth=1)
+    release = asyncio.Event()
+    
+    async def hold():
+        async with controller.admit(Deadline(5)):
+            await release.wait()
+    
+    first = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    assert controller.in_flight == 1
+    assert controller.waiting == 1
+    
+    release.set()
+    await asyncio.gather(first, second)
+    assert controller.in_flight == 0
+    assert controller.waiting == 0
+
+
+async def test_sheds_when_queue_is_full():
+    controller = AdmissionController("test", max_concurrency=1, max_queue_depth=0)
+    
+    async with controller.admit(Deadline(5)):
+        with pytest.raises(AdmissionRejected):
+            async with controller.admit(Deadline(5)):
+                pass
+    
+    assert controller.in_flight == 0
+
+
+async def test_deadline_while_queued_raises_and_leaves_queue():
+    controller = AdmissionController("test", max_concurrency=1, max_queue_depth=1)
+    
+    async with controller.admit(Deadline(5)):
+        with pytest.raises(DeadlineExceeded):
+            async with controller.admit(Deadline(0.01)):
+                pass
+        assert controller.waiting == 0
+    
+    assert controller.in_flight == 0
+
+
+async def test_cancelled_waiter_passes_on_a_handed_over_slot():
+    controller = AdmissionController("test", max_concurrency=1, max_queue_depth=2)
+    admitted = []
+    
+    async def wait_turn(name):
+        async with controller.admit(Deadline(5)):
+            admitted.append(name)
+    
+    async with controller.admit(Deadline(5)):
+        cancelled = asyncio.ensure_future(wait_turn("cancelled"))
+        later = asyncio.ensure_future(wait_turn("later"))
+        await asyncio.sleep(0)
+        assert controller.waiting == 2
+    # The slot was handed to the first waiter, which is cancelled before it runs
+    cancelled.cancel()
+    
+    # Depending on the Python version the cancelled waiter either runs or
+    # gives up; either way the slot must reach the next waiter
+    await asyncio.wait_for(asyncio.gather(cancelled, later, return_exceptions=True), timeout=1)
+    assert "later" in admitted
+    assert controller.in_flight == 0
+    assert controller.waiting == 0
+
+
+async def test_capacity_survives_repeated_timeouts():
+    controller = AdmissionController("test", max_concurrency=2, max_queue_depth=10)
+    
+    async def hold(seconds):
+        async with controller.admit(Deadline(5)):
+            await asyncio.sleep(seconds)
+    
+    async def try_admit():
+        try:
+            async with controller.admit(Deadline(0.005)):
+                pass
+        except DeadlineExceeded:
+            pass
+    
+    for _ in range(20):
+        await asyncio.gather(hold(0.005), hold(0.005), *[try_admit() for _ in range(5)])
+    
+    assert controller.in_flight == 0
+    assert controller.waiting == 0
+    async with controller.admit(Deadline(1)), controller.admit(Deadline(1)):
+        assert controller.in_flight == 2
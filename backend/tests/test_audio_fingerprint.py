@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.language import Language
+from app.models.translation import Translation
+from app.models.user import (
+    ContributionAudio, ContributionFeedback, ContributionTranslation, User, UserContribution
+)
+from app.services import community_service
+from app.services.audio_fingerprint import AudioDeduplicator, FingerprintIndex, fingerprint
+from app.services.audio_preprocessing import SAMPLE_RATE
+
+
+def recording(seed, seconds=4.0):
+    """Random tone bursts, dense enough in spectral peaks to fingerprint."""
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    t = np.arange(int(0.08 * SAMPLE_RATE)) / SAMPLE_RATE
+    for start in rng.integers(0, len(samples) - len(t), size=int(seconds * 25)):
+        samples[start:start + len(t)] += 0.2 * np.sin(2 * np.pi * rng.uniform(200, 6000) * t)
+    return samples
+
+
+@pytest.fixture
+def index(tmp_path):
+    return FingerprintIndex(str(tmp_path / "fingerprints.sqlite3"))
+
+
+def test_repeated_hashes_count_once(index):
+    # One hash at ten consecutive frames: every query frame lines up with
+    # three indexed frames once neighbouring offsets are pooled
+    hashes, frames = np.full(10, 7, dtype=np.int64), np.arange(10, dtype=np.int64)
+    index.add("a" * 64, 1, hashes, frames)
+    
+    assert index.best_match(hashes, frames) == (1, 10)
+
+
+def test_neighbouring_offsets_pool(index):
+    hashes = np.arange(100, dtype=np.int64)
+    frames = np.arange(100, dtype=np.int64) * 3
+    index.add("a" * 64, 1, hashes, frames + 50)
+    
+    # Half the peaks land one frame later in the copy
+    shifted = frames + (np.arange(100) % 2)
+    assert index.best_match(hashes, shifted) == (1, 100)
+    assert index.best_match(np.arange(1000, 1100, dtype=np.int64), frames) is None
+
+
+def test_copy_matches_and_score_is_bounded(index):
+    original = recording(0)
+    index.add("a" * 64, 1, *fingerprint(original))
+    index.add("b" * 64, 2, *fingerprint(recording(1)))
+    
+    # Quieter, noisier and trimmed by a quarter second
+    copy = 0.5 * original[SAMPLE_RATE // 4:]
+    copy += np.random.default_rng(2).normal(0, 0.01, len(copy)).astype(np.float32)
+    hashes, offsets = fingerprint(copy)
+    contribution_id, aligned = index.best_match(hashes, offsets)
+    
+    assert contribution_id == 1
+    assert 0.3 < aligned / len(hashes) <= 1.0
+    
+    hashes, offsets = fingerprint(recording(3))
+    match = index.best_match(hashes, offsets)
+    assert match is None or match[1] / len(hashes) < 0.1
+
+
+def test_removed_recordings_no_longer_match(index):
+    hashes, offsets = fingerprint(recording(0))
+    index.add("a" * 64, 1, hashes, offsets)
+    
+    assert index.remove(1) == 1
+    assert index.best_match(hashes, offsets) is None
+    assert index.find_by_content("a" * 64) is None
+    assert index.remove(1) == 0
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Language.__table__, User.__table__, Translation.__table__, UserContribution.__table__,
+        ContributionTranslation.__table__, ContributionAudio.__table__, ContributionFeedback.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Language(id=1, name="Swahili", code="sw"),
+        User(id=1, email="a@example.com", username="a", hashed_password="x"),
+    ])
+    for contribution_id in (1, 2):
+        session.add(UserContribution(
+            id=contribution_id, user_id=1, contribution_type="audio", language_id=1,
+            audio=ContributionAudio(language_id=1, transcript="habari", media_key=f"{contribution_id:064x}")
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("status, indexed", [("rejected", False), ("approved", True)])
+async def test_moderation_removes_rejected_fingerprints(db, index, monkeypatch, status, indexed):
+    monkeypatch.setattr(community_service, "audio_deduplicator", AudioDeduplicator(index))
+    hashes, offsets = fingerprint(recording(0))
+    index.add(f"{1:064x}", 1, hashes, offsets)
+    
+    await community_service.CommunityService(db).moderate_contribution(1, moderator_id=1, status=status)
+    
+    assert (index.best_match(hashes, offsets) is not None) == indexed
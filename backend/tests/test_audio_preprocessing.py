@@ -0,0 +1,59 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+from scipy.signal import resample_poly
+
+from app.services.audio_preprocessing import FeatureStore, get_resampler
+
+
+def test_same_rate_passes_samples_through():
+    samples = np.random.default_rng(0).standard_normal(1000).astype(np.float32)
+    resampler = get_resampler(16000, 16000)
+    
+    np.testing.assert_array_equal(resampler(samples), samples)
+    np.testing.assert_array_equal(np.concatenate(list(resampler.stream([samples[:300], samples[300:]]))), samples)
+
+
+@pytest.mark.parametrize("orig_rate", [8000, 44100, 48000])
+def test_streamed_blocks_match_whole_signal(orig_rate):
+    samples = np.random.default_rng(1).standard_normal(orig_rate).astype(np.float32)
+    resampler = get_resampler(orig_rate, 16000)
+    
+    blocks = [samples[start:start + 4096] for start in range(0, len(samples), 4096)]
+    streamed = np.concatenate(list(resampler.stream(blocks)))
+    whole = resample_poly(samples, resampler.up, resampler.down, window=resampler.filter)
+    
+    np.testing.assert_allclose(streamed, whole, atol=1e-5)
+
+
+def feature_key(n):
+    return hashlib.sha256(str(n).encode()).hexdigest()
+
+
+def test_feature_store_evicts_least_recently_read_arrays(tmp_path):
+    store = FeatureStore(str(tmp_path), max_bytes=3 * (1000 + 128))  # .npy header is 128 bytes
+    for n in range(3):
+        store.put(feature_key(n), "pcm-16000", np.zeros(250, dtype=np.float32))
+        os.utime(store.path_for(feature_key(n), "pcm-16000"), (n, n))
+    
+    # A read makes array 0 the most recently used
+    store.get(feature_key(0), "pcm-16000")
+    store.put(feature_key(3), "pcm-16000", np.ones(250, dtype=np.float32))
+    
+    assert store.get(feature_key(1), "pcm-16000") is None
+    assert store.get(feature_key(0), "pcm-16000") is not None
+    assert store.get(feature_key(3), "pcm-16000") is not None
+    assert store.budget.usage() <= store.max_bytes
+
+
+def test_mapped_array_survives_eviction(tmp_path):
+    store = FeatureStore(str(tmp_path), max_bytes=1500)
+    mapped = store.put(feature_key(0), "pcm-16000", np.arange(250, dtype=np.float32))
+    os.utime(store.path_for(feature_key(0), "pcm-16000"), (0, 0))
+    
+    store.put(feature_key(1), "pcm-16000", np.zeros(250, dtype=np.float32))
+    
+    assert store.get(feature_key(0), "pcm-16000") is None
+    np.testing.assert_array_equal(mapped, np.arange(250, dtype=np.float32))
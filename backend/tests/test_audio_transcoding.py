@@ -0,0 +1,122 @@
+import hashlib
+
+import numpy as np
+import pytest
+import soundfile as sf
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.language import Language
+from app.models.translation import Translation
+from app.models.user import ContributionAudio, User, UserContribution
+from app.services import audio_transcoding
+from app.services.audio_transcoding import AudioTranscoder
+from app.services.media_store import FilesystemMediaStore, resolve_media
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = FilesystemMediaStore(str(tmp_path / "media"))
+    monkeypatch.setattr(audio_transcoding, "get_media_store", lambda: store)
+    monkeypatch.setattr(settings, "UPLOAD_TEMP_DIR", str(tmp_path))
+    return store
+
+
+@pytest.fixture
+def sessions(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(engine, tables=[
+        Language.__table__, User.__table__, Translation.__table__,
+        UserContribution.__table__, ContributionAudio.__table__
+    ])
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(audio_transcoding, "SessionLocal", factory)
+    return factory
+
+
+@pytest.fixture
+def original(tmp_path, store, sessions):
+    """A stored WAV contribution; returns its media key and samples."""
+    samples = (np.random.default_rng(0).standard_normal(16000) * 3000).astype(np.int16)
+    path = tmp_path / "take.wav"
+    sf.write(str(path), samples, 16000, subtype="PCM_16")
+    key = hashlib.sha256(path.read_bytes()).hexdigest()
+    
+    db = sessions()
+    db.add_all([
+        Language(id=1, name="Swahili", code="sw"),
+        User(id=1, email="a@example.com", username="a", hashed_password="x"),
+        UserContribution(
+            id=1, user_id=1, contribution_type="audio", language_id=1,
+            audio=ContributionAudio(language_id=1, transcript="habari", media_key=key)
+        ),
+    ])
+    db.commit()
+    db.close()
+    return key, samples
+
+
+def contribution_media_key(sessions):
+    db = sessions()
+    try:
+        return db.query(ContributionAudio.media_key).scalar()
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def transcoder():
+    transcoder = AudioTranscoder()
+    yield transcoder
+    transcoder.shutdown()
+
+
+@pytest.fixture
+async def stored(tmp_path, store, original):
+    key, samples = original
+    await store.put(tmp_path / "take.wav", key, "audio/wav")
+    return key, samples
+
+
+async def test_originals_are_kept_by_default(store, sessions, stored, transcoder):
+    key, _ = stored
+    
+    variants = await transcoder.transcode(key)
+    
+    assert set(variants) == {"opus", "flac"}
+    assert await store.stat(key) is not None
+    assert contribution_media_key(sessions) == key
+
+
+async def test_replacing_originals_repoints_contributions_first(
+    store, sessions, stored, transcoder, monkeypatch
+):
+    monkeypatch.setattr(settings, "TRANSCODE_KEEP_ORIGINAL", False)
+    key, samples = stored
+    
+    variants = await transcoder.transcode(key)
+    
+    assert await store.stat(key) is None
+    assert contribution_media_key(sessions) == variants["flac"]
+    # The new key serves Opus by default and the lossless copy as the original
+    assert (await resolve_media(store, variants["flac"], "auto")).key == variants["opus"]
+    flac = await resolve_media(store, variants["flac"], "original")
+    np.testing.assert_array_equal(sf.read(str(flac.path), dtype="int16")[0], samples)
+
+
+async def test_original_survives_a_failed_repoint(store, sessions, stored, transcoder, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCODE_KEEP_ORIGINAL", False)
+    
+    def fail(key, replacement):
+        raise RuntimeError("database unavailable")
+    
+    monkeypatch.setattr(audio_transcoding, "repoint_contributions", fail)
+    key, _ = stored
+    
+    with pytest.raises(RuntimeError):
+        await transcoder.transcode(key)
+    
+    assert await store.stat(key) is not None
+    assert contribution_media_key(sessions) == key
@@ -0,0 +1,164 @@
+"""
+Tests for the legacy contribution migration.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import init_db
+from app.core.database import Base
+from app.models.language import Language
+from app.models.translation import Translation
+from app.models.user import (
+    ContributionAudio, ContributionFeedback, ContributionTranslation, User, UserContribution
+)
+from app.services.contribution_migration import (
+    ContributionMigrator, parse_audio, parse_feedback, parse_translation
+)
+
+LANGUAGE_CODES = {"sw", "ki", "luo"}
+KEY = "ab" * 32
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("sw:Habari|ki:Wĩ mwega", ("sw", "Habari", "ki", "Wĩ mwega")),
+    # Separators inside the texts, as long as only one "|code:" is a language
+    ("sw:saa 10:30 | kesho|luo:Sa 10:30|x:y", ("sw", "saa 10:30 | kesho", "luo", "Sa 10:30|x:y")),
+    ("sw:|ki:", ("sw", "", "ki", "")),
+])
+def test_parse_translation(content, expected):
+    parsed = parse_translation(content, LANGUAGE_CODES)
+    assert tuple(parsed[field] for field in ("source_lang", "source_text", "target_lang", "target_text")) == expected
+
+
+@pytest.mark.parametrize("content", [
+    "Habari|ki:Wĩ mwega",  # No source language
+    "xx:Habari|ki:Wĩ",  # Unknown source language
+    "sw:Habari",  # No target
+    "sw:Habari|ki:ndĩ|luo:ber",  # Two possible targets
+])
+def test_parse_translation_rejects_ambiguous_content(content):
+    assert parse_translation(content, LANGUAGE_CODES) is None
+
+
+def test_parse_audio():
+    assert parse_audio(f"audio:take 1.wav|text:a|b: c|lang:sw|sha256:{KEY}") == {
+        "filename": "take 1.wav", "text": "a|b: c", "lang": "sw", "sha256": KEY
+    }
+    assert parse_audio("audio:x.wav|text:habari|lang:sw")["sha256"] is None
+    assert parse_audio("audio:x.wav|lang:sw") is None
+
+
+def test_parse_feedback():
+    assert parse_feedback("translation_id:7|rating:4|feedback:good|clear: yes") == {
+        "translation_id": 7, "rating": 4, "feedback_text": "good|clear: yes"
+    }
+    assert parse_feedback("translation_id:7|rating:5|feedback:None")["feedback_text"] is None
+    assert parse_feedback("translation_id:7|rating:9|feedback:x") is None
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Language.__table__, User.__table__, Translation.__table__, UserContribution.__table__,
+        ContributionTranslation.__table__, ContributionAudio.__table__, ContributionFeedback.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Language(id=1, name="Swahili", code="sw"),
+        Language(id=2, name="Kikuyu", code="ki"),
+        User(id=1, email="a@example.com", username="a", hashed_password="x"),
+        Translation(id=1, source_lang_id=1, target_lang_id=2, source_text="Habari", target_text="Wĩ mwega"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def add_legacy(db, contribution_id, contribution_type, content):
+    db.add(UserContribution(
+        id=contribution_id, user_id=1, contribution_type=contribution_type, content=content
+    ))
+    db.commit()
+
+
+def test_migrates_every_type_and_leaves_unparseable_rows(db):
+    add_legacy(db, 1, "translation", "sw:Saa 2:00|asubuhi|ki:Thaa 2:00")
+    add_legacy(db, 2, "audio", f"audio:a.wav|text:Habari|lang:ki|sha256:{KEY}")
+    add_legacy(db, 3, "feedback", "translation_id:1|rating:5|feedback:None")
+    add_legacy(db, 4, "translation", "sw:x|ki:y|sw:z")  # Ambiguous
+    add_legacy(db, 5, "feedback", "translation_id:99|rating:5|feedback:x")  # Missing translation
+    add_legacy(db, 6, "audio", "audio:a.wav|text:x|lang:zz")  # Unknown language
+    add_legacy(db, 7, "rating", "5")  # Unknown type
+    
+    counts = ContributionMigrator(db, batch_size=2).run()
+    
+    assert counts == {"migrated": 3, "skipped": 4}
+    translation = db.get(ContributionTranslation, 1)
+    assert (translation.source_text, translation.target_text) == ("Saa 2:00|asubuhi", "Thaa 2:00")
+    audio = db.get(ContributionAudio, 2)
+    assert (audio.language_id, audio.transcript, audio.media_key) == (2, "Habari", KEY)
+    assert db.get(ContributionFeedback, 3).feedback_text is None
+    # The detected language is filled in; legacy content stays put
+    assert [db.get(UserContribution, n).language_id for n in (1, 2, 3)] == [1, 2, None]
+    assert db.get(UserContribution, 4).content == "sw:x|ki:y|sw:z"
+    for model in (ContributionTranslation, ContributionAudio, ContributionFeedback):
+        assert db.query(model).filter(model.contribution_id >= 4).count() == 0
+
+
+def test_batches_are_keyset_pages_committed_separately(db):
+    for n in range(1, 6):
+        add_legacy(db, n, "translation", f"sw:s{n}|ki:t{n}")
+    
+    migrator = ContributionMigrator(db, batch_size=2)
+    seen = []
+    next_batch = migrator._next_batch
+    
+    def record(last_id):
+        rows = next_batch(last_id)
+        seen.append((last_id, [row.id for row in rows]))
+        return rows
+    
+    migrator._next_batch = record
+    migrator.run()
+    
+    assert seen == [(0, [1, 2]), (2, [3, 4]), (4, [5]), (5, [])]
+
+
+def test_second_run_changes_nothing(db):
+    add_legacy(db, 1, "translation", "sw:Habari|ki:Wĩ mwega")
+    add_legacy(db, 2, "translation", "broken")
+    
+    assert ContributionMigrator(db).run() == {"migrated": 1, "skipped": 1}
+    assert ContributionMigrator(db).run() == {"migrated": 0, "skipped": 1}
+    assert db.query(ContributionTranslation).count() == 1
+
+
+def test_upgrade_runs_the_contribution_migration(monkeypatch):
+    calls = []
+    
+    def recorder(name):
+        class Recorder:
+            def __init__(self, db):
+                pass
+            
+            def prepare(self):
+                calls.append((name, "prepare"))
+            
+            def run(self):
+                calls.append((name, "run"))
+        return Recorder
+    
+    monkeypatch.setattr(init_db, "create_engine", lambda url: create_engine("sqlite://"))
+    monkeypatch.setattr(init_db, "create_missing_indexes", lambda bind, models: None)
+    monkeypatch.setattr(init_db, "TranslationHashMigrator", recorder("translations"))
+    monkeypatch.setattr(init_db, "ContributionMigrator", recorder("contributions"))
+    
+    init_db.upgrade_tables()
+    
+    assert calls == [
+        ("translations", "prepare"), ("translations", "run"),
+        ("contributions", "prepare"), ("contributions", "run"),
+    ]
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from itertools import product
+
+import pytest
+
+from app.schemas.language import Language
+from app.services.language_catalog import LanguageSnapshot
+
+
+def make_language(id, code, tier, family, status):
+    return Language(
+        id=id, name=code.upper(), code=code, family=family, status=status,
+        priority_tier=tier, is_active=True, created_at=datetime(2024, 1, 1, tzinfo=timezone.utc)
+    )
+
+
+@pytest.fixture
+def snapshot():
+    return LanguageSnapshot([
+        make_language(4, "luo", 1, "Nilotic", "active"),
+        make_language(1, "sw", 1, "Bantu", "active"),
+        make_language(2, "ki", 1, "Bantu", "endangered"),
+        make_language(3, "kam", 2, "Bantu", "active"),
+        make_language(5, "so", 2, "Cushitic", "active"),
+        make_language(6, "gax", 3, "Cushitic", "endangered"),
+    ], version=1)
+
+
+@pytest.mark.parametrize("tier, family, status", list(product(
+    [None, 1, 2, 3, 4], [None, "Bantu", "Cushitic", "Nilotic", "Unknown"], [None, "active", "endangered"]
+)))
+def test_filter_matches_a_linear_scan(snapshot, tier, family, status):
+    expected = tuple(
+        l for l in snapshot.languages
+        if (tier is None or l.priority_tier == tier)
+        and (not family or l.family == family)
+        and (not status or l.status == status)
+    )
+    assert snapshot.filter(tier=tier, family=family, status=status) == expected
+
+
+def test_single_filter_returns_the_index_group(snapshot):
+    assert snapshot.filter(status="endangered") is snapshot.by_status["endangered"]
+    assert snapshot.filter(family="Bantu") is snapshot.by_family["Bantu"]
+    assert [l.id for l in snapshot.filter(family="Bantu")] == [1, 2, 3]
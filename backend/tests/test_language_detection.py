@@ -0,0 +1,103 @@
+"""
+Tests for batch language detection and its cache.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import translation
+from app.services import language_detection
+from app.services.language_detection import LanguageDetectionService, detection_cache
+from app.services.text_normalization import reset_text_normalizer
+
+LANGUAGES = {"habari yako": "sw", "ni wega": "ki", "oyawore": "luo"}
+
+
+class RecordingIdentifier:
+    """Stands in for the trained model and records every batch it scores."""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+    
+    def predict_batch(self, texts):
+        self.batches.append(list(texts))
+        return [[
+            {"language": LANGUAGES.get(text, "en"), "confidence": 0.9},
+            {"language": "en", "confidence": 0.1}
+        ] for text in texts]
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    detection_cache.clear()
+    reset_text_normalizer()
+    yield
+    detection_cache.clear()
+    reset_text_normalizer()
+
+
+@pytest.fixture
+def identifier(monkeypatch):
+    identifier = RecordingIdentifier()
+    monkeypatch.setattr(language_detection, "get_language_identifier", lambda: identifier)
+    return identifier
+
+
+async def test_repeated_texts_are_scored_once(identifier):
+    texts = ["Habari yako", "habari  yako!", "Ni wega", "Habari yako"]
+    
+    results = await LanguageDetectionService().detect_languages(texts)
+    
+    assert identifier.batches == [["habari yako", "ni wega"]]
+    assert [result.language for result in results] == ["sw", "sw", "ki", "sw"]
+    assert results[0].alternatives == [{"language": "en", "confidence": 0.1}]
+
+
+async def test_cached_texts_skip_the_model(identifier):
+    service = LanguageDetectionService()
+    await service.detect_language("Habari yako")
+    await service.detect_languages(["Ni wega"])
+    identifier.batches.clear()
+    
+    results = await service.detect_languages(["Ni wega", "habari yako."])
+    
+    assert identifier.batches == []
+    assert [result.language for result in results] == ["ki", "sw"]
+
+
+async def test_mixed_batch_keeps_input_order(identifier):
+    service = LanguageDetectionService()
+    await service.detect_languages(["Ni wega"])
+    identifier.batches.clear()
+    
+    results = await service.detect_languages(["Oyawore", "Ni wega", "Habari yako", "ni wega"])
+    
+    assert identifier.batches == [["oyawore", "habari yako"]]
+    assert [result.language for result in results] == ["luo", "ki", "sw", "ki"]
+
+
+async def test_batch_without_model_uses_keywords(monkeypatch):
+    monkeypatch.setattr(language_detection, "get_language_identifier", lambda: None)
+    
+    results = await LanguageDetectionService().detect_languages(["Asante sana", "Oyawore"])
+    
+    assert [result.language for result in results] == ["sw", "luo"]
+
+
+def test_detect_batch_endpoint(identifier):
+    app = FastAPI()
+    app.include_router(translation.router)
+    texts = ["Ni wega", "Habari yako", "ni wega"]
+    
+    response = TestClient(app).post("/detect/batch", json={"texts": texts})
+    
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_processed"] == 3
+    assert [result["text"] for result in body["results"]] == texts
+    assert [result["detected_language"] for result in body["results"]] == ["ki", "sw", "ki"]
+    assert identifier.batches == [["ni wega", "habari yako"]]
@@ -0,0 +1,46 @@
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services import language_identification, text_normalization
+from app.services.text_normalization import TextNormalizer
+
+TRAINING_MODULE = Path(__file__).resolve().parents[2] / "ml-pipeline" / "src" / "language_id_training.py"
+
+SAMPLES = [
+    "Habari yako?",
+    "Ng’ombe waʼnakula nyasi…",
+    "“Nĩ wega” – ni mwega!!",
+    "  Erokamano   ahinya.  ",
+    "CAFÉ au chai; ",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def training():
+    if not TRAINING_MODULE.exists():
+        pytest.skip("ml-pipeline sources are not available")
+    spec = importlib.util.spec_from_file_location("language_id_training", TRAINING_MODULE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_normalization_tables_match(training):
+    assert training.PUNCTUATION_TABLE == text_normalization._PUNCTUATION_TABLE
+    assert training.WHITESPACE_RE.pattern == text_normalization._WHITESPACE_RE.pattern
+    assert training.TRAILING_PUNCTUATION_RE.pattern == text_normalization._TRAILING_PUNCTUATION_RE.pattern
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_training_and_serving_produce_identical_features(training, text):
+    normalizer = TextNormalizer()
+    key = normalizer.normalize(text).key
+    assert training.normalize_text(text) == key
+    
+    trained = training.hash_ngrams(training.normalize_text(text), (1, 4), 1 << 16)
+    served = language_identification.hash_ngrams(key, (1, 4), 1 << 16)
+    np.testing.assert_array_equal(trained, served)
@@ -0,0 +1,46 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.services.language_identification import LanguageIdentifier
+
+N_BUCKETS = 1 << 12
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    log_probs = np.log(rng.dirichlet(np.ones(N_BUCKETS), size=3).T).astype(np.float32)
+    np.save(tmp_path / "log_probs.npy", log_probs)
+    np.save(tmp_path / "log_priors.npy", np.log(np.full(3, 1 / 3, dtype=np.float32)))
+    (tmp_path / "meta.json").write_text(json.dumps({
+        "labels": ["sw", "en", "ki"],
+        "n_buckets": N_BUCKETS,
+        "ngram_range": [1, 4]
+    }))
+    return tmp_path
+
+
+@pytest.mark.parametrize("window_chars", [1, 3, 7, 64])
+def test_windowed_scores_match_full_text(model_dir, window_chars):
+    # An unreachable margin makes every text score to the end
+    identifier = LanguageIdentifier(str(model_dir), window_chars=window_chars, margin=np.inf)
+    texts = ["habari ya asubuhi rafiki yangu", "good morning", "", "a", "wĩ mwega"]
+    
+    windowed = identifier.score_batch(texts)
+    full = identifier.log_priors + np.asarray(identifier.featurize_batch(texts) @ identifier.log_probs)
+    
+    np.testing.assert_allclose(windowed, full, rtol=1e-4, atol=1e-3)
+
+
+def test_decided_texts_stop_early(model_dir):
+    identifier = LanguageIdentifier(str(model_dir), window_chars=4, margin=0.0)
+    text = "habari ya asubuhi rafiki yangu"
+    
+    windowed = identifier.score_batch([text])[0]
+    full = identifier.log_priors + np.asarray(
+        identifier.featurize_batch([text]) @ identifier.log_probs
+    )[0]
+    
+    assert not np.allclose(windowed, full)
@@ -0,0 +1,59 @@
+"""
+Tests for the language catalog import statements.
+"""
+
+from sqlalchemy.dialects import postgresql
+
+from app.schemas.language import LanguageImport
+from app.services.language_import import LanguageImporter
+
+
+def compile_sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def rows():
+    return [LanguageImport(name="Kikuyu", code="ki", family="Bantu", is_active=True).model_dump()]
+
+
+def test_default_import_leaves_existing_languages_alone():
+    sql = compile_sql(LanguageImporter(db=None)._statement(rows()))
+    
+    assert "ON CONFLICT (code) DO NOTHING" in sql
+    assert "DO UPDATE" not in sql
+
+
+def test_forced_import_never_updates_is_active():
+    sql = compile_sql(LanguageImporter(db=None, update_existing=True)._statement(rows()))
+    
+    assert "ON CONFLICT (code) DO UPDATE" in sql
+    set_clause = sql.split("DO UPDATE SET", 1)[1]
+    assert "name = excluded.name" in set_clause
+    assert "family = coalesce(excluded.family, languages.family)" in set_clause
+    assert "is_active" not in set_clause
+    assert "code =" not in set_clause
+
+
+class FakeResult:
+    def __init__(self, flags):
+        self.flags = flags
+    
+    def __iter__(self):
+        return iter([(flag,) for flag in self.flags])
+
+
+class FakeSession:
+    def __init__(self, flags):
+        self.flags = flags
+    
+    def execute(self, statement):
+        return FakeResult(self.flags)
+
+
+def test_counts_skipped_languages():
+    counts = {"inserted": 0, "updated": 0, "skipped": 0}
+    importer = LanguageImporter(FakeSession([True]))
+    
+    importer._upsert(rows() * 3, counts)
+    
+    assert counts == {"inserted": 1, "updated": 0, "skipped": 2}
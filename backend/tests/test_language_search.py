@@ -0,0 +1,53 @@
+"""
+Tests for database-backed language search helpers.
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.init_db import create_missing_indexes
+from app.models.language import Language
+from app.services.language_service import LanguageService
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Language.__table__])
+    return engine
+
+
+def test_estimate_count_binds_filter_values(engine):
+    db = sessionmaker(bind=engine)()
+    statements = []
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+    
+    family = "Bantu :name 'quoted' %s"
+    query = db.query(Language).filter(Language.family == family)
+    
+    # SQLite has no EXPLAIN (FORMAT JSON), so the estimate itself is unavailable
+    assert LanguageService(db)._estimate_count(query) is None
+    
+    explain = [(sql, params) for sql, params in statements if sql.startswith("EXPLAIN")]
+    assert len(explain) == 1
+    sql, params = explain[0]
+    assert family not in sql
+    assert family in params
+    db.close()
+
+
+def test_missing_language_indexes_are_created(engine):
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_languages_filters")
+        conn.exec_driver_sql("DROP INDEX ix_languages_active_filters")
+    
+    create_missing_indexes(engine, [Language])
+    create_missing_indexes(engine, [Language])
+    
+    names = {index["name"] for index in inspect(engine).get_indexes("languages")}
+    assert {"ix_languages_filters", "ix_languages_active_filters"} <= names
@@ -0,0 +1,143 @@
+import hashlib
+from contextlib import nullcontext
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.responses import RangeFileResponse, parse_range
+from app.services.media_store import FilesystemMediaStore, StoredMedia, local_copy, resolve_media
+
+
+def key_for(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def put(store, tmp_path, data: bytes, content_type: str) -> str:
+    source = tmp_path / "source"
+    source.write_bytes(data)
+    key = key_for(data)
+    await store.put(source, key, content_type)
+    return key
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FilesystemMediaStore(str(tmp_path / "media"))
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=90-500", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=0-1, 5-6", None),
+    ("items=0-1", None)
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=100-", 100),
+    ("bytes=100-200", 100),
+    ("bytes=20-10", 100),
+    ("bytes=-", 100),
+    ("bytes=-0", 100),
+    ("bytes=0-", 0),
+    ("bytes=-10", 0)
+])
+def test_parse_range_rejects_unsatisfiable_ranges(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+def test_suffix_range_on_an_empty_file_is_416(tmp_path):
+    path = tmp_path / "empty"
+    path.write_bytes(b"")
+    app = FastAPI()
+    
+    @app.get("/file")
+    def serve():
+        return RangeFileResponse(path, "bytes=-10")
+    
+    response = TestClient(app).get("/file")
+    
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */0"
+
+
+async def test_resolve_media_falls_back_through_variants(store, tmp_path):
+    original = await put(store, tmp_path, b"original", "audio/wav")
+    opus = await put(store, tmp_path, b"opus", "audio/ogg")
+    flac = await put(store, tmp_path, b"flac", "audio/flac")
+    await store.set_variants(original, {"opus": opus, "flac": flac})
+    
+    assert (await resolve_media(store, original)).key == opus
+    assert (await resolve_media(store, original, "original")).key == original
+    assert (await resolve_media(store, original, "flac")).key == flac
+    
+    # The original replaced by its lossless copy
+    await store.delete(original)
+    assert (await resolve_media(store, original, "original")).key == flac
+    assert (await resolve_media(store, original)).key == opus
+    
+    await store.delete(opus)
+    assert (await resolve_media(store, original)).key == flac
+    assert await resolve_media(store, original, "opus") is None
+    
+    await store.delete(flac)
+    assert await resolve_media(store, original) is None
+
+
+async def test_resolve_media_without_variants(store, tmp_path):
+    key = await put(store, tmp_path, b"original", "audio/wav")
+    
+    assert (await resolve_media(store, key)).key == key
+    assert await resolve_media(store, key, "opus") is None
+    assert await resolve_media(store, key_for(b"missing")) is None
+
+
+async def test_local_copy_uses_local_files_in_place(store, tmp_path):
+    key = await put(store, tmp_path, b"original", "audio/wav")
+    media = await store.stat(key)
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    
+    async with local_copy(store, media, workdir) as path:
+        assert path == media.path
+    
+    assert path.exists()
+    assert list(workdir.iterdir()) == []
+
+
+class RemoteStore:
+    """A store without local paths, serving bytes from another store."""
+    
+    def __init__(self, store):
+        self.store = store
+    
+    def read_range(self, key, offset, count):
+        return self.store.read_range(key, offset, count)
+
+
+@pytest.mark.parametrize("fail", [False, True])
+async def test_local_copy_downloads_and_removes_remote_media(store, tmp_path, fail):
+    data = b"remote bytes" * 1000
+    key = await put(store, tmp_path, data, "audio/wav")
+    media = StoredMedia(key=key, size=len(data), content_type="audio/wav")
+    workdir = tmp_path / "work"
+    workdir.mkdir()
+    
+    with pytest.raises(RuntimeError) if fail else nullcontext():
+        async with local_copy(RemoteStore(store), media, workdir) as path:
+            assert path.parent == workdir
+            assert path.read_bytes() == data
+            if fail:
+                raise RuntimeError("processing failed")
+    
+    assert not path.exists()
+
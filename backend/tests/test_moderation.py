@@ -0,0 +1,201 @@
+"""
+Tests for the moderation queue, claims and decisions.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints import community
+from app.core.config import settings
+from app.core.database import Base, get_db
+from app.models.language import Language
+from app.models.translation import Translation
+from app.models.user import (
+    ContributionAudio, ContributionFeedback, ContributionTranslation, User, UserContribution
+)
+from app.services import community_service
+from app.services.community_service import (
+    CommunityService, ModerationConflict, _decode_cursor, _encode_cursor
+)
+
+START = datetime(2026, 1, 1, 9, 0)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    # SQLite spelling of now() + interval, on the same UTC clock as CURRENT_TIMESTAMP
+    monkeypatch.setattr(
+        community_service, "_claim_expiry",
+        lambda: func.datetime("now", f"+{settings.MODERATION_CLAIM_SECONDS} seconds")
+    )
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[
+        Language.__table__, User.__table__, Translation.__table__, UserContribution.__table__,
+        ContributionTranslation.__table__, ContributionAudio.__table__, ContributionFeedback.__table__
+    ])
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    session.add_all([Language(id=1, name="Swahili", code="sw"), Language(id=2, name="Kikuyu", code="ki")])
+    session.add_all([
+        User(id=n, email=f"{n}@example.com", username=f"user{n}", hashed_password="x") for n in (1, 2, 3)
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def utc_now(**delta):
+    return datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(**delta)
+
+
+def add(db, contribution_id, minute=None, language_id=1, contribution_type="translation", **fields):
+    db.add(UserContribution(
+        id=contribution_id, user_id=1, contribution_type=contribution_type, language_id=language_id,
+        verification_status=fields.pop("status", "pending"),
+        created_at=START + timedelta(minutes=contribution_id if minute is None else minute),
+        **fields
+    ))
+    db.commit()
+
+
+def ids(contributions):
+    return [contribution.id for contribution in contributions]
+
+
+@pytest.mark.parametrize("created_at", [
+    datetime(2026, 3, 4, 5, 6, 7, 891011),
+    datetime(2026, 3, 4, 5, 6, 7, tzinfo=timezone(timedelta(hours=3))),
+])
+def test_cursor_round_trip(created_at):
+    cursor = _encode_cursor(created_at, 42)
+    
+    assert "=" not in cursor and "|" not in cursor
+    assert _decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["!!!", _encode_cursor(START, 1)[:-4], "bm9wZQ"])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(cursor)
+
+
+async def test_queue_pages_oldest_first_by_keyset(db):
+    for n in range(1, 6):
+        add(db, n, minute=min(n, 3))  # 3, 4 and 5 share a timestamp; id breaks the tie
+    add(db, 6, status="approved")
+    service = CommunityService(db)
+    
+    pages, cursor = [], None
+    while True:
+        contributions, cursor = await service.get_moderation_queue(size=2, cursor=cursor)
+        pages.append(ids(contributions))
+        if cursor is None:
+            break
+    
+    assert pages == [[1, 2], [3, 4], [5]]
+
+
+async def test_queue_filters(db):
+    add(db, 1, language_id=1)
+    add(db, 2, language_id=2)
+    add(db, 3, language_id=1, contribution_type="audio")
+    add(db, 4, claimed_by=2, claim_expires_at=utc_now(minutes=5))
+    add(db, 5, claimed_by=2, claim_expires_at=utc_now(minutes=-5))
+    service = CommunityService(db)
+    
+    assert ids((await service.get_moderation_queue(language_code="ki"))[0]) == [2]
+    assert ids((await service.get_moderation_queue(contribution_type="audio"))[0]) == [3]
+    # Active claims are hidden unless asked for; lapsed ones are back in the queue
+    assert ids((await service.get_moderation_queue())[0]) == [1, 2, 3, 5]
+    assert ids((await service.get_moderation_queue(include_claimed=True))[0]) == [1, 2, 3, 4, 5]
+    with pytest.raises(ValueError, match="Language not found"):
+        await service.get_moderation_queue(language_code="xx")
+
+
+async def test_claims_are_disjoint_and_lapse(db):
+    for n in range(1, 6):
+        add(db, n)
+    service = CommunityService(db)
+    
+    first, expires_at = await service.claim_contributions(moderator_id=2, limit=2)
+    second, _ = await service.claim_contributions(moderator_id=3, limit=2)
+    
+    assert ids(first) == [1, 2]
+    assert ids(second) == [3, 4]
+    lease = (expires_at - utc_now()).total_seconds()
+    assert settings.MODERATION_CLAIM_SECONDS - 5 < lease <= settings.MODERATION_CLAIM_SECONDS
+    
+    # Claiming again renews a moderator's own claims before taking new ones
+    assert ids((await service.claim_contributions(moderator_id=2, limit=3))[0]) == [1, 2, 5]
+    
+    # Once moderator 3's lease runs out, their contributions can be claimed
+    db.query(UserContribution).filter(UserContribution.claimed_by == 3).update(
+        {"claim_expires_at": utc_now(minutes=-1)}
+    )
+    db.commit()
+    assert ids((await service.claim_contributions(moderator_id=2, limit=10))[0]) == [1, 2, 3, 4, 5]
+    assert (await service.claim_contributions(moderator_id=3, limit=10)) == ([], None)
+
+
+def test_claim_skips_rows_locked_by_other_claims(db):
+    statement = CommunityService(db)._claim_statement(2, 10, None, None)
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "RETURNING" in sql
+
+
+async def test_decisions_respect_claims(db):
+    add(db, 1, claimed_by=2, claim_expires_at=utc_now(minutes=5))
+    add(db, 2, claimed_by=2, claim_expires_at=utc_now(minutes=5))
+    add(db, 3, claimed_by=3, claim_expires_at=utc_now(minutes=-5))
+    service = CommunityService(db)
+    
+    with pytest.raises(ModerationConflict, match="claimed by another moderator"):
+        await service.moderate_contribution(1, moderator_id=3, status="approved")
+    
+    decided = await service.moderate_contribution(1, moderator_id=2, status="approved", notes="ok")
+    assert (decided.verification_status, decided.verified_by, decided.claimed_by) == ("approved", 2, None)
+    
+    # A lapsed claim does not block anyone
+    rejected = await service.moderate_contribution(3, moderator_id=2, status="rejected")
+    assert rejected.verification_status == "rejected"
+    
+    with pytest.raises(ModerationConflict, match="already approved"):
+        await service.moderate_contribution(1, moderator_id=2, status="rejected")
+    assert await service.moderate_contribution(99, moderator_id=2, status="approved") is None
+
+
+def test_stale_or_conflicting_decision_is_409(engine, db):
+    add(db, 1, claimed_by=2, claim_expires_at=utc_now(minutes=5))
+    add(db, 2, status="approved")
+    
+    app = FastAPI()
+    app.include_router(community.router)
+    app.dependency_overrides[get_db] = lambda: sessionmaker(bind=engine)()
+    client = TestClient(app)
+    
+    def decide(contribution_id, moderator_id):
+        return client.post(
+            f"/moderation/{contribution_id}/decision",
+            json={"moderator_id": moderator_id, "status": "approved"}
+        )
+    
+    assert decide(1, 3).status_code == 409
+    assert decide(2, 3).status_code == 409
+    assert decide(99, 3).status_code == 404
+    response = decide(1, 2)
+    assert response.status_code == 200
+    assert response.json()["verification_status"] == "approved"
+    assert client.get("/moderation/queue", params={"cursor": "!!!"}).status_code == 400
@@ -0,0 +1,194 @@
+import numpy as np
+import pytest
+import soundfile as sf
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.core.database import Base
+from app.models.language import Language
+from app.models.translation import Translation
+from app.models.user import ContributionAudio, User, UserContribution
+from app.services.audio_service import AudioService
+from app.services.pronunciation_scoring import (
+    PronunciationScorer, build_reference, dtw_align, frame_distances, score_file, split_phonemes,
+    voiced_span
+)
+from app.services.text_normalization import get_text_normalizer, reset_text_normalizer
+
+SAMPLE_RATE = 16000
+
+
+def brute_force_dtw(reference, attempt):
+    cost = frame_distances(reference, attempt)
+    n, m = cost.shape
+    accumulated = np.full((n + 1, m + 1), np.inf)
+    accumulated[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            accumulated[i, j] = cost[i - 1, j - 1] + min(
+                accumulated[i - 1, j], accumulated[i, j - 1], accumulated[i - 1, j - 1]
+            )
+    return accumulated[n, m]
+
+
+@pytest.mark.parametrize("n, m", [(1, 1), (1, 6), (7, 1), (12, 9), (20, 31)])
+def test_dtw_path_cost_matches_brute_force(n, m):
+    rng = np.random.default_rng(n * 100 + m)
+    reference = rng.standard_normal((n, 4)).astype(np.float32)
+    attempt = rng.standard_normal((m, 4)).astype(np.float32)
+    
+    path_ref, path_attempt, step_costs = dtw_align(reference, attempt)
+    
+    assert (path_ref[0], path_attempt[0]) == (0, 0)
+    assert (path_ref[-1], path_attempt[-1]) == (n - 1, m - 1)
+    steps = np.diff(np.stack([path_ref, path_attempt]), axis=1)
+    assert np.all((steps >= 0) & (steps <= 1)) and np.all(steps.sum(axis=0) >= 1)
+    assert step_costs.sum() == pytest.approx(brute_force_dtw(reference, attempt), rel=1e-4)
+
+
+@pytest.mark.parametrize("key, expected", [
+    ("ng'ombe", ["ng'", "o", "mb", "e"]),
+    ("nyumba", ["ny", "u", "mb", "a"]),
+    ("habari yako", ["h", "a", "b", "a", "r", "i", "y", "a", "k", "o"]),
+    ("chai, 2 kikombe!", ["ch", "a", "i", "k", "i", "k", "o", "mb", "e"]),
+    ("", []),
+])
+def test_split_phonemes(key, expected):
+    assert split_phonemes(key) == expected
+
+
+def utterance(frequencies, noise_db=-60.0, seed=0):
+    """Tones standing in for sounds, with half a second of quiet either side."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(0.15 * SAMPLE_RATE)) / SAMPLE_RATE
+    sounds = [0.3 * np.sin(2 * np.pi * f * t) for f in frequencies]
+    quiet = np.zeros(SAMPLE_RATE // 2)
+    samples = np.concatenate([quiet, *sounds, quiet])
+    return (samples + rng.standard_normal(len(samples)) * 10 ** (noise_db / 20)).astype(np.float32)
+
+
+def write(tmp_path, name, samples):
+    path = tmp_path / f"{name}.wav"
+    sf.write(str(path), samples, SAMPLE_RATE)
+    return path
+
+
+def test_voiced_span_trims_quiet_edges():
+    span = voiced_span(utterance([300, 600, 900]))
+    
+    assert span is not None
+    start, end = span
+    assert start == pytest.approx(50, abs=3)
+    assert end == pytest.approx(95, abs=3)
+
+
+@pytest.mark.parametrize("samples", [
+    np.zeros(SAMPLE_RATE, dtype=np.float32),
+    (np.random.default_rng(0).standard_normal(SAMPLE_RATE) * 0.05).astype(np.float32),
+])
+def test_silence_and_steady_noise_have_no_speech(samples):
+    assert voiced_span(samples) is None
+
+
+def test_scores_a_matching_attempt_above_a_different_one(tmp_path):
+    prompt = [300, 500, 800, 1200, 700]
+    reference = build_reference(write(tmp_path, "reference", utterance(prompt)), None, "habari")
+    
+    good = score_file(reference, write(tmp_path, "good", utterance(prompt, noise_db=-45, seed=1)))
+    bad = score_file(reference, write(tmp_path, "bad", utterance([2500, 1800, 3000, 150, 2200], seed=2)))
+    
+    assert 0.0 <= bad["score"] < good["score"] <= 1.0
+    assert set(good["phoneme_scores"]) == {"h", "a", "b", "r", "i"}
+
+
+@pytest.mark.parametrize("samples", [
+    np.zeros(SAMPLE_RATE, dtype=np.float32),
+    (np.random.default_rng(3).standard_normal(SAMPLE_RATE) * 0.05).astype(np.float32),
+])
+def test_attempts_without_speech_are_rejected(tmp_path, samples):
+    reference = build_reference(write(tmp_path, "reference", utterance([300, 600])), None, "ni")
+    
+    with pytest.raises(ValueError, match="No speech"):
+        score_file(reference, write(tmp_path, "silent", samples))
+
+
+def test_silent_reference_is_unusable(tmp_path):
+    assert build_reference(write(tmp_path, "reference", np.zeros(SAMPLE_RATE, dtype=np.float32)), None, "ni") is None
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[
+        Language.__table__, User.__table__, Translation.__table__,
+        UserContribution.__table__, ContributionAudio.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Language(id=1, name="Swahili", code="sw"),
+        Language(id=2, name="Kikuyu", code="ki", orthography_notes="ĩ => i"),
+        User(id=1, email="a@example.com", username="a", hashed_password="x"),
+    ])
+    session.commit()
+    reset_text_normalizer()
+    yield session
+    reset_text_normalizer()
+    session.close()
+
+
+def add_recording(db, contribution_id, transcript, status="approved", language_id=1, media_key="auto"):
+    db.add(UserContribution(
+        id=contribution_id, user_id=1, contribution_type="audio",
+        language_id=language_id, verification_status=status
+    ))
+    db.add(ContributionAudio(
+        contribution_id=contribution_id, language_id=language_id, transcript=transcript,
+        media_key=f"{contribution_id:064x}" if media_key == "auto" else media_key
+    ))
+    db.commit()
+
+
+def test_reference_recordings_are_approved_matches_newest_first(db):
+    add_recording(db, 1, "Habari yako?")
+    add_recording(db, 2, "habari  YAKO")
+    add_recording(db, 3, "Habari yako", status="pending")
+    add_recording(db, 4, "Habari yako", status="rejected")
+    add_recording(db, 5, "Habari yako", language_id=2)
+    add_recording(db, 6, "Habari yako", media_key=None)
+    add_recording(db, 7, "Habari yako sana")
+    add_recording(db, 8, "yako habari")
+    
+    prompt = get_text_normalizer(db).normalize("Habari yako!", "sw")
+    
+    assert AudioService(db)._reference_recordings(prompt, "sw") == [f"{2:064x}", f"{1:064x}"]
+
+
+def test_reference_recordings_match_orthography_variants(db):
+    add_recording(db, 1, "Wĩ mwega", language_id=2)
+    add_recording(db, 2, "Wĩ", language_id=2)
+    normalizer = get_text_normalizer(db)
+    
+    assert normalizer.invariant_words(normalizer.normalize("wi mwega", "ki")) == ["mwega"]
+    assert AudioService(db)._reference_recordings(normalizer.normalize("wi mwega", "ki"), "ki") == [f"{1:064x}"]
+    assert AudioService(db)._reference_recordings(normalizer.normalize("WI", "ki"), "ki") == [f"{2:064x}"]
+
+
+async def test_batch_scoring_runs_in_spawned_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PRONUNCIATION_WORKERS", 2)
+    prompt = [300, 500, 800]
+    reference = build_reference(write(tmp_path, "reference", utterance(prompt)), None, "habari")
+    files = [
+        (write(tmp_path, "good", utterance(prompt, noise_db=-45, seed=1)), None),
+        (write(tmp_path, "silent", np.zeros(SAMPLE_RATE, dtype=np.float32)), None),
+    ]
+    scorer = PronunciationScorer(str(tmp_path / "cache"), memory_entries=4)
+    
+    try:
+        good, silent = await scorer.score_files(reference, files)
+        assert scorer._pool._mp_context.get_start_method() == "spawn"
+    finally:
+        scorer.shutdown()
+    
+    assert good == score_file(reference, files[0][0])
+    assert isinstance(silent, ValueError)
@@ -0,0 +1,15 @@
+from app.services.speech_recognition import share_inference_time
+
+
+def test_batch_time_is_shared_by_window_count():
+    assert share_inference_time(1000, [1, 3]) == [250, 750]
+
+
+def test_single_clip_gets_the_whole_batch_time():
+    assert share_inference_time(420.7, [2]) == [420]
+
+
+def test_shares_never_exceed_the_batch_time():
+    shares = share_inference_time(1000, [1, 1, 1])
+    assert shares == [333, 333, 333]
+    assert sum(shares) <= 1000
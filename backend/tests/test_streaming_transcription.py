@@ -0,0 +1,67 @@
+import asyncio
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from app.services import streaming_transcription
+from app.services.streaming_transcription import StreamingTranscriptionSession
+from app.services.voice_activity import SpeechSegment
+
+
+class HangingRecognizer:
+    def __init__(self):
+        self.started = 0
+    
+    async def transcribe_audio(self, audio, language_code):
+        self.started += 1
+        await asyncio.Event().wait()
+
+
+async def test_cancel_stops_pending_transcriptions(monkeypatch):
+    recognizer = HangingRecognizer()
+    monkeypatch.setattr(streaming_transcription, "get_speech_recognizer", lambda: recognizer)
+    session = StreamingTranscriptionSession("sw", 16000, "pcm16")
+    
+    for start in (0.0, 1.0):
+        session._transcribe(SpeechSegment(np.zeros(16000, dtype=np.float32), start, start + 1.0))
+    tasks = list(session._tasks)
+    await asyncio.sleep(0)
+    assert recognizer.started == 2
+    
+    session.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    
+    assert all(task.cancelled() for task in tasks)
+    assert not session._tasks
+
+
+class FakeOpusDecoder:
+    def __init__(self, sample_rate, channels):
+        self.calls = []
+    
+    def decode(self, packet, frame_size):
+        self.calls.append((packet, frame_size))
+        return np.full(frame_size, 16384, dtype="<i2").tobytes()
+
+
+def test_opus_packets_are_decoded(monkeypatch):
+    monkeypatch.setitem(sys.modules, "opuslib", types.SimpleNamespace(Decoder=FakeOpusDecoder))
+    session = StreamingTranscriptionSession("sw", 16000, "opus")
+    
+    samples = session._decode(b"packet")
+    
+    assert session._opus_decoder.calls == [(b"packet", 1920)]
+    assert len(samples) == 1920 and samples[0] == 0.5
+
+
+def test_opus_without_opuslib_is_rejected(monkeypatch):
+    monkeypatch.setitem(sys.modules, "opuslib", None)
+    
+    with pytest.raises(ValueError):
+        StreamingTranscriptionSession("sw", 16000, "opus")
+    
+    monkeypatch.setitem(sys.modules, "opuslib", types.SimpleNamespace(Decoder=FakeOpusDecoder))
+    with pytest.raises(ValueError):
+        StreamingTranscriptionSession("sw", 44100, "opus")
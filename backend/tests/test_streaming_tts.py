@@ -0,0 +1,151 @@
+"""
+Tests for sentence-by-sentence text-to-speech streaming.
+"""
+
+import asyncio
+import io
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from app.services import audio_service
+from app.services.audio_service import AudioService
+from app.services.speech_synthesis import (
+    SAMPLE_RATE, split_sentences, streaming_wav_header, to_pcm16
+)
+from app.services.tts_cache import TTSCache
+
+
+class CountingSynthesizer:
+    """A distinct tone per sentence, so streamed audio can be traced back."""
+    
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+    
+    def synthesize(self, text, language_code, voice="default"):
+        self.calls.append(text)
+        if text == self.fail_on:
+            raise RuntimeError("synthesis failed")
+        t = np.arange(len(text) * 400) / SAMPLE_RATE
+        return (0.1 * np.sin(2 * np.pi * (200 + 10 * len(text)) * t)).astype(np.float32)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = TTSCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+    opened = []
+    open_file = cache.open
+    
+    def tracking_open(key, fmt="wav"):
+        f = open_file(key, fmt)
+        if f is not None:
+            opened.append(f)
+        return f
+    
+    cache.open = tracking_open
+    cache.opened = opened
+    monkeypatch.setattr(audio_service, "tts_cache", cache)
+    monkeypatch.setattr(audio_service, "STREAM_CHUNK_FRAMES", 1000)
+    return cache
+
+
+@pytest.fixture
+def synthesizer(monkeypatch):
+    synthesizer = CountingSynthesizer()
+    monkeypatch.setattr(audio_service, "get_speech_synthesizer", lambda: synthesizer)
+    return synthesizer
+
+
+async def collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+def expected_pcm(synthesizer, sentences):
+    return b"".join(to_pcm16(synthesizer.synthesize(sentence, "sw")) for sentence in sentences)
+
+
+@pytest.mark.parametrize("text, sentences", [
+    ("Habari yako? Nzuri sana. Asante!", ["Habari yako?", "Nzuri sana.", "Asante!"]),
+    ("Saa 3:30 asubuhi", ["Saa 3:30 asubuhi"]),
+    ("Moja; mbili: tatu", ["Moja;", "mbili:", "tatu"]),
+    ("Mstari wa kwanza\n\nMstari wa pili", ["Mstari wa kwanza", "Mstari wa pili"]),
+    ("  \n ", []),
+])
+def test_split_sentences(text, sentences):
+    assert split_sentences(text) == sentences
+
+
+def test_streaming_header_describes_16_bit_mono_of_unknown_length():
+    header = streaming_wav_header()
+    
+    riff, riff_size, wave_id, fmt_id, fmt_size = struct.unpack("<4sI4s4sI", header[:20])
+    audio_format, channels, rate, byte_rate, block_align, bits = struct.unpack("<HHIIHH", header[20:36])
+    data_id, data_size = struct.unpack("<4sI", header[36:])
+    
+    assert (riff, wave_id, fmt_id, data_id) == (b"RIFF", b"WAVE", b"fmt ", b"data")
+    assert (fmt_size, audio_format, channels, rate, bits) == (16, 1, 1, SAMPLE_RATE, 16)
+    assert (byte_rate, block_align) == (SAMPLE_RATE * 2, 2)
+    assert riff_size == data_size == 0xFFFFFFFF
+    assert len(header) == 44
+
+
+async def test_stream_is_a_playable_wav_of_every_sentence(cache, synthesizer):
+    text = "Habari yako? Nzuri sana. Asante!"
+    
+    data = await collect(AudioService(None).stream_text_to_speech(text, "sw"))
+    
+    sentences = split_sentences(text)
+    assert data[:44] == streaming_wav_header()
+    assert data[44:] == expected_pcm(CountingSynthesizer(), sentences)
+    # Once the sizes are known the stream is an ordinary WAV file
+    sized = bytearray(data)
+    sized[4:8] = struct.pack("<I", len(data) - 8)
+    sized[40:44] = struct.pack("<I", len(data) - 44)
+    with wave.open(io.BytesIO(bytes(sized))) as f:
+        assert (f.getnchannels(), f.getsampwidth(), f.getframerate()) == (1, 2, SAMPLE_RATE)
+        assert f.readframes(f.getnframes()) == data[44:]
+    assert all(f.closed for f in cache.opened)
+
+
+async def test_sentences_are_served_from_the_cache(cache, synthesizer):
+    service = AudioService(None)
+    
+    first = await collect(service.stream_text_to_speech("Habari. Asante. Habari.", "sw"))
+    second = await collect(service.stream_text_to_speech("Asante. Habari.", "sw"))
+    
+    assert synthesizer.calls == ["Habari.", "Asante."]
+    assert second[44:] == expected_pcm(CountingSynthesizer(), ["Asante.", "Habari."])
+    assert len(first) > len(second)
+    assert all(f.closed for f in cache.opened)
+
+
+async def test_client_disconnect_closes_the_prefetched_file(cache, synthesizer):
+    stream = AudioService(None).stream_text_to_speech("Habari yako rafiki. Nzuri sana.", "sw")
+    
+    await stream.__anext__()  # Header
+    await stream.__anext__()  # First chunk; the next sentence is being prefetched
+    for _ in range(50):
+        if len(cache.opened) == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert len(cache.opened) == 2
+    
+    await stream.aclose()
+    await asyncio.sleep(0)
+    
+    assert all(f.closed for f in cache.opened)
+
+
+async def test_mid_stream_failure_ends_the_stream(cache, monkeypatch):
+    synthesizer = CountingSynthesizer(fail_on="Nzuri sana.")
+    monkeypatch.setattr(audio_service, "get_speech_synthesizer", lambda: synthesizer)
+    
+    stream = AudioService(None).stream_text_to_speech("Habari. Nzuri sana. Asante.", "sw")
+    data = await collect(stream)
+    
+    assert data[44:] == expected_pcm(CountingSynthesizer(), ["Habari."])
+    assert "Asante." not in synthesizer.calls
+    assert all(f.closed for f in cache.opened)
@@ -0,0 +1,145 @@
+"""
+Tests for translating with source_lang="auto" when detection misses.
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints import translation
+from app.core.database import Base, get_db
+from app.models.language import Language
+from app.services import language_detection
+from app.services.language_detection import (
+    UNDETERMINED_LANGUAGE, LanguageDetectionService, detection_cache
+)
+from app.services.text_normalization import reset_text_normalizer
+from app.services.translation_service import TranslationService
+
+
+class FixedIdentifier:
+    """Stands in for the trained model, predicting one language for every text."""
+    
+    def __init__(self, language):
+        self.language = language
+    
+    def predict(self, text):
+        return self.predict_batch([text])[0]
+    
+    def predict_batch(self, texts):
+        return [[{"language": self.language, "confidence": 0.9}] for _ in texts]
+
+
+class BrokenIdentifier:
+    def predict(self, text):
+        raise RuntimeError("model unavailable")
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    detection_cache.clear()
+    reset_text_normalizer()
+    yield
+    detection_cache.clear()
+    reset_text_normalizer()
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[Language.__table__])
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([Language(id=1, name="Swahili", code="sw"), Language(id=2, name="Kikuyu", code="ki")])
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+def use_identifier(monkeypatch, identifier):
+    monkeypatch.setattr(language_detection, "get_language_identifier", lambda: identifier)
+
+
+async def test_keyword_miss_is_undetermined(monkeypatch):
+    use_identifier(monkeypatch, None)
+    
+    result = await LanguageDetectionService().detect_language("bonjour tout le monde")
+    
+    assert (result.language, result.confidence) == (UNDETERMINED_LANGUAGE, 0.0)
+    assert (await LanguageDetectionService().detect_language("habari yako")).language == "sw"
+
+
+async def test_detection_error_is_undetermined(monkeypatch):
+    use_identifier(monkeypatch, BrokenIdentifier())
+    
+    result = await LanguageDetectionService().detect_language("habari yako")
+    
+    assert result.language == UNDETERMINED_LANGUAGE
+
+
+def refuse_translation(service, monkeypatch):
+    async def must_not_translate(*args, **kwargs):
+        raise AssertionError("translated an undetected source")
+    
+    monkeypatch.setattr(service, "_translate_targets", must_not_translate)
+    monkeypatch.setattr(service, "_translate_pair_batch", must_not_translate)
+    return service
+
+
+@pytest.mark.parametrize("identifier, message", [
+    (None, "Could not detect the source language"),
+    (BrokenIdentifier(), "Could not detect the source language"),
+    (FixedIdentifier("en"), "not supported: en"),
+])
+async def test_auto_source_miss_is_rejected_before_translating(db, monkeypatch, identifier, message):
+    use_identifier(monkeypatch, identifier)
+    service = refuse_translation(TranslationService(db), monkeypatch)
+    
+    with pytest.raises(ValueError, match=message):
+        await service.translate("bonjour", "auto", "sw")
+    with pytest.raises(ValueError, match=message):
+        await service.translate_multi("bonjour", "auto", ["sw", "ki"])
+
+
+@pytest.mark.parametrize("identifier, message", [
+    (None, "Could not detect the source language"),
+    (FixedIdentifier("en"), "not supported: en"),
+])
+async def test_batch_with_any_miss_is_rejected_before_translating(db, monkeypatch, identifier, message):
+    use_identifier(monkeypatch, identifier)
+    service = refuse_translation(TranslationService(db), monkeypatch)
+    
+    with pytest.raises(ValueError, match=message):
+        await service.translate_many(["habari", "bonjour"], "auto", "ki")
+
+
+async def test_supported_detection_resolves_the_source(db, monkeypatch):
+    use_identifier(monkeypatch, None)
+    
+    source, language, detection = await TranslationService(db)._resolve_source("Habari yako", "auto")
+    
+    assert (language, detection.language, source.language_code) == ("sw", "sw", "sw")
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/", {"source_text": "bonjour", "source_lang": "auto", "target_lang": "sw"}),
+    ("/batch", {"texts": ["bonjour"], "source_lang": "auto", "target_lang": "sw"}),
+    ("/multi", {"source_text": "bonjour", "source_lang": "auto", "target_langs": ["sw", "ki"]}),
+])
+def test_undetected_source_is_a_400(engine, monkeypatch, path, body):
+    use_identifier(monkeypatch, None)
+    app = FastAPI()
+    app.include_router(translation.router)
+    app.dependency_overrides[get_db] = lambda: sessionmaker(bind=engine)()
+    
+    response = TestClient(app).post(path, json=body)
+    
+    assert response.status_code == 400
+    assert "Could not detect the source language" in response.json()["detail"]
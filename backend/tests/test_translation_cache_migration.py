@@ -0,0 +1,65 @@
+"""
+Tests for the translation cache hash backfill.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.language import Language
+from app.models.translation import Translation
+from app.services.text_normalization import TextNormalizer
+from app.services.translation_cache_migration import TranslationHashMigrator
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Language.__table__, Translation.__table__])
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Language(id=1, name="Kikuyu", code="ki", orthography_notes="ĩ => i"),
+        Language(id=2, name="Swahili", code="sw"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def add_translation(db, translation_id, source_text, source_hash=None):
+    db.add(Translation(
+        id=translation_id, source_lang_id=1, target_lang_id=2,
+        source_text=source_text, target_text="x", source_hash=source_hash
+    ))
+    db.commit()
+
+
+def expected_hash(text):
+    normalizer = TextNormalizer({"ki": {"ĩ": "i"}})
+    return normalizer.normalize(text, "ki").digest
+
+
+def test_backfill_matches_the_translation_service_key(db):
+    add_translation(db, 1, "Wĩ  mwega?")
+    add_translation(db, 2, "Ni wega.")
+    
+    counts = TranslationHashMigrator(db, batch_size=1).run()
+    
+    assert counts == {"updated": 2, "unchanged": 0}
+    hashes = dict(db.query(Translation.id, Translation.source_hash).all())
+    assert hashes == {1: expected_hash("Wĩ  mwega?"), 2: expected_hash("Ni wega.")}
+    # Orthography variants fold into the same key
+    assert hashes[1] == expected_hash("wi mwega")
+
+
+def test_backfill_skips_hashed_rows_unless_recomputing(db):
+    add_translation(db, 1, "Ni wega", source_hash="stale")
+    add_translation(db, 2, "Ũhoro", source_hash=None)
+    
+    assert TranslationHashMigrator(db).run() == {"updated": 1, "unchanged": 0}
+    assert db.get(Translation, 1).source_hash == "stale"
+    
+    assert TranslationHashMigrator(db).run(recompute=True) == {"updated": 1, "unchanged": 1}
+    db.expire_all()
+    assert db.get(Translation, 1).source_hash == expected_hash("Ni wega")
@@ -0,0 +1,189 @@
+"""
+Tests for offline bulk translation jobs.
+"""
+
+import io
+import json
+import threading
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.core.config import settings
+from app.services import translation_jobs
+from app.services.translation_jobs import (
+    TranslationJobRunner, TranslationJobStore, process_translation_job
+)
+from app.services.translation_service import TranslationResult
+
+
+class FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+        self.closed = False
+    
+    def rollback(self):
+        self.rollbacks += 1
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeTranslationService:
+    """Upper-cases text; fails every text of a pair whose source is "xx"."""
+    
+    calls = []
+    
+    def __init__(self, db):
+        self.db = db
+    
+    async def translate_many(self, texts, source_lang, target_lang, model_version=None):
+        self.calls.append((source_lang, target_lang, list(texts)))
+        if source_lang == "xx":
+            raise ValueError("Language not found: xx")
+        return [
+            TranslationResult(target_text=text.upper(), confidence_score=0.9, model_version="m1")
+            for text in texts
+        ]
+
+
+class RecordingStore(TranslationJobStore):
+    def __init__(self, root):
+        super().__init__(root)
+        self.statuses = []
+    
+    def write_status(self, job_id, status):
+        super().write_status(job_id, status)
+        self.statuses.append(status["status"])
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = FakeSession()
+    FakeTranslationService.calls = []
+    monkeypatch.setattr(translation_jobs, "SessionLocal", lambda: session)
+    monkeypatch.setattr(translation_jobs, "TranslationService", FakeTranslationService)
+    return session
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RecordingStore(str(tmp_path))
+
+
+def upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="input.jsonl")
+
+
+async def make_job(store, lines, trailing_newline=True):
+    data = "\n".join(json.dumps(line) if not isinstance(line, str) else line for line in lines)
+    if trailing_newline:
+        data += "\n"
+    return await store.create_job(upload(data.encode()), "sw", "ki")
+
+
+def results(store, job_id):
+    return [json.loads(line) for line in store.results_path(job_id).read_text().splitlines()]
+
+
+@pytest.mark.parametrize("data, total", [
+    (b"", 0),
+    (b'{"text": "a"}\n', 1),
+    (b'{"text": "a"}\n{"text": "b"}', 2),
+    (b'{"text": "a"}\n{"text": "b"}\n', 2),
+])
+async def test_create_job_counts_lines(store, monkeypatch, data, total):
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 4)  # Lines span chunks
+    
+    status = await store.create_job(upload(data), "sw", "ki")
+    
+    assert (status["status"], status["total"]) == ("queued", total)
+    assert store.input_path(status["job_id"]).read_bytes() == data
+    assert store.read_status(status["job_id"]) == status
+
+
+async def test_job_runs_to_completion_with_per_line_failures(store, session, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_CHUNK_SIZE", 3)
+    status = await make_job(store, [
+        {"id": "a", "text": "habari"},
+        {"id": "b", "text": 5},
+        {"id": "c", "text": None},
+        "not json",
+        {"id": "d", "text": "   "},
+        {"id": "e", "text": "asante", "source_lang": "xx"},
+        {"id": "f", "text": "kwaheri", "target_lang": ["luo"]},
+        {"id": "g", "text": "sana"},
+    ], trailing_newline=False)
+    job_id = status["job_id"]
+    
+    await process_translation_job(job_id, store)
+    
+    assert store.statuses == ["queued", "running", "running", "running", "running", "completed"]
+    final = store.read_status(job_id)
+    assert (final["total"], final["processed"], final["failed"]) == (8, 8, 6)
+    
+    records = results(store, job_id)
+    assert [record["line"] for record in records] == list(range(1, 9))
+    assert records[0]["target_text"] == "HABARI"
+    assert records[7]["target_text"] == "SANA"
+    for record in records[1:5] + records[6:7]:
+        assert record["error"].startswith("Invalid input line")
+    assert records[5]["error"] == "Language not found: xx"
+    # Invalid lines never reach the model, so valid lines of the same pair still translate
+    assert all(texts in (["habari"], ["asante"], ["sana"]) for _, _, texts in FakeTranslationService.calls)
+    assert session.rollbacks == 1 and session.closed
+
+
+async def test_unreadable_job_is_marked_failed(store, session):
+    status = await make_job(store, [{"text": "habari"}])
+    store.input_path(status["job_id"]).unlink()
+    
+    await process_translation_job(status["job_id"], store)
+    
+    final = store.read_status(status["job_id"])
+    assert final["status"] == "failed"
+    assert "input.jsonl" in final["error"]
+    assert session.closed
+
+
+async def test_missing_job_is_ignored(store, session):
+    await process_translation_job("0" * 32, store)
+    
+    assert store.statuses == []
+
+
+async def test_results_stream_in_chunks(store, session):
+    status = await make_job(store, [{"text": f"line {n}"} for n in range(50)])
+    await process_translation_job(status["job_id"], store)
+    
+    chunks = list(store.iter_results(status["job_id"], chunk_size=100))
+    
+    assert all(len(chunk) == 100 for chunk in chunks[:-1])
+    assert b"".join(chunks) == store.results_path(status["job_id"]).read_bytes()
+    assert len(results(store, status["job_id"])) == 50
+
+
+@pytest.mark.parametrize("job_id", ["../etc", "A" * 32, "0" * 31])
+def test_job_ids_cannot_escape_the_job_dir(store, job_id):
+    with pytest.raises(ValueError, match="Invalid job ID"):
+        store.job_dir(job_id)
+
+
+def test_runner_falls_back_to_a_thread_pool(monkeypatch):
+    monkeypatch.setattr(settings, "CELERY_BROKER_URL", "")
+    ran = []
+    done = threading.Event()
+    
+    def run_job(job_id):
+        ran.append((job_id, threading.current_thread().name))
+        done.set()
+    
+    monkeypatch.setattr(translation_jobs, "_run_job", run_job)
+    runner = TranslationJobRunner()
+    
+    runner.submit("f" * 32)
+    assert done.wait(5)
+    runner._executor.shutdown()
+    
+    assert ran[0][0] == "f" * 32
+    assert ran[0][1].startswith("translation-job")
@@ -0,0 +1,55 @@
+"""
+Tests for target-language tokens across tokenizer families.
+"""
+
+import pytest
+
+from app.services.translation_model import NLLB_LANGUAGE_CODES, TranslationModel
+
+
+class FakeTokenizer:
+    unk_token_id = 3
+    
+    def __init__(self, vocab):
+        self.vocab = vocab
+    
+    def convert_tokens_to_ids(self, token):
+        return self.vocab.get(token, self.unk_token_id)
+
+
+class NllbTokenizerFast(FakeTokenizer):
+    pass
+
+
+def model_with(tokenizer, language_codes=None):
+    model = TranslationModel()
+    model.model_name = "test-model"
+    model.tokenizer = tokenizer
+    model.language_codes = language_codes or {}
+    return model
+
+
+def test_m2m100_style_tokens():
+    model = model_with(FakeTokenizer({"__sw__": 10, "__en__": 11}))
+    assert model.language_token_id("sw") == 10
+    assert model.model_language("sw") == "sw"
+
+
+def test_nllb_style_tokens():
+    model = model_with(
+        NllbTokenizerFast({"swh_Latn": 20, "luo_Latn": 21}), NLLB_LANGUAGE_CODES
+    )
+    assert model.language_token_id("sw") == 20
+    assert model.language_token_id("luo") == 21
+    assert model.model_language("sw") == "swh_Latn"
+
+
+def test_unsupported_language_is_a_value_error():
+    model = model_with(FakeTokenizer({"__sw__": 10}))
+    with pytest.raises(ValueError, match="does not support language: tuv"):
+        model.language_token_id("tuv")
+
+
+def test_mock_model_needs_no_tokenizer():
+    model = TranslationModel()
+    assert model.translate_batch([], "sw", "en") == []
@@ -0,0 +1,42 @@
+"""
+Tests for pivot routing of indirect language pairs.
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services.translation_service import TranslationService
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "PIVOT_LANGUAGE", "sw")
+    monkeypatch.setattr(settings, "DIRECT_PAIR_LANGUAGES", ["sw", "en"])
+    return TranslationService(db=None)
+
+
+def test_indirect_pair_goes_through_pivot(service):
+    assert service._plan_route("ki", "luo") == [("ki", "sw"), ("sw", "luo")]
+
+
+@pytest.mark.parametrize("source, target", [("sw", "luo"), ("ki", "en"), ("en", "sw"), ("luo", "luo")])
+def test_direct_pairs_take_one_hop(service, source, target):
+    assert service._plan_route(source, target) == [(source, target)]
+
+
+def test_route_result_multiplies_hop_confidence(service):
+    hops = [
+        {"source_lang": "ki", "target_text": "habari", "confidence_score": 0.9, "model_version": "m1"},
+        {"source_lang": "sw", "target_text": "oyawore", "confidence_score": 0.5, "model_version": "m2"},
+    ]
+    result = service._build_result(hops)
+    
+    assert result.source_lang == "ki"
+    assert result.target_text == "oyawore"
+    assert result.confidence_score == pytest.approx(0.45)
+    assert result.model_version == "m2"
+
+
+def test_missing_hop_confidence_counts_as_zero(service):
+    hops = [{"source_lang": "ki", "target_text": "x", "confidence_score": None, "model_version": "m"}]
+    assert service._build_result(hops).confidence_score == 0.0
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from app.services.tts_cache import TTSCache, tts_cache_key
+
+
+def key(n):
+    return tts_cache_key(f"sentence {n}", "sw", "default")
+
+
+def writer(size):
+    def write(path):
+        path.write_bytes(b"\0" * size)
+    return write
+
+
+def disk_usage(root):
+    return sum(path.stat().st_size for path in root.glob("??/*.wav"))
+
+
+def test_budget_is_shared_between_processes(tmp_path):
+    # Two instances on one directory stand in for two worker processes
+    workers = [TTSCache(str(tmp_path), max_bytes=10_000) for _ in range(2)]
+    
+    for n in range(20):
+        workers[n % 2].put(key(n), writer(1000))
+    
+    assert disk_usage(tmp_path) <= 10_000
+    assert workers[0].budget.usage() == disk_usage(tmp_path)
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=3000)
+    for n in range(3):
+        cache.put(key(n), writer(1000))
+        os.utime(cache.path_for(key(n)), (n, n))
+    
+    # A hit makes entry 0 the most recently used
+    cache.get(key(0))
+    cache.put(key(3), writer(1000))
+    
+    assert cache.get(key(1)) is None
+    assert cache.get(key(0)) is not None
+    assert cache.get(key(3)) is not None
+
+
+def test_open_file_survives_eviction(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=1500)
+    cache.put(key(0), writer(1000))
+    os.utime(cache.path_for(key(0)), (0, 0))
+    
+    with cache.open(key(0)) as audio:
+        cache.put(key(1), writer(1000))
+        assert cache.get(key(0)) is None
+        assert audio.read() == b"\0" * 1000
+
+
+def test_new_entry_is_kept_even_over_budget(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=500)
+    
+    cache.put(key(0), writer(1000))
+    
+    audio = cache.open(key(0))
+    assert audio is not None
+    audio.close()
+
+
+def test_open_misses_return_none(tmp_path):
+    cache = TTSCache(str(tmp_path), max_bytes=500)
+    
+    assert cache.open(key(0)) is None
+    with pytest.raises(ValueError):
+        cache.open("not-a-key")
@@ -0,0 +1,109 @@
+"""
+Tests for the multipart upload size limit.
+"""
+
+import pytest
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.upload_limits import UploadSizeLimitMiddleware
+
+LIMIT = 4096
+
+
+@pytest.fixture
+def received():
+    return []
+
+
+@pytest.fixture
+def client(received):
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, limits={"/upload": LIMIT})
+    
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"ok": True}
+    
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        received.append(len(await file.read()))
+        return {"ok": True}
+    
+    return TestClient(app)
+
+
+def multipart(size):
+    boundary = "limit-test"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="a.wav"\r\n'
+        "Content-Type: audio/wav\r\n\r\n"
+    ).encode() + b"\0" * size + f"\r\n--{boundary}--\r\n".encode()
+    return body, {"content-type": f"multipart/form-data; boundary={boundary}"}
+
+
+def test_accepts_uploads_within_the_limit(client, received):
+    body, headers = multipart(1000)
+    
+    response = client.post("/upload", content=body, headers=headers)
+    
+    assert response.status_code == 200
+    assert received == [1000]
+
+
+def test_rejects_declared_oversize_uploads_before_the_endpoint(client, received):
+    body, headers = multipart(LIMIT)
+    
+    response = client.post("/upload", content=body, headers=headers)
+    
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_rejects_chunked_uploads_past_the_limit(client, received):
+    body, headers = multipart(LIMIT * 4)
+    
+    def chunks():
+        for start in range(0, len(body), 1024):
+            yield body[start:start + 1024]
+    
+    # A generator body is sent without a Content-Length
+    response = client.post("/upload", content=chunks(), headers=headers)
+    
+    assert response.status_code == 413
+    assert received == []
+
+
+async def test_stops_reading_the_body_at_the_limit():
+    pulled = []
+    
+    async def receive():
+        pulled.append(1024)
+        return {"type": "http.request", "body": b"\0" * 1024, "more_body": True}
+    
+    async def app(scope, receive, send):
+        while True:
+            await receive()
+    
+    middleware = UploadSizeLimitMiddleware(app, limits={"/upload": LIMIT})
+    scope = {
+        "type": "http", "path": "/upload",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=x")]
+    }
+    
+    with pytest.raises(HTTPException) as excinfo:
+        await middleware(scope, receive, None)
+    
+    assert excinfo.value.status_code == 413
+    assert sum(pulled) == LIMIT + 1024
+
+
+def test_other_paths_are_not_limited(client, received):
+    body, headers = multipart(LIMIT * 2)
+    
+    response = client.post("/other", content=body, headers=headers)
+    
+    assert response.status_code == 200
+    assert received == [LIMIT * 2]
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from app.services.voice_activity import EnergyVAD
+
+SAMPLE_RATE = 16000
+
+
+def level(db):
+    return 10 ** (db / 20)
+
+
+def noise(seconds, db, rng):
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * level(db)).astype(np.float32)
+
+
+def tone(seconds, db):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * 220 * t) * level(db) * np.sqrt(2)).astype(np.float32)
+
+
+def utterances(noise_db, rng):
+    """Two one-second tones 20 dB above the noise, separated by noise."""
+    background = noise(5.0, noise_db, rng)
+    for start in (1.0, 3.0):
+        begin = int(start * SAMPLE_RATE)
+        background[begin:begin + SAMPLE_RATE] += tone(1.0, noise_db + 20)
+    return background
+
+
+def segment(samples, chunk=1600):
+    vad = EnergyVAD(sample_rate=SAMPLE_RATE)
+    segments = []
+    for start in range(0, len(samples), chunk):
+        segments.extend(vad.feed(samples[start:start + chunk]))
+    final = vad.flush()
+    if final is not None:
+        segments.append(final)
+    return segments
+
+
+@pytest.mark.parametrize("noise_db", [-60.0, -40.0, -30.0, -20.0])
+def test_finds_utterances_over_background_noise(noise_db):
+    segments = segment(utterances(noise_db, np.random.default_rng(0)))
+    
+    assert len(segments) == 2
+    for found, start in zip(segments, (1.0, 3.0)):
+        assert found.start == pytest.approx(start, abs=0.3)
+        assert found.end == pytest.approx(start + 1.0, abs=0.5)
+
+
+@pytest.mark.parametrize("noise_db", [-45.0, -35.0, -25.0])
+def test_steady_noise_is_not_speech(noise_db):
+    assert segment(noise(5.0, noise_db, np.random.default_rng(1))) == []
+
+
+def test_floor_follows_rising_noise():
+    rng = np.random.default_rng(2)
+    samples = np.concatenate([noise(2.0, -60.0, rng), noise(6.0, -30.0, rng)])
+    samples[int(6.0 * SAMPLE_RATE):int(7.0 * SAMPLE_RATE)] += tone(1.0, -10.0)
+    
+    segments = segment(samples)
+    
+    # The jump in noise opens one segment; after that only the tone is speech
+    assert segments[-1].start == pytest.approx(6.0, abs=0.3)
+    assert all(s.end - s.start < 3.5 for s in segments)
@@ -0,0 +1,227 @@
+"""
+Training for the character n-gram language identification model.
+
+Builds a multinomial naive Bayes classifier over hashed character n-grams
+from the collected corpora and writes it in the array-backed format loaded
+by backend/app/services/language_identification.py.
+"""
+
+import json
+import logging
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Hashing constants - must match backend/app/services/language_identification.py
+HASH_MULTIPLIER = np.uint64(1000003)
+HASH_SHIFT = np.uint64(29)
+
+# Normalization - must match backend/app/services/text_normalization.py
+PUNCTUATION_TABLE = str.maketrans({
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u02bc": "'",  # modifier letter apostrophe, e.g. ng' in Swahili and Luo
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2013": "-",
+    "\u2014": "-",
+    "\u2026": "...",
+    "\u00a0": " ",
+})
+
+WHITESPACE_RE = re.compile(r"\s+")
+TRAILING_PUNCTUATION_RE = re.compile(r"[\s.!?,;:]+$")
+
+
+def hash_ngrams(text: str, ngram_range: Tuple[int, int], n_buckets: int) -> np.ndarray:
+    """Hash every character n-gram of `text` into a bucket index."""
+    codes = np.frombuffer(f" {text} ".encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    buckets = []
+    
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        count = len(codes) - n + 1
+        if count <= 0:
+            break
+        
+        hashes = np.full(count, n, dtype=np.uint64)
+        for k in range(n):
+            hashes = hashes * HASH_MULTIPLIER + codes[k:k + count]
+        hashes ^= hashes >> HASH_SHIFT
+        buckets.append(hashes % np.uint64(n_buckets))
+    
+    if not buckets:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(buckets).astype(np.int64)
+
+
+def normalize_text(text: str) -> str:
+    """The backend's language-neutral matching key, which is what it scores."""
+    text = unicodedata.normalize("NFC", text).translate(PUNCTUATION_TABLE)
+    text = WHITESPACE_RE.sub(" ", text).strip()
+    return TRAILING_PUNCTUATION_RE.sub("", text.casefold())
+
+
+class LanguageIdTrainer:
+    """Trainer for the character n-gram language identification model."""
+    
+    def __init__(
+        self,
+        n_buckets: int = 1 << 16,
+        ngram_range: Tuple[int, int] = (1, 4),
+        alpha: float = 0.1
+    ):
+        self.n_buckets = n_buckets
+        self.ngram_range = ngram_range
+        self.alpha = alpha  # Additive smoothing
+    
+    def load_corpora(self, data_dir: str) -> List[Tuple[str, str]]:
+        """
+        Load (text, language) pairs from the collected corpora.
+        
+        Both sides of each translation pair are used, so English comes from
+        the `translation` fields. Audio corpora are skipped because their
+        text is placeholder content. Languages without parallel data (e.g.
+        Turkana, El Molo) are covered by monolingual text files.
+        """
+        examples = []
+        
+        for path in sorted(Path(data_dir).glob("*_corpus.json")):
+            if path.name.endswith("_audio_corpus.json"):
+                continue
+            
+            with open(path, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+            
+            for item in items:
+                if item.get("text") and item.get("source_lang"):
+                    examples.append((item["text"], item["source_lang"]))
+                if item.get("translation") and item.get("target_lang"):
+                    examples.append((item["translation"], item["target_lang"]))
+        
+        # Monolingual text, one sentence per line: data/monolingual/<code>.txt
+        for path in sorted(Path(data_dir).glob("monolingual/*.txt")):
+            with open(path, 'r', encoding='utf-8') as f:
+                examples.extend((line.strip(), path.stem) for line in f if line.strip())
+        
+        logger.info(f"Loaded {len(examples)} labelled examples from {data_dir}")
+        return examples
+    
+    def count_ngrams(
+        self, examples: List[Tuple[str, str]], labels: List[str]
+    ) -> np.ndarray:
+        """Accumulate n-gram bucket counts per language."""
+        label_index = {label: i for i, label in enumerate(labels)}
+        counts = np.zeros((self.n_buckets, len(labels)), dtype=np.float64)
+        
+        for text, language in examples:
+            buckets = hash_ngrams(normalize_text(text), self.ngram_range, self.n_buckets)
+            np.add.at(counts[:, label_index[language]], buckets, 1)
+        
+        return counts
+    
+    def fit(self, examples: List[Tuple[str, str]]) -> Dict:
+        """Fit the classifier, holding out examples to calibrate a temperature."""
+        labels = sorted({language for _, language in examples})
+        rng = np.random.default_rng(0)
+        order = rng.permutation(len(examples))
+        n_heldout = len(examples) // 10
+        heldout = [examples[i] for i in order[:n_heldout]]
+        train = [examples[i] for i in order[n_heldout:]]
+        
+        counts = self.count_ngrams(train, labels)
+        log_probs, log_priors = self._estimate(counts, train, labels)
+        temperature = self._calibrate(log_probs, log_priors, heldout, labels)
+        
+        # Refit on all data with the calibrated temperature
+        counts = self.count_ngrams(examples, labels)
+        log_probs, log_priors = self._estimate(counts, examples, labels)
+        
+        logger.info(f"Trained language ID model for {len(labels)} languages: {labels}")
+        return {
+            "labels": labels,
+            "log_probs": log_probs.astype(np.float32),
+            "log_priors": log_priors.astype(np.float32),
+            "temperature": temperature
+        }
+    
+    def _estimate(
+        self, counts: np.ndarray, examples: List[Tuple[str, str]], labels: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        smoothed = counts + self.alpha
+        log_probs = np.log(smoothed) - np.log(smoothed.sum(axis=0, keepdims=True))
+        
+        class_counts = np.array(
+            [sum(1 for _, language in examples if language == label) for label in labels],
+            dtype=np.float64
+        ) + 1.0
+        log_priors = np.log(class_counts / class_counts.sum())
+        
+        return log_probs, log_priors
+    
+    def _calibrate(
+        self,
+        log_probs: np.ndarray,
+        log_priors: np.ndarray,
+        heldout: List[Tuple[str, str]],
+        labels: List[str]
+    ) -> float:
+        """Pick the softmax temperature that minimizes held-out log loss."""
+        if not heldout:
+            return 1.0
+        
+        label_index = {label: i for i, label in enumerate(labels)}
+        scores = []
+        for text, _ in heldout:
+            buckets, counts = np.unique(
+                hash_ngrams(normalize_text(text), self.ngram_range, self.n_buckets),
+                return_counts=True
+            )
+            scores.append(log_priors + counts @ log_probs[buckets])
+        scores = np.array(scores)
+        targets = np.array([label_index[language] for _, language in heldout])
+        
+        best_temperature, best_loss = 1.0, np.inf
+        for temperature in np.geomspace(0.25, 256.0, 31):
+            scaled = scores / temperature
+            scaled -= scaled.max(axis=1, keepdims=True)
+            log_softmax = scaled - np.log(np.exp(scaled).sum(axis=1, keepdims=True))
+            loss = -log_softmax[np.arange(len(targets)), targets].mean()
+            if loss < best_loss:
+                best_temperature, best_loss = float(temperature), float(loss)
+        
+        logger.info(f"Calibrated temperature {best_temperature:.3f} (held-out log loss {best_loss:.4f})")
+        return best_temperature
+    
+    def save(self, model: Dict, output_dir: str, version: str = "v1"):
+        """Write the model as memory-mappable .npy arrays plus metadata."""
+        path = Path(output_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        
+        np.save(path / "log_probs.npy", np.ascontiguousarray(model["log_probs"]))
+        np.save(path / "log_priors.npy", model["log_priors"])
+        
+        meta = {
+            "version": version,
+            "labels": model["labels"],
+            "n_buckets": self.n_buckets,
+            "ngram_range": list(self.ngram_range),
+            "temperature": model["temperature"]
+        }
+        with open(path / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        
+        logger.info(f"Saved language ID model to {path}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
+    trainer = LanguageIdTrainer()
+    examples = trainer.load_corpora("data")
+    model = trainer.fit(examples)
+    trainer.save(model, "models/language_id")